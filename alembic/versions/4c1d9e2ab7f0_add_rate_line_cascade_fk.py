@@ -0,0 +1,39 @@
+"""Add rate line cascade foreign key
+
+Revision ID: 4c1d9e2ab7f0
+Revises: 7efc133e275e
+Create Date: 2026-10-19 10:03:17.284416
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4c1d9e2ab7f0"
+down_revision: Union[str, None] = "7efc133e275e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rates left behind by row-by-row deletes would block the constraint
+    op.execute(
+        "DELETE FROM rate WHERE NOT EXISTS "
+        "(SELECT 1 FROM events_lines WHERE events_lines.id = rate.line_id)"
+    )
+    op.execute("ALTER TABLE rate DROP CONSTRAINT IF EXISTS fk_lineid_eventid")
+    op.create_foreign_key(
+        "fk_lineid_eventid",
+        "rate",
+        "events_lines",
+        ["line_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    # The constraint is part of the original rate table definition, keep it
+    pass
@@ -0,0 +1,62 @@
+"""Create events drafts table
+
+Revision ID: 5d8f3a61c7b2
+Revises: e2b7c4d91a36
+Create Date: 2026-10-19 16:05:31.204518
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d8f3a61c7b2"
+down_revision: Union[str, None] = "e2b7c4d91a36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "events_drafts",
+        sa.Column("id", sa.Integer(), autoincrement=True, primary_key=True),
+        sa.Column("header_id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("lines", postgresql.JSONB(), nullable=False),
+        sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.UniqueConstraint(
+            "header_id", "content_hash", name="uq_events_drafts_header_hash"
+        ),
+    )
+    op.create_foreign_key(
+        "fk_draftsid_headersid",
+        "events_drafts",
+        "events_headers",
+        ["header_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "fk_draftsid_usersid",
+        "events_drafts",
+        "users",
+        ["owner_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index("ix_events_drafts_expires_at", "events_drafts", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("events_drafts")
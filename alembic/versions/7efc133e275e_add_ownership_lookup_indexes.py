@@ -0,0 +1,38 @@
+"""Add ownership lookup indexes
+
+Revision ID: 7efc133e275e
+Revises: cb5b2761f1f3
+Create Date: 2026-10-19 09:12:41.503127
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7efc133e275e"
+down_revision: Union[str, None] = "cb5b2761f1f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_events_lines_header_id", "events_lines", ["header_id"])
+    op.create_index("ix_rate_line_id", "rate", ["line_id"])
+    op.create_index("ix_events_headers_owner_id", "events_headers", ["owner_id"])
+    op.create_index(
+        "ix_events_headers_owner_id_staging",
+        "events_headers",
+        ["owner_id"],
+        postgresql_where=sa.text("status = 1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_headers_owner_id_staging", table_name="events_headers")
+    op.drop_index("ix_events_headers_owner_id", table_name="events_headers")
+    op.drop_index("ix_rate_line_id", table_name="rate")
+    op.drop_index("ix_events_lines_header_id", table_name="events_lines")
@@ -0,0 +1,32 @@
+"""Add deleted headers index
+
+Revision ID: a63f0b8e5d21
+Revises: 4c1d9e2ab7f0
+Create Date: 2026-10-19 11:26:05.917342
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a63f0b8e5d21"
+down_revision: Union[str, None] = "4c1d9e2ab7f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_events_headers_deleted",
+        "events_headers",
+        ["id"],
+        postgresql_where=sa.text("status = 6"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_headers_deleted", table_name="events_headers")
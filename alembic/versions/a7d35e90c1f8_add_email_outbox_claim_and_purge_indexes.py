@@ -0,0 +1,47 @@
+"""Add email outbox claim and purge indexes
+
+Revision ID: a7d35e90c1f8
+Revises: f3a9c0d7b214
+Create Date: 2026-10-20 10:12:47.530214
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d35e90c1f8"
+down_revision: Union[str, None] = "f3a9c0d7b214"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_email_outbox_pending", table_name="email_outbox")
+    op.create_index(
+        "ix_email_outbox_due",
+        "email_outbox",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status IN ('pending', 'sending')"),
+    )
+    op.create_index(
+        "ix_email_outbox_done",
+        "email_outbox",
+        ["created_at"],
+        postgresql_where=sa.text("status IN ('sent', 'failed')"),
+    )
+
+
+def downgrade() -> None:
+    op.execute("UPDATE email_outbox SET status = 'pending' WHERE status = 'sending'")
+    op.drop_index("ix_email_outbox_done", table_name="email_outbox")
+    op.drop_index("ix_email_outbox_due", table_name="email_outbox")
+    op.create_index(
+        "ix_email_outbox_pending",
+        "email_outbox",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
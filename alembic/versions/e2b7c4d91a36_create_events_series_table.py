@@ -0,0 +1,79 @@
+"""Create events series table
+
+Revision ID: e2b7c4d91a36
+Revises: a63f0b8e5d21
+Create Date: 2026-10-19 13:48:52.610274
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b7c4d91a36"
+down_revision: Union[str, None] = "a63f0b8e5d21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "events_series",
+        sa.Column("id", sa.Integer(), autoincrement=True, primary_key=True),
+        sa.Column("header_id", sa.Integer(), nullable=False),
+        sa.Column("rrule", sa.String(), nullable=False),
+        sa.Column("dtstart", sa.TIMESTAMP(timezone=False), nullable=False),
+        sa.Column("dtend", sa.TIMESTAMP(timezone=False), nullable=False),
+        sa.Column(
+            "exdates",
+            postgresql.ARRAY(sa.TIMESTAMP(timezone=False)),
+            nullable=False,
+            server_default=sa.text("'{}'"),
+        ),
+        sa.Column("capacity", sa.Integer(), nullable=True),
+        sa.Column("isPublic", sa.Boolean(), nullable=False, server_default="true"),
+        sa.Column(
+            "rates",
+            postgresql.JSONB(),
+            nullable=False,
+            server_default=sa.text("'[]'::jsonb"),
+        ),
+        sa.Column("materialized_until", sa.TIMESTAMP(timezone=False), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.create_foreign_key(
+        "fk_seriesid_headersid",
+        "events_series",
+        "events_headers",
+        ["header_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index("ix_events_series_header_id", "events_series", ["header_id"])
+
+    op.add_column("events_lines", sa.Column("series_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_linesid_seriesid",
+        "events_lines",
+        "events_series",
+        ["series_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index("ix_events_lines_series_id", "events_lines", ["series_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_lines_series_id", table_name="events_lines")
+    op.drop_constraint("fk_linesid_seriesid", "events_lines", type_="foreignkey")
+    op.drop_column("events_lines", "series_id")
+    op.drop_table("events_series")
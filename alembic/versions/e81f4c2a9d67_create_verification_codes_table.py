@@ -0,0 +1,64 @@
+"""Create verification codes table
+
+Revision ID: e81f4c2a9d67
+Revises: c4e19a7b5d20
+Create Date: 2026-10-19 21:12:08.518390
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e81f4c2a9d67"
+down_revision: Union[str, None] = "c4e19a7b5d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "verification_codes",
+        sa.Column("email", sa.String(), primary_key=True),
+        sa.Column("code", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_verification_codes_email_code",
+        "verification_codes",
+        ["email", "code"],
+        postgresql_include=["expires_at"],
+    )
+    op.create_index(
+        "ix_verification_codes_expires_at", "verification_codes", ["expires_at"]
+    )
+    op.execute(
+        "INSERT INTO verification_codes (email, code, expires_at) "
+        "SELECT email, code, code_expiration FROM users "
+        "WHERE code IS NOT NULL AND code_expiration IS NOT NULL"
+    )
+    op.drop_column("users", "code_expiration")
+    op.drop_column("users", "code")
+
+
+def downgrade() -> None:
+    op.add_column("users", sa.Column("code", sa.Integer(), nullable=True))
+    op.add_column(
+        "users",
+        sa.Column("code_expiration", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+    op.execute(
+        "UPDATE users SET code = verification_codes.code, "
+        "code_expiration = verification_codes.expires_at "
+        "FROM verification_codes WHERE verification_codes.email = users.email"
+    )
+    op.drop_index(
+        "ix_verification_codes_expires_at", table_name="verification_codes"
+    )
+    op.drop_index(
+        "ix_verification_codes_email_code", table_name="verification_codes"
+    )
+    op.drop_table("verification_codes")
@@ -0,0 +1,72 @@
+"""Add users case insensitive indexes
+
+Revision ID: f3a9c0d7b214
+Revises: e81f4c2a9d67
+Create Date: 2026-10-19 22:31:54.106627
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9c0d7b214"
+down_revision: Union[str, None] = "e81f4c2a9d67"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _case_duplicates(connection, column: str) -> list:
+    return connection.execute(
+        sa.text(
+            f"SELECT lower({column}), array_agg(id ORDER BY id) FROM users "
+            f"GROUP BY lower({column}) HAVING count(*) > 1"
+        )
+    ).all()
+
+
+def upgrade() -> None:
+    # Accounts that only differ in casing own their own data, merging them
+    # is a manual decision, so stop with the list instead of guessing
+    connection = op.get_bind()
+    duplicates = [
+        f"{column} {value!r}: user ids {ids}"
+        for column in ("username", "email")
+        for value, ids in _case_duplicates(connection, column)
+    ]
+    if duplicates:
+        raise RuntimeError(
+            "Users differing only in letter case must be merged or renamed "
+            "before adding the case insensitive indexes:\n" + "\n".join(duplicates)
+        )
+
+    # Verification codes are keyed by lowercased email, keep the latest code
+    op.execute(
+        "DELETE FROM verification_codes AS stale USING verification_codes AS kept "
+        "WHERE lower(stale.email) = lower(kept.email) "
+        "AND (stale.expires_at, stale.email) < (kept.expires_at, kept.email)"
+    )
+    op.execute(
+        "UPDATE verification_codes SET email = lower(email) "
+        "WHERE email <> lower(email)"
+    )
+    op.create_index(
+        "uq_users_lower_username",
+        "users",
+        [sa.text("lower(username)")],
+        unique=True,
+    )
+    op.create_index(
+        "uq_users_lower_email",
+        "users",
+        [sa.text("lower(email)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_users_lower_email", table_name="users")
+    op.drop_index("uq_users_lower_username", table_name="users")
@@ -1,14 +1,8 @@
 import os
 from pathlib import Path
-from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from firebase_admin.auth import verify_id_token
 from pydantic_settings import BaseSettings
 
-bearer_scheme = HTTPBearer(auto_error=False)
-
 
 class Settings(BaseSettings):
     """Database and application settings read from environment variables"""
@@ -31,6 +25,57 @@ class Settings(BaseSettings):
     google_application_credentials: str
     nominatim_base_url: str
     user_agent: str
+    purge_interval_seconds: int = 900
+    purge_batch_size: int = 200
+    purge_start_hour: int = 2
+    purge_end_hour: int = 6
+    code_purge_batch_size: int = 1000
+    code_retention_minutes: int = 1440
+    series_horizon_days: int = 30
+    series_refresh_seconds: int = 3600
+    series_window_max_days: int = 365
+    max_occurrences: int = 1000
+    preview_max_page_size: int = 500
+    draft_ttl_seconds: int = 3600
+    smtp_starttls: bool = True
+    smtp_timeout_seconds: int = 30
+    email_workers: int = 2
+    email_batch_size: int = 50
+    email_poll_seconds: int = 5
+    email_max_attempts: int = 5
+    email_backoff_seconds: int = 30
+    email_claim_seconds: int = 1800
+    email_retention_days: int = 30
+    email_purge_batch_size: int = 1000
+    templates_auto_reload: bool = False
+    hashing_workers: int = 4
+    hashing_max_pending: int = 16
+    hashing_retry_after_seconds: int = 1
+    password_scheme: str = "argon2"
+    argon2_memory_cost: int = 65536
+    argon2_time_cost: int = 3
+    argon2_parallelism: int = 4
+    bcrypt_rounds: int = 12
+    password_verify_target_ms: int = 0
+    revocation_bloom_capacity: int = 100000
+    revocation_bloom_error_rate: float = 0.01
+    revocation_prune_seconds: int = 300
+    revocation_retry_seconds: int = 5
+    token_cache_size: int = 10000
+    rate_limit_enabled: bool = True
+    rate_limit_storage_uri: str = "memory://"
+    rate_limit_strategy: str = "moving-window"
+    rate_limit_trusted_proxies: int = 0
+    rate_limit_sync_ms: int = 100
+    rate_limit_sync_hits: int = 10
+    rate_limit_local_keys: int = 100000
+    rate_limit_login: str = "5/minute"
+    rate_limit_auth_email: str = "3/minute"
+    rate_limit_verify_code: str = "10/minute"
+    rate_limit_geocoding: str = "10/minute"
+    firebase_certs_refresh_seconds: int = 3600
+    firebase_certs_margin_seconds: int = 300
+    firebase_certs_retry_seconds: int = 60
 
     class Config:
         env_file = os.path.join(Path(__file__).resolve().parent.parent, ".env")
@@ -68,20 +113,3 @@ class FirebaseSettings(BaseSettings):
 
 
 firebase_settings = FirebaseSettings()
-
-
-def get_firebase_user_from_token(
-    token: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)]
-) -> dict | None:
-    """Uses bearer token to identify Firebase user ID"""
-    try:
-        if not token:
-            raise ValueError("No token provided")
-        user = verify_id_token(token.credentials)
-        return user
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not logged in or Invalid credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from e
@@ -3,22 +3,40 @@
 from sqlalchemy.orm import Session
 
 import app.models as models
+from app.services.taxonomy_service import TaxonomyService
 
 
 class Seed:
+    # Ordered as HeaderStatus, new codes must be appended
+    STATUS_CODES = [
+        "staging",
+        "revision",
+        "active",
+        "inactive",
+        "reported",
+        "deleted",
+    ]
+
     @staticmethod
     def seed_data(db: Session):
+        taxonomy_changed = False
         if db.query(models.Categories).count() == 0:
             Seed.add_categories(db)
+            taxonomy_changed = True
 
-        if db.query(models.StatusCodes).count() == 0:
+        if db.query(models.StatusCodes).count() < len(Seed.STATUS_CODES):
             Seed.add_status_codes(db)
 
         if db.query(models.Subcategories).count() == 0:
             Seed.add_subcategories(db)
+            taxonomy_changed = True
 
         if db.query(models.Tags).count() == 0:
             Seed.add_tags(db)
+            taxonomy_changed = True
+
+        if taxonomy_changed:
+            TaxonomyService.invalidate()
 
     @staticmethod
     def add_categories(db: Session):
@@ -41,8 +59,12 @@ class Seed:
 
     @staticmethod
     def add_status_codes(db: Session):
-        status_codes = ["staging", "revision", "active", "inactive", "reported"]
-        code_models = [models.StatusCodes(name=code) for code in status_codes]
+        existing = {code.name for code in db.query(models.StatusCodes.name).all()}
+        code_models = [
+            models.StatusCodes(name=code)
+            for code in Seed.STATUS_CODES
+            if code not in existing
+        ]
         db.add_all(code_models)
         db.commit()
         for code in code_models:
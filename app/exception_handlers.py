@@ -3,7 +3,9 @@
 from fastapi import HTTPException, Request, status
 from fastapi.responses import JSONResponse
 
+from app.config import settings
 from app.schemas import ErrorDetails, ErrorResponse, MetaData
+from app.utils.utils import HashingPoolSaturated
 
 
 def custom_http_exception_handler(request: Request, exc: HTTPException):
@@ -30,3 +32,25 @@ def custom_http_exception_handler(request: Request, exc: HTTPException):
         status_code=exc.status_code, content=error_response.model_dump()
     )
 
+
+def hashing_saturated_handler(request: Request, exc: HashingPoolSaturated):
+    error_details = ErrorDetails(
+        type="Service busy",
+        message="Too many password operations in progress. Please try again later",
+        details=f"{exc.stats['queued']} queued, {exc.stats['running']} running",
+    )
+    meta_data = MetaData(
+        request_id=request.headers.get("request-id", "default_request_id"),
+        client=request.headers.get("client-type", "unknown"),
+    )
+    error_response = ErrorResponse(
+        status="error",
+        message=error_details.message,
+        data=error_details,
+        meta=meta_data,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=error_response.model_dump(),
+        headers={"Retry-After": str(settings.hashing_retry_after_seconds)},
+    )
@@ -1,3 +1,4 @@
+import asyncio
 import time
 
 import firebase_admin
@@ -15,9 +16,21 @@ from slowapi.middleware import SlowAPIMiddleware
 from app.config import settings
 from app.database.connection import get_db
 from app.database.seed import Seed
-from app.exception_handlers import custom_http_exception_handler
+from app.exception_handlers import (
+    custom_http_exception_handler,
+    hashing_saturated_handler,
+)
 from app.rate_limit import limiter, rate_limit_handler
 from app.routers import auth, legal, posts, recall, users
+from app.services.outbox_service import OutboxService
+from app.services.purge_service import PurgeService
+from app.services.revocation_service import RevocationService
+from app.services.series_service import SeriesService
+from app.services.taxonomy_service import TaxonomyService
+from app.services.token_service import TokenService
+from app.templates.template_service import EmailTemplates, TEMPLATES_DIR
+from app.utils import utils
+from app.utils.utils import HashingPoolSaturated
 
 app = FastAPI()
 client = Nominatim(user_agent=settings.user_agent)
@@ -25,8 +38,8 @@ client = Nominatim(user_agent=settings.user_agent)
 app.state.limiter = limiter
 app.add_middleware(SlowAPIMiddleware)
 
-app.mount("/static", StaticFiles(directory="app/templates"), name="static")
-templates = Jinja2Templates(directory="app/templates")
+app.mount("/static", StaticFiles(directory=TEMPLATES_DIR), name="static")
+templates = Jinja2Templates(directory=TEMPLATES_DIR)
 
 firebase_admin.initialize_app()
 print(f"Firebase project '{firebase_admin.get_app().project_id}' initialized")
@@ -39,6 +52,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Draft-Id"],
 )
 
 
@@ -46,10 +60,55 @@ app.add_middleware(
 async def seed_database():
     db = next(get_db())
     Seed.seed_data(db)
+    TaxonomyService.load(db)
+
+
+@app.on_event("startup")
+async def load_email_templates():
+    EmailTemplates.load()
+
+
+@app.on_event("startup")
+async def calibrate_password_hashing():
+    if settings.password_verify_target_ms:
+        await asyncio.to_thread(
+            utils.calibrate_pwd_context, settings.password_verify_target_ms
+        )
+
+
+@app.on_event("startup")
+async def start_purge_worker():
+    app.state.purge_task = asyncio.create_task(PurgeService.run_worker())
+
+
+@app.on_event("startup")
+async def start_series_worker():
+    app.state.series_task = asyncio.create_task(SeriesService.run_worker())
+
+
+@app.on_event("startup")
+async def start_revocation_listener():
+    app.state.revocation_task = asyncio.create_task(RevocationService.run_listener())
+
+
+@app.on_event("startup")
+async def start_firebase_certs_refresher():
+    app.state.firebase_certs_task = asyncio.create_task(
+        TokenService.run_certs_refresher()
+    )
+
+
+@app.on_event("startup")
+async def start_email_workers():
+    app.state.email_tasks = [
+        asyncio.create_task(OutboxService.run_worker())
+        for _ in range(settings.email_workers)
+    ]
 
 
 app.add_exception_handler(HTTPException, custom_http_exception_handler)
 app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
+app.add_exception_handler(HashingPoolSaturated, hashing_saturated_handler)
 
 while True:
     try:
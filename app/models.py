@@ -1,6 +1,7 @@
 from geoalchemy2 import Geometry
-from sqlalchemy import (DOUBLE_PRECISION, Boolean, Column, ForeignKey, Integer,
-                        String)
+from sqlalchemy import (DOUBLE_PRECISION, Boolean, Column, ForeignKey, Index,
+                        Integer, String, Text, UniqueConstraint, func)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.expression import null, text
 from sqlalchemy.types import TIMESTAMP
@@ -18,13 +19,16 @@ class Users(Base):
     full_name = Column(String, nullable=False)
     email = Column(String, nullable=False, unique=True)
     password = Column(String, nullable=False)
-    code = Column(Integer, nullable=True)
-    code_expiration = Column(TIMESTAMP(timezone=True), nullable=True)
     is_validated = Column(Boolean, nullable=True, default=False)
     created_at = Column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
 
+    __table_args__ = (
+        Index("uq_users_lower_username", func.lower(username), unique=True),
+        Index("uq_users_lower_email", func.lower(email), unique=True),
+    )
+
 
 class TokenTable(Base):
     """Token table records model"""
@@ -77,7 +81,12 @@ class Rates(Base):
     title = Column(String, nullable=True)
     currency = Column(String, nullable=True, default="EUR")
     amount = Column(DOUBLE_PRECISION, nullable=True, default=0.00)
-    line_id = Column(Integer, nullable=False)
+    line_id = Column(
+        Integer,
+        ForeignKey("events_lines.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
     created_at = Column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
@@ -95,7 +104,7 @@ class EventsHeaders(Base):
     coordinates = Column(String, nullable=False)
     img = Column(String, nullable=True)
     img2 = Column(String, nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
     category = Column(Integer, ForeignKey("cat.id"))
     created_at = Column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
@@ -107,10 +116,26 @@ class EventsHeaders(Base):
     user = relationship("Users", backref="events_headers")
     cat = relationship("Categories", backref="events_headers")
     events_lines = relationship(
-        "EventsLines", back_populates="header", cascade="all, delete-orphan"
+        "EventsLines",
+        back_populates="header",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     status_codes = relationship("StatusCodes", backref="events_headers")
 
+    __table_args__ = (
+        Index(
+            "ix_events_headers_owner_id_staging",
+            "owner_id",
+            postgresql_where=text("status = 1"),
+        ),
+        Index(
+            "ix_events_headers_deleted",
+            "id",
+            postgresql_where=text("status = 6"),
+        ),
+    )
+
 
 class EventsLines(Base):
     """ " Lines of events table model"""
@@ -126,12 +151,146 @@ class EventsLines(Base):
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
     header_id = Column(
-        Integer, ForeignKey("events_headers.id", ondelete="CASCADE"), nullable=False
+        Integer,
+        ForeignKey("events_headers.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    series_id = Column(
+        Integer,
+        ForeignKey("events_series.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
     )
 
     header = relationship("EventsHeaders", back_populates="events_lines")
 
 
+class EventsSeries(Base):
+    """Recurring schedule of an event stored as an iCalendar RRULE.
+    Occurrences up to materialized_until exist as events_lines rows,
+    later ones are expanded on demand"""
+
+    __tablename__ = "events_series"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    header_id = Column(
+        Integer,
+        ForeignKey("events_headers.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    rrule = Column(String, nullable=False)
+    dtstart = Column(TIMESTAMP(timezone=False), nullable=False)
+    dtend = Column(TIMESTAMP(timezone=False), nullable=False)
+    exdates = Column(ARRAY(TIMESTAMP(timezone=False)), nullable=False, default=list)
+    capacity = Column(Integer, nullable=True)
+    isPublic = Column(Boolean, nullable=False, default=True)
+    rates = Column(JSONB, nullable=False, default=list)
+    materialized_until = Column(TIMESTAMP(timezone=False), nullable=True)
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+
+class EventsDrafts(Base):
+    """Generated lines of a header awaiting confirmation. Drafts are
+    keyed by header and content hash and expire after a TTL"""
+
+    __tablename__ = "events_drafts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    header_id = Column(
+        Integer,
+        ForeignKey("events_headers.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    owner_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    content_hash = Column(String(64), nullable=False)
+    lines = Column(JSONB, nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "header_id", "content_hash", name="uq_events_drafts_header_hash"
+        ),
+    )
+
+
+class EmailOutbox(Base):
+    """Queued emails, delivered in batches by the outbox workers"""
+
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+    status = Column(String, nullable=False, server_default="pending")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+    sent_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_email_outbox_due",
+            "next_attempt_at",
+            postgresql_where=text("status IN ('pending', 'sending')"),
+        ),
+        Index(
+            "ix_email_outbox_done",
+            "created_at",
+            postgresql_where=text("status IN ('sent', 'failed')"),
+        ),
+    )
+
+
+class RevokedTokens(Base):
+    """Revoked access tokens, kept until they expire"""
+
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+    revoked_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+
+class VerificationCodes(Base):
+    """Pending email verification codes, one per lowercased email"""
+
+    __tablename__ = "verification_codes"
+
+    email = Column(String, primary_key=True)
+    code = Column(Integer, nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (
+        Index(
+            "ix_verification_codes_email_code",
+            "email",
+            "code",
+            postgresql_include=["expires_at"],
+        ),
+    )
+
+
 class StatusCodes(Base):
     """Status codes table model"""
 
@@ -1,21 +1,27 @@
 from datetime import datetime, timedelta, timezone
 from functools import wraps
+from typing import Annotated
+from uuid import uuid4
 
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import (
+    HTTPAuthorizationCredentials,
+    HTTPBearer,
+    OAuth2PasswordBearer,
+)
 from jose import JWTError, jwt
 from jwt import DecodeError, ExpiredSignatureError, InvalidTokenError
-from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session
 from app.responses import ErrorHTTPResponse, SuccessHTTPResponse, SystemResponse
 
-import app.models as models
 import app.schemas as schemas
 from app.schemas.schemas import ResponseStatus, InternalResponse
 import inspect
 from app.config import settings
+from app.services.revocation_service import revocations
+from app.services.token_service import TokenService, access_tokens
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+bearer_scheme = HTTPBearer(auto_error=False)
 
 SECRET_KEY = settings.secret_key
 REFRESH_SECRET_KEY = settings.refresh_secret_key
@@ -38,7 +44,8 @@ def create_token_wrapper(func):
 
 @create_token_wrapper
 def create_access_token(data: dict):
-    """Creates an access token."""
+    """Creates an access token with a unique id (jti) used for revocation."""
+    data["jti"] = uuid4().hex
     encoded_jwt = jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -59,8 +66,11 @@ def create_email_code_token(data: dict):
     return encoded_jwt
 
 
-def decode_access_token(token: str):
-    """Decodes the access token and checks for blacklisting."""
+def decode_access_token_claims(token: str) -> dict:
+    """
+    Decodes the access token and checks it was not revoked. Verified claims
+    are cached until the token expires, revocation is checked on every call.
+    """
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -72,18 +82,25 @@ def decode_access_token(token: str):
         ).model_dump(),
     )
 
-    # if is_token_blacklisted(db, token):
-    #     raise credentials_exception
-
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=ALGORITHM)
-        id: str = payload.get("user_id")
-        if id is None:
+    payload = access_tokens.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=ALGORITHM)
+        except JWTError:
+            raise credentials_exception
+        if payload.get("user_id") is None or payload.get("jti") is None:
             raise credentials_exception
-        token_data = schemas.TokenData(id=str(id))
-    except JWTError:
+        access_tokens.put(token, payload)
+
+    if payload["jti"] in revocations:
         raise credentials_exception
+    return payload
 
+
+def decode_access_token(token: str):
+    """Decodes the access token and returns the user id."""
+    payload = decode_access_token_claims(token)
+    token_data = schemas.TokenData(id=str(payload.get("user_id")))
     return token_data.id
 
 
@@ -134,58 +151,18 @@ def get_user_session(token: str = Depends(oauth2_scheme)):
     return payload
 
 
-def is_token_blacklisted(db: Session, token: str) -> bool:
-    """Checks if a token is in the blacklist."""
-    return (
-        db.query(models.TokenTable)
-        .filter(
-            and_(
-                models.TokenTable.access_token == token,
-                models.TokenTable.status == False,
-            )  # noqa: E712
-        )
-        .first()
-        is not None
-    )
-
-
-def invalidate_token(token: schemas.TokenSchema, db: Session):
-    """
-    Invalidates an access token by setting its status to False in the database.
-
-    Args:
-        token (str): The token to invalidate.
-        db (Session): Database session.
-
-    Raises:
-        HTTPException: If the token is already invalidated or not found.
-    """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    decode_access_token(token.access_token, credentials_exception, db)
-
-    token_entry = (
-        db.query(models.TokenTable)
-        .filter(
-            and_(
-                models.TokenTable.access_token == token.access_token,
-                models.TokenTable.status == True,  # noqa: E712
-            )
-        )
-        .first()
-    )
-
-    if not token_entry:
+def get_firebase_user_from_token(
+    token: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)]
+) -> dict | None:
+    """Uses bearer token to identify Firebase user ID"""
+    try:
+        if not token:
+            raise ValueError("No token provided")
+        user = TokenService.verify_firebase_token(token.credentials)
+        return user
+    except Exception as e:
         raise HTTPException(
-            status_code=404, detail="Token not found or already invalidated"
-        )
-
-    # Invalidate the token
-    token_entry.status = False
-    db.commit()
-    db.refresh(token_entry)
-    return {"message": "Token invalidated successfully"}
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not logged in or Invalid credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from e
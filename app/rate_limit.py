@@ -1,12 +1,164 @@
-from fastapi import status
+import threading
+import time
+from dataclasses import dataclass
+
+from cachetools import TLRUCache
+from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
+from limits.storage import Storage, storage_from_string
+from limits.storage.registry import SCHEMES
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
+from app.config import settings
+from app.oauth2 import decode_access_token_claims
 from app.schemas import ErrorDetails, ErrorResponse, MetaData
 
-limiter = Limiter(key_func=get_remote_address)
+
+def get_client_address(request: Request) -> str:
+    """
+    Client address behind the configured number of trusted proxies. Each
+    proxy appends the address it received the request from to
+    X-Forwarded-For, so the client is that many entries from the end. With
+    no trusted proxies (the default) the header is client controlled and
+    ignored, deployments behind an ingress set rate_limit_trusted_proxies
+    """
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or settings.rate_limit_trusted_proxies < 1:
+        return get_remote_address(request)
+    addresses = [address.strip() for address in forwarded.split(",")]
+    return addresses[-min(settings.rate_limit_trusted_proxies, len(addresses))]
+
+
+def rate_limit_key(request: Request) -> str:
+    """Budget per authenticated user, per client address otherwise"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{decode_access_token_claims(token)['user_id']}"
+        except HTTPException:
+            pass
+    return f"ip:{get_client_address(request)}"
+
+
+@dataclass
+class LocalCounter:
+    expires_at: float
+    shared: int = 0
+    pending: int = 0
+    synced_at: float = 0.0
+
+
+class BatchedStorage(Storage):
+    """
+    Counters kept in process and pushed to a shared storage in batches,
+    "batched+redis://host" wraps "redis://host". A key is synchronised on its
+    first hit, then every rate_limit_sync_hits hits or rate_limit_sync_ms,
+    whichever comes first, so each replica overshoots a limit by at most one
+    batch. Only fixed-window strategies are supported, see limiter_strategy
+    """
+
+    STORAGE_SCHEME = [f"batched+{scheme}" for scheme in list(SCHEMES)]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions, **options)
+        self.shared = storage_from_string(uri.split("+", 1)[1], **options)
+        self._counters = TLRUCache(
+            settings.rate_limit_local_keys,
+            ttu=lambda _key, counter, _now: counter.expires_at,
+            timer=time.time,
+        )
+        self._counters_lock = threading.Lock()
+
+    @property
+    def base_exceptions(self):
+        return self.shared.base_exceptions
+
+    def incr(
+        self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1
+    ) -> int:
+        now = time.time()
+        with self._counters_lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = LocalCounter(expires_at=now + expiry)
+                self._counters[key] = counter
+            counter.pending += amount
+            if (
+                counter.pending < settings.rate_limit_sync_hits
+                and (now - counter.synced_at) * 1000 < settings.rate_limit_sync_ms
+            ):
+                return counter.shared + counter.pending
+            flushed, counter.pending, counter.synced_at = counter.pending, 0, now
+
+        shared = self.shared.incr(key, expiry, elastic_expiry, flushed)
+        with self._counters_lock:
+            counter.shared = max(counter.shared, shared)
+            return counter.shared + counter.pending
+
+    def get(self, key: str) -> int:
+        with self._counters_lock:
+            counter = self._counters.get(key)
+            if counter is not None:
+                return counter.shared + counter.pending
+        return self.shared.get(key)
+
+    def get_expiry(self, key: str) -> int:
+        with self._counters_lock:
+            counter = self._counters.get(key)
+            if counter is not None:
+                return int(counter.expires_at)
+        return self.shared.get_expiry(key)
+
+    def check(self) -> bool:
+        return self.shared.check()
+
+    def reset(self):
+        with self._counters_lock:
+            self._counters.clear()
+        return self.shared.reset()
+
+    def clear(self, key: str):
+        with self._counters_lock:
+            self._counters.pop(key, None)
+        self.shared.clear(key)
+
+
+FIXED_WINDOW_STRATEGIES = ("fixed-window", "fixed-window-elastic-expiry")
+
+
+def limiter_strategy() -> str:
+    """
+    Strategy for the configured storage. Batched storage only keeps fixed
+    windows, so it replaces the default strategy and rejects any other one
+    set explicitly
+    """
+    strategy = settings.rate_limit_strategy
+    if (
+        not settings.rate_limit_storage_uri.startswith("batched+")
+        or strategy in FIXED_WINDOW_STRATEGIES
+    ):
+        return strategy
+    if "rate_limit_strategy" in settings.model_fields_set:
+        raise ValueError(
+            f"Rate limit strategy '{strategy}' is not supported by batched "
+            f"storage, use one of {', '.join(FIXED_WINDOW_STRATEGIES)}"
+        )
+    return "fixed-window"
+
+
+def build_limiter() -> Limiter:
+    return Limiter(
+        key_func=rate_limit_key,
+        storage_uri=settings.rate_limit_storage_uri,
+        strategy=limiter_strategy(),
+        enabled=settings.rate_limit_enabled,
+        in_memory_fallback_enabled=True,
+    )
+
+
+limiter = build_limiter()
 
 
 async def rate_limit_handler(request, exc: RateLimitExceeded):
@@ -3,7 +3,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from fastapi import HTTPException, Request, status
+import orjson
+from fastapi import HTTPException, Request, Response, status
 
 from app.schemas.schemas import ErrorDetails, SuccessResponse, InternalResponse
 
@@ -19,6 +20,27 @@ class SuccessHTTPResponse:
             },
         )
 
+    def encoded_response(
+        message: str, encoded_data: bytes, request: Request = None, headers: dict = None
+    ) -> Response:
+        """Same body as success_response around data already encoded to JSON"""
+        meta = {
+            "request_id": request.headers.get("request-id", "default_request_id"),
+            "client": request.headers.get("client-type", "unknown"),
+        }
+        content = b"".join(
+            (
+                b'{"status":"success","message":',
+                orjson.dumps(message),
+                b',"data":',
+                encoded_data,
+                b',"meta":',
+                orjson.dumps(meta),
+                b"}",
+            )
+        )
+        return Response(content=content, media_type="application/json", headers=headers)
+
 class ErrorHTTPResponse:
     def error_response(type: str, status_code: status, message: str, details: str):
         raise HTTPException(
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from enum import Enum
 
 from app.schemas.schemas import ResponseStatus
@@ -18,12 +19,15 @@ from app.schemas.schemas import (ResponseStatus,
                                  RecoveryCodeInput)
 from app.config import settings
 from app.database.connection import get_db
+from app.rate_limit import limiter
 from app.utils import email_utils, utils, fetch_data_utils
 from app.responses import ErrorHTTPResponse, SuccessHTTPResponse, InternalResponse
 from app.services.auth_service import AuthService
+from app.services.revocation_service import RevocationService
+from app.templates.template_service import TEMPLATES_DIR
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
-templates = Jinja2Templates(directory="app/templates")
+templates = Jinja2Templates(directory=TEMPLATES_DIR)
 utc = pytz.UTC
 
 class AuthTypes(Enum):
@@ -38,6 +42,7 @@ class AuthTypes(Enum):
     response_model=SuccessResponse,
     status_code=status.HTTP_202_ACCEPTED,
 )
+@limiter.limit(settings.rate_limit_login)
 def login(
     user_credentials: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
@@ -105,33 +110,19 @@ def logout(
         schemas.SuccessResponse: Success JSON
     """
 
-    # token_entry = (
-    #     db.query(TokenTable)
-    #     .filter(
-    #         and_(
-    #             TokenTable.access_token == token,
-    #             TokenTable.status == True,  # noqa: E712
-    #         )
-    #     )
-    #     .first()
-    # )
-
-    # if not token_entry:
-    #     raise ErrorHTTPResponse.error_response(
-    #         AuthTypes.LOGOUT, 
-    #         status.
-    #         message="Invalid Credentials",
-    #         details="User not found")
-        
-    #     raise HTTPException(
-    #         status_code=status.HTTP_400_BAD_REQUEST,
-    #         detail=ErrorDetails(
-    #             type="Logout", message="Token not found or invalidated", details=None
-    #         ).model_dump(),
-    #     )
-
-    # db.delete(token_entry)
-    # db.commit()
+    claims = oauth2.decode_access_token_claims(token)
+    result = RevocationService.revoke(
+        db,
+        claims["jti"],
+        int(claims["user_id"]),
+        datetime.fromtimestamp(claims["exp"], timezone.utc),
+    )
+    if result.status == ResponseStatus.ERROR:
+        raise ErrorHTTPResponse.error_response(
+            AuthTypes.LOGOUT, 
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            message=result.message,
+            details=None)
 
     return SuccessResponse(
         status="success",
@@ -147,12 +138,13 @@ def logout(
 @router.post(
     "/register", response_model=SuccessResponse, status_code=status.HTTP_200_OK
 )
+@limiter.limit(settings.rate_limit_auth_email)
 def register_user(
     user_credentials: RegisterInput,
     db: Session = Depends(get_db),
     request: Request = None,
 ):
-    result: InternalResponse = AuthService.validate_register(db, user_credentials)
+    result: InternalResponse = AuthService.validate_register(user_credentials)
     if result.status == ResponseStatus.ERROR:
         raise ErrorHTTPResponse.error_response(
             AuthTypes.REGISTER, 
@@ -169,15 +161,28 @@ def register_user(
             details=None)  
     user_credentials.password = result.message
 
-    code_response = email_utils.send_auth_code(db, user_credentials.email)
+    # The account, its email and its code are committed together by store_code,
+    # a failure on the way leaves nothing behind and the user can retry
+    result = AuthService.add_user(db, user_credentials, commit=False)
+    if result.status == ResponseStatus.ERROR:
+        raise ErrorHTTPResponse.error_response(
+            AuthTypes.REGISTER, 
+            status.HTTP_409_CONFLICT,
+            message=result.message,
+            details=None) 
+
+    code_response = email_utils.send_auth_code(
+        db, user_credentials.email, commit=False)
     if code_response.status == ResponseStatus.ERROR:
+        db.rollback()
         raise ErrorHTTPResponse.error_response(
             AuthTypes.REGISTER, 
             status.HTTP_500_INTERNAL_SERVER_ERROR,
-            message=result.message,
+            message=code_response.message,
             details=None) 
         
-    result = AuthService.add_user(db, code_response.message, user_credentials)
+    result = fetch_data_utils.store_code(
+        db, user_credentials.email, code_response.message)
     if result.status == ResponseStatus.ERROR:
         raise ErrorHTTPResponse.error_response(
             AuthTypes.REGISTER, 
@@ -193,6 +198,7 @@ def register_user(
 
 
 @router.get("/verify-code", status_code=status.HTTP_200_OK)
+@limiter.limit(settings.rate_limit_verify_code)
 def verify_code(
     token: str, db: Session = Depends(get_db), request: Request = None
 ) -> SuccessResponse:
@@ -270,6 +276,7 @@ def verify_code(
     response_model=SuccessResponse,
     status_code=status.HTTP_200_OK,
 )
+@limiter.limit(settings.rate_limit_auth_email)
 def refresh_code(
     email_refresh: CodeValidationInput,
     db: Session = Depends(get_db),
@@ -310,7 +317,8 @@ def refresh_code(
             ).model_dump(),
         )
         
-    result = email_utils.resend_auth_code(db, email_refresh.code)
+    result = email_utils.resend_auth_code(
+        db, email_refresh.code, email_refresh.email)
     if result.status == ResponseStatus.ERROR:
         raise HTTPException(
             status_code=status.HTTP_406_NOT_ACCEPTABLE,
@@ -355,6 +363,7 @@ def refresh_code(
     response_model=SuccessResponse,
     status_code=status.HTTP_200_OK,
 )
+@limiter.limit(settings.rate_limit_auth_email)
 def password_recovery_code(
     user_credentials: RecoveryCodeInput,
     db: Session = Depends(get_db),
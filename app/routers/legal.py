@@ -2,9 +2,10 @@ from fastapi import APIRouter, Request
 from fastapi.templating import Jinja2Templates
 
 from app.config import settings
+from app.templates.template_service import TEMPLATES_DIR
 
 router = APIRouter(prefix="/legal", tags=["Terms and conditions"])
-templates = Jinja2Templates(directory="app/templates")
+templates = Jinja2Templates(directory=TEMPLATES_DIR)
 
 
 @router.get("/terms-of-service/")
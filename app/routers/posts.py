@@ -1,19 +1,25 @@
+from datetime import datetime
+from typing import Optional
+
 import pytz
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import (APIRouter, Depends, HTTPException, Query, Request, Response,
+                     status)
 from sqlalchemy import and_, desc, or_
 from sqlalchemy.orm import Session
 from app.schemas.schemas import ResponseStatus
 from app.schemas.schemas import InternalResponse
 
 import app.models as models
+from app.config import settings
 from app.database.connection import get_db
 from app.oauth2 import get_user_session
 from app.schemas import schemas
 from app.services.event_service import EventDeleteService
+from app.services.notification_service import NotificationService
 from app.services.retrieve_service import RetrieveService
 from app.responses import SuccessHTTPResponse, ErrorHTTPResponse
 from app.templates.template_service import HTMLTemplates
-from app.utils import email_utils, fetch_data_utils
+from app.utils import fetch_data_utils
 from app.services.post_service import (
     HeaderPostsService, 
     LinesPostService, 
@@ -62,16 +68,39 @@ async def create_header(
 )
 async def create_lines(
     posting_data: schemas.NewPostLinesInput,
+    db: Session = Depends(get_db),
     user_id: int = Depends(get_user_session),
     request: Request = None,
+    response: Response = None,
+    page: int = Query(1, ge=1),
+    page_size: Optional[int] = Query(None, ge=1, le=settings.preview_max_page_size),
 ):
+    """
+    Generate the lines of a header and keep them as a draft to confirm.
+
+    Without page_size the data is the packed lines, as before drafts. With
+    page_size it is `{"page", "page_size", "total", "lines", "draft_id"}`.
+    The draft id is also sent in the X-Draft-Id header, and every page of
+    one generation returns the same id.
+    """
     lines = LinesPostService(user_id, posting_data)
-    result: InternalResponse = await lines.process_lines()
+    result: InternalResponse = await lines.process_lines(page, page_size)
     if result.status == ResponseStatus.ERROR:
         raise ErrorHTTPResponse.error_response(
             "CreateLines", status.HTTP_500_INTERNAL_SERVER_ERROR, result.message, None
         )
     generated_lines: InternalResponse = result.message.message
+    
+    draft: InternalResponse = fetch_data_utils.save_draft(
+        db, user_id, posting_data.header_id, lines.draft_lines()
+    )
+    if draft.status == ResponseStatus.ERROR:
+        raise ErrorHTTPResponse.error_response(
+            "CreateLines", status.HTTP_404_NOT_FOUND, draft.message, None
+        )
+    response.headers["X-Draft-Id"] = str(draft.message)
+    if page_size is not None:
+        generated_lines["draft_id"] = draft.message
     return SuccessHTTPResponse.success_response("CreateLines", generated_lines, request)
 
 @router.post(
@@ -85,8 +114,18 @@ def confirm_post(
     user_id: int = Depends(get_user_session),
     request: Request = None,
 ):
-    post = PostConfirmation(user_id, posting_data)
-    result: InternalResponse = post.add_post(db)
+    if posting_data.draft_id is not None:
+        result: InternalResponse = fetch_data_utils.confirm_draft(
+            db, user_id, posting_data.header_id, posting_data.draft_id
+        )
+    elif posting_data.lines is not None:
+        result: InternalResponse = fetch_data_utils.add_post(
+            db, user_id, posting_data.header_id, posting_data.lines
+        )
+    else:
+        raise ErrorHTTPResponse.error_response(
+            "ConfirmPost", status.HTTP_400_BAD_REQUEST, "Missing draft id", None
+        )
     if result.status == ResponseStatus.ERROR:
         raise ErrorHTTPResponse.error_response(
             "ConfirmPost", status.HTTP_500_INTERNAL_SERVER_ERROR, result.message, None
@@ -103,13 +142,14 @@ def nearby_events(
     lon: float,
     radius: int = 10,
     unit: int = 0,
+    until: Optional[datetime] = None,
     db: Session = Depends(get_db),
     request: Request = None,
     _: int = Depends(get_user_session),
 ):
 
     events_within_area, reference_point = RetrieveService.get_events_within_area(
-        db, lat, lon, radius, unit
+        db, lat, lon, radius, unit, until
     )
 
     if events_within_area.get("status") == "error":
@@ -163,7 +203,12 @@ def owned_events(
 
     fetched_headers = (
         db.query(models.EventsHeaders)
-        .filter(and_(models.EventsHeaders.owner_id == user_id))
+        .filter(
+            and_(
+                models.EventsHeaders.owner_id == user_id,
+                models.EventsHeaders.status != schemas.HeaderStatus.DELETED,
+            )
+        )
         .all()
     )
     header_ids = [item.id for item in fetched_headers]
@@ -252,7 +297,7 @@ def delete_event(
             ).model_dump(),
         )
 
-    # NOTIFY SUBS USERS VIA EMAIL THAT THE EVENT HAS BEEN REMOVED
+    # Subscribers are notified in bulk by the purge worker once the event is removed
     return schemas.SuccessResponse(
         status="success",
         message=result.get("details"),
@@ -320,7 +365,7 @@ def confirm_update(
             result.message, None
         )
     updated_changes = result.message
-    result = email_utils.send_updated_events(db, user_id, updated_changes)
+    result = NotificationService.notify_updated(db, user_id, updated_changes)
     if result.status == ResponseStatus.ERROR:
         raise ErrorHTTPResponse.error_response(
             "ConfirmUpdate", 
@@ -1,16 +1,19 @@
+from typing import Optional
+
 import pytz
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Header, Request, Response, status
 from sqlalchemy.orm import Session
 from enum import Enum
 
 import app.models as models
+from app.config import settings
 from app.database.connection import get_db
 from app.oauth2 import get_user_session
 from app.rate_limit import limiter
+from app.services.taxonomy_service import TaxonomyService, etag_matches
 from app.schemas import schemas
-from app.utils import maps_utils, fetch_data_utils
+from app.utils import maps_utils
 
-from app.schemas.schemas import ResponseStatus, InternalResponse, SuccessResponse
 from app.responses import SuccessHTTPResponse, ErrorHTTPResponse
 
 router = APIRouter(prefix="/recall", tags=["Configuration recall"])
@@ -27,22 +30,27 @@ class UsersTypes(Enum):
 def get_categories(
     db: Session = Depends(get_db),
     _: int = Depends(get_user_session),
+    if_none_match: Optional[str] = Header(None),
     request: Request = None,
 ) -> schemas.SuccessResponse:
     
-    result: InternalResponse = fetch_data_utils.get_categories(db)
-    if result.status == ResponseStatus.ERROR:
+    categories = TaxonomyService.get_categories(db)
+    if etag_matches(if_none_match, categories.etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": categories.etag})
+    if not categories.data:
         raise ErrorHTTPResponse.error_response(
             UsersTypes.CAT, 
             status.HTTP_404_NOT_FOUND,
-            message=result.message,
-            details="User not found")
+            message="Not found",
+            details=None)
     
-    categories = result.message
-    return SuccessHTTPResponse.success_response(
-        UsersTypes.CAT, 
-        categories, 
-        request)
+    return SuccessHTTPResponse.encoded_response(
+        UsersTypes.CAT.value,
+        categories.body,
+        request,
+        headers={"ETag": categories.etag})
 
 
 @router.get(
@@ -52,21 +60,27 @@ def get_tags(
     category_id: int,
     db: Session = Depends(get_db),
     _: int = Depends(get_user_session),
+    if_none_match: Optional[str] = Header(None),
     request: Request = None,
 ) -> schemas.SuccessResponse:
 
-    result: InternalResponse = fetch_data_utils.get_tags(db, category_id)
-    if result.status == ResponseStatus.ERROR:
+    tags = TaxonomyService.get_tags(db, category_id)
+    if tags is None:
         raise ErrorHTTPResponse.error_response(
             UsersTypes.TAGS, 
             status.HTTP_404_NOT_FOUND,
-            message=result.message,
+            message="Not found",
             details=None)
-        
-    return SuccessHTTPResponse.success_response(
-        UsersTypes.TAGS, 
-        result.message, 
-        request)
+    if etag_matches(if_none_match, tags.etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": tags.etag})
+
+    return SuccessHTTPResponse.encoded_response(
+        UsersTypes.TAGS.value,
+        tags.body,
+        request,
+        headers={"ETag": tags.etag})
 
 
 @router.get(
@@ -74,7 +88,7 @@ def get_tags(
     status_code=status.HTTP_200_OK,
     response_model=schemas.SuccessResponse,
 )
-@limiter.limit("10/minute")
+@limiter.limit(settings.rate_limit_geocoding)
 async def get_address_suggestions(
     input: str, _: int = Depends(get_user_session), request: Request = None
 ) -> schemas.SuccessResponse:
@@ -11,7 +11,6 @@ from app.responses import SuccessHTTPResponse, ErrorHTTPResponse
 
 from app.services.user_service import UserService
 from app.models import Users
-from app.config import get_firebase_user_from_token
 from app.database.connection import get_db
 from app.utils import email_utils, utils
 
@@ -4,13 +4,15 @@ from .schemas import (CodeValidationInput, DeletePostInput, ErrorDetails,
                       NewPostInput, RecoveryCodeInput, RegisterInput,
                       SuccessResponse, UpdatePostInput, InternalResponse, 
                       ResponseStatus, NewPostLinesInput, NewPostLinesConfirmInput, 
-                      UpdatePostConfirmInput)
+                      UpdatePostConfirmInput, HeaderStatus, SourceTable)
 from .token import TokenData, TokenSchema
 
 __all__ = [
     "TokenData",
     "TokenSchema",
     "ResponseStatus",
+    "HeaderStatus",
+    "SourceTable",
     "SuccessResponse",
     "ErrorResponse",
     "EventLines",
@@ -1,7 +1,14 @@
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from datetime import datetime, timezone
+from typing import Annotated, Any, List, Literal, Optional, Union
 
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, BeforeValidator, Field, field_validator, model_validator
+
+
+def as_list(value: Any) -> Any:
+    """Accept a single item where a list is expected"""
+    if value is None or isinstance(value, list):
+        return value
+    return [value]
 
 
 class Context(BaseModel):
@@ -49,14 +56,27 @@ class RateDetails(BaseModel):
 
 
 class EventLines(BaseModel):
+    """Event line, dates are normalised to UTC (naive dates are taken as UTC)"""
 
     start: datetime
     end: datetime
-    rate: Union[RateDetails, List[RateDetails]]
+    rate: Annotated[List[RateDetails], BeforeValidator(as_list), Field(min_length=1)]
     isPublic: bool
-    capacity: Optional[int] = 0
+    capacity: Optional[int] = Field(0, ge=0)
     invited: Optional[List[int]] = None
 
+    @field_validator("start", "end")
+    def normalise_timezone(cls, value: datetime):
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+    @model_validator(mode="after")
+    def end_after_start(self):
+        if self.end <= self.start:
+            raise ValueError("Line end must be after its start")
+        return self
+
 
 class UpdateDetails(BaseModel):
 
@@ -71,8 +91,8 @@ class UpdateChanges(BaseModel):
 
 class UpdateConfirmChanges(BaseModel):
 
-    status: str
-    source: str
+    status: Literal["success", "error"]
+    source: Literal["events_headers", "events_lines", "rates"]
     message: Union[str, None]
     header_id: int
     record_id: int
@@ -80,6 +100,21 @@ class UpdateConfirmChanges(BaseModel):
     old_value: Any
     new_value: Any
 
+
+class HeaderConfirmChanges(UpdateConfirmChanges):
+
+    source: Literal["events_headers"]
+
+
+class LinesConfirmChanges(UpdateConfirmChanges):
+
+    source: Literal["events_lines"]
+
+
+class RatesConfirmChanges(UpdateConfirmChanges):
+
+    source: Literal["rates"]
+
 class Deletes(BaseModel):
 
     id: int
@@ -1,16 +1,25 @@
 from datetime import datetime
-from enum import Enum
-from typing import Any, List, Optional, Tuple, Union
+from enum import Enum, IntEnum
+from typing import Annotated, Any, List, Literal, Optional, Tuple, Union
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, BeforeValidator, EmailStr, Field
+
+from app.config import settings
 
 from .bases import (
     Deletes, 
     ErrorDetails, 
     EventLines, 
+    HeaderConfirmChanges, 
+    LinesConfirmChanges, 
     MetaData, 
+    RatesConfirmChanges, 
     TableChanges, 
-    UpdateConfirmChanges)
+    as_list)
+
+# Single lines are accepted and wrapped in a list
+LinesInput = Annotated[List[EventLines], BeforeValidator(as_list), Field(min_length=1)]
+Weekday = Annotated[int, Field(ge=0, le=6)]
 
 
 # RESPONSES
@@ -18,6 +27,23 @@ class ResponseStatus(str, Enum):
     SUCCESS = "success"
     ERROR = "error"
     WARNING = "warning"
+
+class HeaderStatus(IntEnum):
+    """Event header status, ids match the seeded status_codes table"""
+    UNASSIGNED = -1
+    NEW = 0
+    STAGING = 1
+    REVISION = 2
+    APPROVED = 3
+    INACTIVE = 4
+    REPORTED = 5
+    DELETED = 6
+
+class SourceTable(Enum):
+    """Tables tracked by the post update flow"""
+    HEADER = "events_headers"
+    LINES = "events_lines"
+    RATES = "rates"
     
 class SuccessResponse(BaseModel):
     """Common success request response body"""
@@ -86,19 +112,20 @@ class NewPostHeaderInput(BaseModel):
 class NewPostLinesInput(BaseModel):
     header_id: int
     user_timezone: str
-    line: Optional[
-        Union[
-            EventLines, 
-            List[EventLines]
-            ]
-        ] = None
+    line: LinesInput
     repeat: bool
     custom_option_selected: bool
-    when_to: Optional[int] = (
-        None  # Possible values: 0, 1, 2, 3 (or 4) if custom_selected = true
+    when_to: Optional[Literal[0, 1, 2, 3, 4]] = Field(
+        None,
+        description="Daily, weekly, monthly, weekdays or weekends repetition.",
     )
-    occurrences: Optional[int] = None
-    for_days: Optional[Tuple[int, ...]] = Field(
+    occurrences: Optional[int] = Field(
+        None,
+        ge=1,
+        le=settings.max_occurrences,
+        description="Number of repetitions, capped by the server.",
+    )
+    for_days: Optional[Tuple[Weekday, ...]] = Field(
         None,
         description="Optional array of days (0-6, where 0=Monday, 6=Sunday) to repeat the event.",
     )
@@ -108,7 +135,8 @@ class NewPostLinesInput(BaseModel):
     
 class NewPostLinesConfirmInput(BaseModel):
     header_id: int
-    lines: Any
+    draft_id: Optional[int] = None
+    lines: Any = None
 
 class NewPostInput(BaseModel):
     """New posts"""
@@ -122,14 +150,20 @@ class NewPostInput(BaseModel):
     status: int
 
     user_timezone: str
-    line: Optional[Union[EventLines, List[EventLines]]] = None
+    line: LinesInput
     repeat: bool
     custom_option_selected: bool
-    when_to: Optional[int] = (
-        None  # Possible values: 0, 1, 2, 3 (or 4) if custom_selected = true
+    when_to: Optional[Literal[0, 1, 2, 3, 4]] = Field(
+        None,
+        description="Daily, weekly, monthly, weekdays or weekends repetition.",
+    )
+    occurrences: Optional[int] = Field(
+        None,
+        ge=1,
+        le=settings.max_occurrences,
+        description="Number of repetitions, capped by the server.",
     )
-    occurrences: Optional[int] = None
-    for_days: Optional[Tuple[int, ...]] = Field(
+    for_days: Optional[Tuple[Weekday, ...]] = Field(
         None,
         description="Optional array of days (0-6, where 0=Monday, 6=Sunday) to repeat the event.",
     )
@@ -146,7 +180,13 @@ class UpdatePostInput(BaseModel):
 class UpdatePostConfirmInput(BaseModel):
     """ Update post confirmation """
     
-    data: Union[List[List[UpdateConfirmChanges]], None] = None
+    data: Optional[
+        Tuple[
+            List[HeaderConfirmChanges], 
+            List[LinesConfirmChanges], 
+            List[RatesConfirmChanges]
+            ]
+        ] = None
 
 class DeletePostInput(BaseModel):
     """Delete post"""
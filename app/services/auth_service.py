@@ -1,14 +1,16 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
 from app.models import Users
-from app.utils import utils, time_utils, fetch_data_utils
-import random
-from string import digits
+from app.utils import utils, fetch_data_utils
+import secrets
 
 from app.responses import SystemResponse, InternalResponse
 from app.schemas.schemas import ResponseStatus, RegisterInput
 import inspect
 
+CODE_SPACE = 10 ** 6
+
 class AuthService:
     
     @staticmethod
@@ -24,19 +26,32 @@ class AuthService:
         if result.status == ResponseStatus.ERROR:
             return result
         
+        if utils.password_needs_update(user.password):
+            AuthService._rehash_password(db, user, password)
+        
         return SystemResponse.internal_response(
             ResponseStatus.SUCCESS, origin, user)
     
     @staticmethod
-    def validate_register(db:Session, user_credentials: RegisterInput):
+    def _rehash_password(db: Session, user: Users, password: str):
+        """Replace an outdated hash while the plain password is at hand"""
+        try:
+            result: InternalResponse = utils.hash_password(password)
+        except utils.HashingPoolSaturated:
+            return
+        if result.status == ResponseStatus.ERROR:
+            return
+        user.password = result.message
+        try:
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+    
+    @staticmethod
+    def validate_register(user_credentials: RegisterInput):
         origin = inspect.stack()[0].function
         status = ResponseStatus.ERROR
         
-        result: InternalResponse = fetch_data_utils.account_is_available(
-        db, user_credentials.email, user_credentials.username)
-        if result.status == ResponseStatus.ERROR:
-            return result
-        
         result = utils.is_password_strong(user_credentials.password)
         if result.status == ResponseStatus.ERROR:
             return SystemResponse.internal_response(
@@ -49,76 +64,56 @@ class AuthService:
             "All checks passed"
         )
         
-    def add_user(db: Session, code: int, user_credentials: RegisterInput) -> InternalResponse:
-        origin = inspect.stack()[0].function
-        result: InternalResponse = AuthService._create_user(user_credentials, code)
-        if result.status == ResponseStatus.ERROR:
-            return result
-        
-        result = AuthService._add_user(db, result.message)
-        if result.status == ResponseStatus.ERROR:
-            return result
-        
-        return SystemResponse.internal_response(
-            ResponseStatus.SUCCESS,
-            origin,
-            "User added to database")
-    
-    def _create_user(user_credentials: RegisterInput, code: int) -> InternalResponse:
-        origin = inspect.stack()[0].function
-        status = ResponseStatus.SUCCESS
-        
-        result: InternalResponse = time_utils.compute_expiration_time()
-        if result.status == ResponseStatus.ERROR:
-            return result
-        
-        try:
-            message = Users(
-            **user_credentials.model_dump(),
-            code=int(code),
-            code_expiration=result.message,
-            is_validated=False)
-        except Exception as exc:
-            status = ResponseStatus.ERROR
-            message = f"Error raised from database: {exc}"
-        
-        return SystemResponse.internal_response(status, origin, message)
-    
-    def _add_user(db: Session, new_user: Users) -> InternalResponse:
-        message = ""
-        origin = inspect.stack()[0].function
-        status = ResponseStatus.SUCCESS
-        try:
-            db.add(new_user)
-            db.commit()
-            db.refresh(new_user)
-        except Exception as exc:
-            status = ResponseStatus.ERROR
-            message = f"Error raised from database: {exc}"
-            
-        return SystemResponse.internal_response(status, origin, message)
-    
     @staticmethod
-    def generate_code(db: Session) -> int:
-        """Generates unique random code
+    def add_user(
+        db: Session, user_credentials: RegisterInput, commit: bool = True
+    ) -> InternalResponse:
+        """Insert a pending account in one round trip. The case-insensitive
+        unique indexes on username and email reject taken accounts, so there
+        is no previous availability query to race with
 
         Args:
             db (Session): Database connection
+            user_credentials (RegisterInput): Account data, password hashed
+            commit (bool, optional): Commit the insert. Defaults to True.
 
         Returns:
-            int: Code
+            InternalResponse: New user id on success
         """
         origin = inspect.stack()[0].function
-        status = ResponseStatus.SUCCESS
         
-        while True:
-            validation_code = ""
-            validation_code = "".join(random.choices(digits, k=6))
-            if (
-                not db.query(Users)
-                .filter(and_(Users.code == validation_code))
-                .first()
-            ):  # noqa: E712
-                break
+        try:
+            user_id = db.execute(
+                pg_insert(Users)
+                .values(**user_credentials.model_dump(), is_validated=False)
+                .on_conflict_do_nothing()
+                .returning(Users.id)
+            ).scalar()
+            if commit:
+                db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, 
+                f"Error raised from database: {exc}")
+        
+        if user_id is None:
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, 
+                "Username or email already registered")
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, origin, user_id)
+    
+    @staticmethod
+    def generate_code() -> InternalResponse:
+        """Generates a random 6-digit code. Codes are only ever checked
+        together with their email, so they just need to be unpredictable
+        and never require a lookup to be unique
 
-        return SystemResponse.internal_response(status, origin, validation_code)
\ No newline at end of file
+        Returns:
+            InternalResponse: Code on success
+        """
+        origin = inspect.stack()[0].function
+        validation_code = f"{secrets.randbelow(CODE_SPACE):06d}"
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, origin, validation_code)
@@ -1,4 +1,7 @@
+from typing import Dict, Iterable, List
+
 from app.models import EventsHeaders
+from app.schemas import SourceTable
 
 class GenerateStructureService:
     
@@ -18,3 +21,79 @@ class GenerateStructureService:
             for column in header.__table__.columns} if header else None
         result.pop("geom", None)
         return result
+
+
+class ChangeSet:
+    """
+    Tracked changes indexed by source table and record, and grouped by
+    header for rendering. Every lookup is a dict access, so adding and
+    reading changes stays linear in the number of changes
+    """
+
+    def __init__(self, changes: Iterable[dict] = ()):
+        self._records: Dict[str, Dict[int, List[dict]]] = {
+            source.value: {} for source in SourceTable
+        }
+        self._headers: Dict[int, dict] = {}
+        for change in changes:
+            self.add(change)
+
+    def add(self, change: dict):
+        """
+        Index a change with source, header_id, record_id, field, old_value
+        and new_value keys
+        """
+        source, record_id = change["source"], change["record_id"]
+        self._records[source].setdefault(record_id, []).append(change)
+
+        header_data = self._headers.setdefault(
+            change["header_id"],
+            {SourceTable.HEADER.value: [], SourceTable.LINES.value: {}})
+        values = {
+            "field": change["field"],
+            "old_value": change["old_value"],
+            "new_value": change["new_value"],
+        }
+        if source == SourceTable.HEADER.value:
+            header_data[SourceTable.HEADER.value].append(values)
+            return
+
+        record = header_data[SourceTable.LINES.value].setdefault(
+            record_id, {"fields": [], SourceTable.RATES.value: []})
+        if source == SourceTable.LINES.value:
+            record["fields"].append(values)
+        else:
+            record[SourceTable.RATES.value].append({"rate_id": record_id, **values})
+
+    def record_ids(self, source: SourceTable) -> List[int]:
+        """Changed record ids of a table, in first-change order"""
+        return list(self._records[source.value])
+
+    def for_record(self, source: SourceTable, record_id: int) -> List[dict]:
+        """Changes of a single record"""
+        return self._records[source.value].get(record_id, [])
+
+    def changes(self, source: SourceTable) -> List[dict]:
+        """Every change of a table"""
+        return [
+            change
+            for record in self._records[source.value].values()
+            for change in record
+        ]
+
+    def by_header(self) -> List[dict]:
+        """
+        Changes grouped as [{header_id: {events_headers: [...],
+        events_lines: {record_id: {fields: [...], rates: [...]}}}}]
+        """
+        return [
+            {header_id: header_data}
+            for header_id, header_data in self._headers.items()
+        ]
+
+    def __len__(self) -> int:
+        return sum(
+            len(record)
+            for records in self._records.values()
+            for record in records.values()
+        )
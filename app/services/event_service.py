@@ -1,11 +1,12 @@
 from datetime import datetime
 from typing import List, Union
 
-from sqlalchemy import and_, func
+from sqlalchemy import and_, delete, func
+from sqlalchemy import update as sql_update
 from sqlalchemy.orm import Session
 
 from app.models import EventsHeaders, EventsLines, Rates
-from app.schemas import DeletePostInput, NewPostInput, RateDetails
+from app.schemas import DeletePostInput, HeaderStatus, NewPostInput, RateDetails
 from app.schemas.bases import UpdateChanges
 from app.services.repeater_service import (select_repeater_custom_mode,
                                            select_repeater_single_mode)
@@ -28,7 +29,13 @@ class EventUpdateService:
         row, updates = [item.id for item in changes], [item.update for item in changes]
         fetched_record = (
             db.query(EventsHeaders)
-            .filter(and_(EventsHeaders.owner_id == user_id, EventsHeaders.id == row[0]))
+            .filter(
+                and_(
+                    EventsHeaders.owner_id == user_id,
+                    EventsHeaders.id == row[0],
+                    EventsHeaders.status != HeaderStatus.DELETED,
+                )
+            )
             .first()
         )
 
@@ -271,7 +278,11 @@ class EventUpdateService:
         fetched_header = (
             db.query(EventsHeaders)
             .join(EventsLines, EventsLines.header_id == EventsHeaders.id)
-            .filter(EventsLines.id.in_(row_ids), EventsHeaders.owner_id == user_id)
+            .filter(
+                EventsLines.id.in_(row_ids),
+                EventsHeaders.owner_id == user_id,
+                EventsHeaders.status != HeaderStatus.DELETED,
+            )
             .first()
         )
 
@@ -388,7 +399,11 @@ class EventUpdateService:
             db.query(EventsHeaders.id, EventsLines.id)
             .join(EventsLines, EventsLines.header_id == EventsHeaders.id)
             .join(Rates, Rates.line_id == EventsLines.id)
-            .filter(Rates.id.in_(row_ids), EventsHeaders.owner_id == user_id)
+            .filter(
+                Rates.id.in_(row_ids),
+                EventsHeaders.owner_id == user_id,
+                EventsHeaders.status != HeaderStatus.DELETED,
+            )
             .all()
         )
 
@@ -536,82 +551,59 @@ class EventUpdateService:
 class EventDeleteService:
     @staticmethod
     def delete_events(db: Session, delete_input: DeletePostInput, user_id: int):
+        """
+        Delete headers, lines or rates owned by the user in a single statement.
+        Headers are only flagged as deleted, PurgeService removes them and
+        their children later through the ON DELETE CASCADE constraints
+        """
         delete_ids = [item.id for item in delete_input.deletes]
         if delete_input.table == 0:
-            fetched_records = (
-                db.query(EventsHeaders)
-                .filter(
-                    and_(
-                        EventsHeaders.id.in_(delete_ids),
-                        EventsHeaders.owner_id == user_id,
-                    )
+            statement = (
+                sql_update(EventsHeaders)
+                .where(
+                    EventsHeaders.id.in_(delete_ids),
+                    EventsHeaders.owner_id == user_id,
+                    EventsHeaders.status != HeaderStatus.DELETED,
                 )
-                .all()
+                .values(status=HeaderStatus.DELETED)
             )
-            if not fetched_records:
-                return {"status": "error", "details": "Header record not found"}
-            for header in fetched_records:
-                db.delete(header)
-            db.commit()
-            return {
-                "status": "success",
-                "details": (
-                    f"Headers {delete_ids} deleted"
-                    if len(delete_ids) > 1
-                    else f"Header {delete_ids} deleted"
-                ),
-            }
-
+            label, not_found = "Header", "Header record not found"
         elif delete_input.table == 1:
-            fetched_records_with_header = (
-                db.query(EventsLines, EventsHeaders)
-                .join(EventsHeaders)
-                .filter(
-                    EventsLines.id.in_(delete_ids), EventsHeaders.owner_id == user_id
-                )
-                .all()
+            statement = delete(EventsLines).where(
+                EventsLines.id.in_(delete_ids),
+                EventsLines.header_id == EventsHeaders.id,
+                EventsHeaders.owner_id == user_id,
+                EventsHeaders.status != HeaderStatus.DELETED,
             )
+            label, not_found = "Line", "Lines record not found"
+        else:
+            statement = delete(Rates).where(
+                Rates.id.in_(delete_ids),
+                Rates.line_id == EventsLines.id,
+                EventsLines.header_id == EventsHeaders.id,
+                EventsHeaders.owner_id == user_id,
+                EventsHeaders.status != HeaderStatus.DELETED,
+            )
+            label, not_found = "Rate", "Rates records not found"
 
-            if not fetched_records_with_header:
-                return {"status": "error", "details": "Lines record not found"}
-
-            lines_to_delete = [
-                line for line, _ in fetched_records_with_header
-            ]  # (HEADER, LINE)
-            for line in lines_to_delete:
-                db.delete(line)
-            db.commit()
-            return {
-                "status": "success",
-                "details": (
-                    f"Lines {delete_ids} deleted"
-                    if len(delete_ids) > 1
-                    else f"Line {delete_ids} deleted"
-                ),
-            }
-
-        fetched_records_with_header = (
-            db.query(Rates, EventsLines, EventsHeaders)
-            .join(EventsLines, EventsLines.header_id == EventsHeaders.id)
-            .join(Rates, Rates.line_id == EventsLines.id)
-            .filter(Rates.id.in_(delete_ids), EventsHeaders.owner_id == user_id)
+        deleted_ids = (
+            db.execute(
+                statement.returning(statement.table.c.id),
+                execution_options={"synchronize_session": False},
+            )
+            .scalars()
             .all()
         )
+        if not deleted_ids:
+            db.rollback()
+            return {"status": "error", "details": not_found}
 
-        if not fetched_records_with_header:
-            return {"status": "error", "details": "Rates records not found"}
-
-        lines_to_delete = [
-            rate for rate, _, _ in fetched_records_with_header
-        ]  # (RATES, LINE, HEADER)
-        for line in lines_to_delete:
-            db.delete(line)
         db.commit()
         return {
             "status": "success",
             "details": (
-                f"Rates {delete_ids} deleted"
+                f"{label}s {delete_ids} deleted"
                 if len(delete_ids) > 1
-                else f"Rate {delete_ids} deleted"
+                else f"{label} {delete_ids} deleted"
             ),
         }
@@ -0,0 +1,164 @@
+import inspect
+from typing import Dict, FrozenSet, List, Tuple
+
+from jinja2 import TemplateNotFound
+from sqlalchemy import select, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import EventsHeaders, Subscriptions, Users
+from app.responses import InternalResponse, SystemResponse
+from app.schemas import ResponseStatus
+from app.templates.template_service import EmailTemplates, HTMLTemplates
+from app.utils import email_utils
+
+Recipients = Dict[str, Tuple[str, set]]
+
+
+class NotificationService:
+    @staticmethod
+    def get_recipients(db: Session, header_ids: List[int]) -> InternalResponse:
+        """
+        Resolve the owner and the subscribers of several headers in one query.
+        A user receiving news from many headers is returned once
+
+        Args:
+            db (Session): DB Session
+            header_ids (List[int]): Affected headers
+
+        Returns:
+            InternalResponse: {email: (full_name, {header_id, ...})} on success
+        """
+        origin = inspect.stack()[0].function
+
+        owners = (
+            select(EventsHeaders.id, Users.email, Users.full_name)
+            .join(Users, Users.id == EventsHeaders.owner_id)
+            .where(
+                EventsHeaders.id.in_(header_ids),
+                Users.is_validated == True,  # noqa: E712
+            )
+        )
+        subscribers = (
+            select(Subscriptions.event_id, Users.email, Users.full_name)
+            .join(Users, Users.id == Subscriptions.user_id)
+            .where(
+                Subscriptions.event_id.in_(header_ids),
+                Users.is_validated == True,  # noqa: E712
+            )
+        )
+        try:
+            rows = db.execute(union_all(owners, subscribers)).all()
+        except SQLAlchemyError as e:
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, f"Recipients not found: {str(e)}"
+            )
+
+        recipients: Recipients = {}
+        for header_id, email, full_name in rows:
+            recipients.setdefault(email.lower(), (full_name, set()))[1].add(header_id)
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, origin, recipients
+        )
+
+    @staticmethod
+    def first_name(full_name: str) -> str:
+        return full_name.split(" ")[0]
+
+    @staticmethod
+    def notify_updated(db: Session, owner_id: int, changes: list) -> InternalResponse:
+        """
+        Queue one email per recipient of the confirmed changes. The summary of
+        each distinct set of headers is rendered once and shared by everyone
+        following exactly those headers
+
+        Args:
+            db (Session): DB Session
+            owner_id (int): Owner of the updated headers
+            changes (list): Changes grouped by header (see ChangeSet.by_header)
+
+        Returns:
+            InternalResponse: Number of queued emails on success
+        """
+        origin = inspect.stack()[0].function
+        subject = "Updated Activity"
+
+        groups = {header_id: group for group in changes for header_id in group}
+        result = NotificationService.get_recipients(db, list(groups))
+        if result.status == ResponseStatus.ERROR:
+            return result
+        recipients: Recipients = result.message
+
+        try:
+            template = EmailTemplates.get("event_changed.html")
+        except TemplateNotFound:
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, "Updated Event template not found"
+            )
+        logo = f"{settings.domain}/static/assets/images/logo_color.png"
+
+        summaries: Dict[FrozenSet[int], str] = {}
+        messages = []
+        for email, (full_name, header_ids) in recipients.items():
+            key = frozenset(header_ids)
+            if key not in summaries:
+                summaries[key] = HTMLTemplates.generate_event_changes_html(
+                    db, [groups[header_id] for header_id in sorted(key)], owner_id
+                )
+            html_content = template.render(
+                user_name=NotificationService.first_name(full_name),
+                event_details=summaries[key],
+                logo=logo,
+            )
+            messages.append((email, subject, html_content))
+
+        return email_utils.enqueue_emails(db, messages)
+
+    @staticmethod
+    def notify_deleted(
+        db: Session, notifications: List[Tuple[str, str, str]]
+    ) -> InternalResponse:
+        """
+        Queue one email per subscriber of removed events, listing every
+        removed event they followed
+
+        Args:
+            db (Session): DB Session
+            notifications (List[Tuple[str, str, str]]): (title, email, full_name)
+
+        Returns:
+            InternalResponse: Number of queued emails on success
+        """
+        origin = inspect.stack()[0].function
+        subject = "Removed Activity"
+
+        if not notifications:
+            return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, 0)
+        try:
+            template = EmailTemplates.get("event_deleted.html")
+        except TemplateNotFound:
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, "Deleted Event template not found"
+            )
+        logo = f"{settings.domain}/static/assets/images/logo_color.png"
+
+        recipients: Dict[str, Tuple[str, List[str]]] = {}
+        for title, email, full_name in notifications:
+            titles = recipients.setdefault(email.lower(), (full_name, []))[1]
+            if title not in titles:
+                titles.append(title)
+
+        messages = [
+            (
+                email,
+                subject,
+                template.render(
+                    user_name=NotificationService.first_name(full_name),
+                    event_title=", ".join(titles),
+                    logo=logo,
+                ),
+            )
+            for email, (full_name, titles) in recipients.items()
+        ]
+        return email_utils.enqueue_emails(db, messages)
@@ -0,0 +1,175 @@
+import asyncio
+import inspect
+import smtplib
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.connection import SessionLocal
+from app.models import EmailOutbox
+from app.responses import InternalResponse, SystemResponse
+from app.schemas import ResponseStatus
+from app.utils.email_utils import SMTPSession
+
+PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+
+
+class OutboxService:
+    @staticmethod
+    def backoff(attempts: int) -> timedelta:
+        """Exponential delay before retrying an email after a failed attempt"""
+        return timedelta(seconds=settings.email_backoff_seconds * 2 ** (attempts - 1))
+
+    @staticmethod
+    def claim_batch(db: Session, batch_size: int) -> InternalResponse:
+        """
+        Claim a batch of due emails. They move to sending with a lease and
+        the claim is committed, so no row lock or transaction stays open
+        while SMTP is contacted. Rows locked by another worker are skipped,
+        and a claim whose worker died is due again when its lease expires.
+
+        Args:
+            db (Session): DB Session
+            batch_size (int): Maximum number of claimed emails
+
+        Returns:
+            InternalResponse: Claimed (id, recipient, subject, html, attempts)
+            rows on success
+        """
+        origin = inspect.stack()[0].function
+        now = datetime.now(timezone.utc)
+
+        due = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.status.in_((PENDING, SENDING)),
+                EmailOutbox.next_attempt_at <= now,
+            )
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        try:
+            emails = db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(due))
+                .values(
+                    status=SENDING,
+                    next_attempt_at=now
+                    + timedelta(seconds=settings.email_claim_seconds),
+                )
+                .returning(
+                    EmailOutbox.id,
+                    EmailOutbox.recipient,
+                    EmailOutbox.subject,
+                    EmailOutbox.html,
+                    EmailOutbox.attempts,
+                ),
+                execution_options={"synchronize_session": False},
+            ).all()
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, f"Outbox claim failed: {str(e)}"
+            )
+        return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, emails)
+
+    @staticmethod
+    def deliver_batch(
+        db: Session, smtp: SMTPSession, batch_size: int
+    ) -> InternalResponse:
+        """
+        Claim a batch of due emails, send them over a single SMTP session and
+        record the results. Failed emails are rescheduled with backoff until
+        the attempts limit marks them as failed.
+
+        Args:
+            db (Session): DB Session
+            smtp (SMTPSession): Reused SMTP connection
+            batch_size (int): Maximum number of emails sent
+
+        Returns:
+            InternalResponse: Number of processed emails on success
+        """
+        origin = inspect.stack()[0].function
+
+        result: InternalResponse = OutboxService.claim_batch(db, batch_size)
+        if result.status == ResponseStatus.ERROR:
+            return result
+        emails = result.message
+
+        results = []
+        for email in emails:
+            now = datetime.now(timezone.utc)
+            try:
+                smtp.send(email.recipient, email.subject, email.html)
+            except (smtplib.SMTPException, OSError) as e:
+                smtp.close()
+                attempts = email.attempts + 1
+                exhausted = attempts >= settings.email_max_attempts
+                results.append(
+                    {
+                        "id": email.id,
+                        "status": FAILED if exhausted else PENDING,
+                        "attempts": attempts,
+                        "last_error": str(e)[:255],
+                        "next_attempt_at": now + OutboxService.backoff(attempts),
+                        "sent_at": None,
+                    }
+                )
+                continue
+            results.append(
+                {
+                    "id": email.id,
+                    "status": SENT,
+                    "attempts": email.attempts,
+                    "last_error": None,
+                    "next_attempt_at": now,
+                    "sent_at": now,
+                }
+            )
+
+        if results:
+            try:
+                db.execute(update(EmailOutbox), results)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                return SystemResponse.internal_response(
+                    ResponseStatus.ERROR, origin, f"Outbox delivery failed: {str(e)}"
+                )
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, origin, len(emails)
+        )
+
+    @staticmethod
+    async def run_worker():
+        """Background loop started with the application, one SMTP session each"""
+        smtp = SMTPSession()
+        try:
+            while True:
+                db = SessionLocal()
+                try:
+                    result = await asyncio.to_thread(
+                        OutboxService.deliver_batch,
+                        db,
+                        smtp,
+                        settings.email_batch_size,
+                    )
+                except Exception as e:
+                    print(f"Outbox worker error: {e}")
+                    result = None
+                finally:
+                    db.close()
+
+                if result and result.status == ResponseStatus.ERROR:
+                    print(result.message)
+                if result and result.message == settings.email_batch_size:
+                    continue
+                await asyncio.sleep(settings.email_poll_seconds)
+        finally:
+            smtp.close()
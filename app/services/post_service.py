@@ -1,44 +1,35 @@
-from enum import IntEnum, Enum
+import asyncio
+from enum import Enum
 from functools import wraps
 
 from app.responses import SystemResponse, InternalResponse
-from app.schemas import ResponseStatus, UpdateChanges
+from app.schemas import HeaderStatus, ResponseStatus, SourceTable, UpdateChanges
 import inspect
 
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 
-from typing import List
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple, Union
 
-from datetime import datetime, timezone
+from datetime import datetime
+from app.database.connection import SessionLocal
 from app.models import Categories, EventsHeaders, EventsLines, Rates
 from app.schemas import (
     NewPostHeaderInput, 
     NewPostLinesInput, 
     EventLines, 
-    UpdatePostInput,
-    UpdatePostConfirmInput)
+    UpdatePostInput)
+from app.schemas.bases import UpdateConfirmChanges
 from app.utils import maps_utils, utils, time_utils, fetch_data_utils
-from app.services.common.structures import GenerateStructureService
+from app.services.common.structures import ChangeSet, GenerateStructureService
 from app.services.repeater_service import (select_repeater_single_mode,
                                            select_repeater_custom_mode)
 
-class HeaderStatus(IntEnum):
-    UNASSIGNED = -1
-    NEW = 0
-    STAGING = 1
-    REVISION = 2
-    APPROVED = 3
-
 class UpdateStatus(Enum):
     ERROR = "error"
     SUCCESS = "success"
 
-class SourceTable(Enum):
-    HEADER = "events_headers"
-    LINES = "events_lines"
-    RATES = "rates"
-    
 class HeaderPostsService:
 
     @staticmethod
@@ -441,7 +432,7 @@ class LinesPostService:
     
     def __init__(self, user_id: int, posting_lines: NewPostLinesInput):
         
-        payload: EventLines = self._get_lines_payload(posting_lines)
+        payload: List[EventLines] = self._get_lines_payload(posting_lines)
         
         self.header_id = posting_lines.header_id
         self.timezone = posting_lines.user_timezone
@@ -457,9 +448,7 @@ class LinesPostService:
         self.is_public = []
         self.capacity = []
         self.invited = []
-        
-        if not isinstance(payload, list):
-            payload = [payload]
+        self.schedule = []
         
         for item in payload:
             self.dates.append((item.start, item.end))
@@ -475,17 +464,26 @@ class LinesPostService:
         
     async def process_lines(
         self,
+        page: Optional[int] = None,
+        page_size: Optional[int] = None,
     ) -> InternalResponse:
-        
+        """
+        Validate and generate the lines. When page_size is provided only that
+        page of the schedule is packed, with the pagination details
+
+        Args:
+            page (Optional[int], optional): Page number, from 1. Defaults to 1.
+            page_size (Optional[int], optional): Lines per page. Defaults to all.
+
+        Returns:
+            InternalResponse: Internal response
+        """
         origin = inspect.stack()[0].function
         
         results: InternalResponse = self._validate_lines_basic_fields(origin)
         if results.status == ResponseStatus.ERROR:
             return results
-        results = self._validate_dates_timezones(origin)
-        if results.status == ResponseStatus.ERROR:
-            return results
-        lines = self._generate_post_lines()
+        lines = self._generate_post_lines(page, page_size)
         return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, lines)
     
     def _validate_lines_basic_fields(
@@ -514,28 +512,10 @@ class LinesPostService:
             return SystemResponse.internal_response(ResponseStatus.ERROR, origin, message)
         return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, None)
     
-    def _validate_dates_timezones(
-        self,
-        origin: str) -> InternalResponse:
-        try:
-            if isinstance(self.dates, list) and all(isinstance(pair, tuple) for pair in self.dates) and (len(pair) > 2 for pair in self.dates):
-                self.dates = [
-                    (
-                        start.astimezone(timezone.utc) if isinstance(start, datetime)
-                        else datetime.fromisoformat(start.replace("Z", "+00:00")).astimezone(timezone.utc),
-                        end.astimezone(timezone.utc) if isinstance(end, datetime)
-                        else datetime.fromisoformat(end.replace("Z", "+00:00")).astimezone(timezone.utc)
-                    )
-                    for start, end in self.dates
-                    ]
-                return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, self.dates)
-            else:
-                return SystemResponse.internal_response(ResponseStatus.ERROR, origin, "Invalid date data type")
-        except Exception as exc:
-            message = f"An error occurred: {str(exc)}"
-            return SystemResponse.internal_response(ResponseStatus.ERROR, origin, message)
-    
-    def _generate_post_lines(self) -> InternalResponse:
+    def _generate_post_lines(
+        self, 
+        page: Optional[int] = None, 
+        page_size: Optional[int] = None) -> InternalResponse:
         origin = inspect.stack()[0].function
         
         _result = self.dates
@@ -549,10 +529,22 @@ class LinesPostService:
             if result.status == ResponseStatus.ERROR:
                 return result
             _result = result.message
-            
-        _result = self._pack_lines(_result)
-            
-        return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, _result)
+        
+        self.schedule = _result
+        if page_size is None:
+            return SystemResponse.internal_response(
+                ResponseStatus.SUCCESS, origin, self._pack_lines(_result))
+        
+        page = page or 1
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, 
+            origin, 
+            {
+                "page": page,
+                "page_size": page_size,
+                "total": self._count_lines(_result),
+                "lines": self._pack_lines(_result, (page - 1) * page_size, page_size),
+            })
     
     def _custom_mode_enabled(self) -> InternalResponse:
         origin = inspect.stack()[0].function
@@ -617,28 +609,23 @@ class LinesPostService:
                 origin, 
                 results.message)
     
-    def _pack_lines(self, generated_lines: dict):
-        def pack_single(key, value):
-            result = get_visibility_capacity(key)
-            return {
-                "start": value[0] if not isinstance(value, list) else value[0][0],
-                "end": value[1] if not isinstance(value, list) else value[0][1],
-                "isPublic": result[0],
-                "capacity": result[1],
-                "rates": self.rates[int(key)] if (self.custom_option_selected and self.custom_each_day) else self.rates
-            }
+    def _iter_packed_lines(
+        self, 
+        generated_lines: Union[dict, list]) -> Iterator[Tuple[int, dict]]:
+        """
+        Lazily pack the generated schedule, one line at a time
 
-        def pack_repeated(key, value, is_pub, cap):
-            return [
-                {
-                    "start": pair[0],
-                    "end": pair[1],
-                    "isPublic": is_pub,
-                    "capacity": cap,
-                    "rates": self.rates[int(key)] if (self.custom_option_selected and self.custom_each_day) else self.rates
-                }
-                for pair in value
-            ]
+        Args:
+            generated_lines (Union[dict, list]): Dates by group (repeated) or
+            list of dates (single)
+
+        Yields:
+            Iterator[Tuple[int, dict]]: Group key and packed line
+        """
+        def get_rates(key):
+            if self.custom_option_selected and self.custom_each_day:
+                return self.rates[int(key)]
+            return self.rates
         
         def get_visibility_capacity(key: int):
             isPublic, capacity = "", ""
@@ -653,49 +640,81 @@ class LinesPostService:
                 capacity = self.capacity[0]
             return (isPublic, capacity)
         
-        if not self.repeat and not self.custom_option_selected:
-            return {
-                key: pack_single(key, value)
-                for key, value in enumerate(generated_lines)
-            }
+        if self.repeat:
+            groups = zip(generated_lines.items(), self.is_public, self.capacity)
+            for (key, value), is_pub, cap in groups:
+                rates = get_rates(key)
+                for start, end in value:
+                    yield key, {
+                        "start": start,
+                        "end": end,
+                        "isPublic": is_pub,
+                        "capacity": cap,
+                        "rates": rates,
+                    }
+            return
         
-        if self.repeat and not self.custom_option_selected:
-            return {
-                key: pack_repeated(key, value, is_pub, cap)
-                for (key, value), is_pub, cap in zip(generated_lines.items(), self.is_public, self.capacity)
+        if isinstance(generated_lines, dict):
+            generated_lines = generated_lines.values()
+        for key, value in enumerate(generated_lines):
+            start, end = value[0] if isinstance(value, list) else value
+            is_pub, cap = get_visibility_capacity(key)
+            yield key, {
+                "start": start,
+                "end": end,
+                "isPublic": is_pub,
+                "capacity": cap,
+                "rates": get_rates(key),
             }
+    
+    def _pack_lines(
+        self, 
+        generated_lines: Union[dict, list], 
+        offset: int = 0, 
+        limit: Optional[int] = None) -> dict:
+        """
+        Group packed lines by key, optionally only a slice of them. Repeated
+        schedules are grouped in lists, single lines are kept as dicts
 
-        if self.repeat and not self.custom_option_selected and self.custom_each_day:
-            return {
-                key: pack_repeated(key, value, is_pub, cap)
-                for (key, value), is_pub, cap in zip(generated_lines.items(), self.is_public, self.capacity)
-            }
-        
-        if self.repeat and self.custom_option_selected and self.custom_each_day:
-            return {
-                key: pack_repeated(key, value, is_pub, cap)
-                for (key, value), is_pub, cap in zip(generated_lines.items(), self.is_public, self.capacity)
-            }
+        Args:
+            generated_lines (Union[dict, list]): Generated schedule
+            offset (int, optional): Lines to skip. Defaults to 0.
+            limit (Optional[int], optional): Lines to pack. Defaults to all.
 
-        if self.custom_option_selected and not self.repeat and not self.custom_each_day:
-            return {
-                key: pack_single(key, value)
-                for key, value in enumerate(generated_lines.items())
-            }
-        
-        if self.custom_option_selected and not self.repeat and self.custom_each_day:
-            return {
-                key: pack_single(key, value)
-                for key, value in enumerate(generated_lines)
-            }
+        Returns:
+            dict: Packed lines
+        """
+        stop = None if limit is None else offset + limit
+        packed = {}
+        for key, line in islice(self._iter_packed_lines(generated_lines), offset, stop):
+            if self.repeat:
+                packed.setdefault(key, []).append(line)
+            else:
+                packed[key] = line
+        return packed
+    
+    def draft_lines(self) -> List[dict]:
+        """
+        Flatten the last generated schedule to be stored as a draft
 
-        if self.repeat and not self.custom_each_day and self.custom_option_selected:
-            return {
-                key: pack_repeated(key, value, is_pub, cap)
-                for (key, value), is_pub, cap in zip(generated_lines.items(), self.is_public, self.capacity)
-            }
+        Returns:
+            List[dict]: Packed lines tagged with their group key
+        """
+        return [
+            dict(line, group=key) 
+            for key, line in self._iter_packed_lines(self.schedule)
+        ]
     
-    async def _update_lines(
+    @staticmethod
+    def _count_lines(generated_lines: Union[dict, list]) -> int:
+        if isinstance(generated_lines, dict):
+            return sum(
+                len(value) if isinstance(value, list) else 1 
+                for value in generated_lines.values()
+            )
+        return len(generated_lines)
+    
+    def _update_lines(
         db: Session, 
         source: str,
         user_id: int, 
@@ -717,8 +736,8 @@ class LinesPostService:
                 status, origin, message)
 
         lines_ids = [item.id for item in changes]
-        updates = [
-            {
+        updates = {
+            item.id: {
                 "id": item.id,
                 "updates": [
                     {"field": update.field, "value": update.value}
@@ -726,7 +745,7 @@ class LinesPostService:
                 ],
             }
             for item in changes
-        ]
+        }
 
         result: InternalResponse = fetch_data_utils.get_header_from_lines(db, user_id, lines_ids)
         if result.status == ResponseStatus.ERROR:
@@ -747,7 +766,7 @@ class LinesPostService:
 
         for item in lines:
             
-            record_update = next((u for u in updates if u["id"] == item.id), None)
+            record_update = updates.get(item.id)
             if not record_update:
                 continue
             
@@ -859,7 +878,7 @@ class LinesPostService:
         return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, message)
 
 class RatesPostService:
-    async def _update_rates(
+    def _update_rates(
         db: Session,
         source: str, 
         user_id: int, 
@@ -884,8 +903,8 @@ class RatesPostService:
                 message)
 
         rates_ids = [item.id for item in changes]
-        updates = [
-            {
+        updates = {
+            item.id: {
                 "id": item.id,
                 "updates": [
                     {"field": update.field, "value": update.value}
@@ -893,7 +912,7 @@ class RatesPostService:
                 ],
             }
             for item in changes
-        ]
+        }
 
         result: InternalResponse = fetch_data_utils.get_header_and_lines_from_rates(db, user_id, rates_ids)
         if result.status == ResponseStatus.ERROR:
@@ -924,7 +943,7 @@ class RatesPostService:
         allowed_rates_fields = ["title", "amount", "currency"]
 
         for item in rates:
-            record_update = next((u for u in updates if u["id"] == item.id), None)
+            record_update = updates.get(item.id)
 
             if not record_update:
                 continue
@@ -959,60 +978,28 @@ class PostConfirmation:
     def update_db(
         db: Session,
         user_id: int, 
-        updates: List[UpdatePostConfirmInput]) -> InternalResponse:
+        updates: Tuple[List[UpdateConfirmChanges], ...]) -> InternalResponse:
         #TODO: REFACTOR
         
         origin = inspect.stack()[0].function
-        status = ResponseStatus.ERROR
-        
-        if not isinstance(updates, list) or len(updates) != 3:
-            message = "Invalid input"
-            return SystemResponse.internal_response(status, origin, message)
         
-        header_updates, lines_updates, rates_updates = [], [], []
-        header_id = -1
+        changes = ChangeSet(
+            item.model_dump(exclude={"status", "message"})
+            for table in updates
+            for item in table
+            if item.status == UpdateStatus.SUCCESS.value
+        )
+        header_ids = changes.record_ids(SourceTable.HEADER)
+        lines_ids = changes.record_ids(SourceTable.LINES)
+        rates_ids = changes.record_ids(SourceTable.RATES)
         
-        for index, table in enumerate(updates, start = 0):
-            
-            if index == 0:
-                for item in table:
-                    if item.status != UpdateStatus.SUCCESS.value:
-                        continue
-                    update = (item.source, item.header_id, item.record_id, item.field, item.old_value, item.new_value)
-                    update_dict = PostConfirmation._build_dict_structure(update)
-                    header_updates.append(update_dict)
-            
-            elif index == 1:
-                for item in table:
-                    if item.status != UpdateStatus.SUCCESS.value:
-                        continue
-                    if header_id == -1:
-                        header_id = item.header_id
-                    update = (item.source, item.header_id, item.record_id, item.field, item.old_value, item.new_value)
-                    update_dict = PostConfirmation._build_dict_structure(update)
-                    lines_updates.append(update_dict)
-            
-            elif index == 2:
-                for item in table:
-                    if item.status != UpdateStatus.SUCCESS.value:
-                        continue
-                    update = (item.source, item.header_id, item.record_id, item.field, item.old_value, item.new_value)
-                    update_dict = PostConfirmation._build_dict_structure(update)
-                    rates_updates.append(update_dict)
-            
-            else:
-                continue
-            
-        header_ids, lines_ids, rates_ids = PostConfirmation._get_ids(header_updates,
-                                                                     lines_updates, 
-                                                                     rates_updates)
         if header_ids:
             result: InternalResponse = fetch_data_utils.get_header(db, user_id, header_ids)
             if result.status == ResponseStatus.ERROR:
                 return result
             header: EventsHeaders = result.message[0]
             
-            for item in header_updates:
+            for item in changes.changes(SourceTable.HEADER):
                 if item["field"] == "coordinates" and isinstance(item["new_value"], list):
                     coord_to_str = f"{item['new_value'][0]},{item['new_value'][1]}"
                     setattr(header, item["field"], coord_to_str)
@@ -1024,16 +1011,15 @@ class PostConfirmation:
                 return result
                 
         if lines_ids:
+            header_id = changes.for_record(SourceTable.LINES, lines_ids[0])[0]["header_id"]
             result: InternalResponse = fetch_data_utils.get_selected_lines_from_same_header(db, header_id, lines_ids)
             if result.status == ResponseStatus.ERROR:
                 return result
             lines: List[EventLines] = result.message
             
-            for item in lines_updates:
-                for line in lines:
-                    if item["record_id"] == line.id:
-                        setattr(line, item["field"], item["new_value"])
-                        continue
+            for line in lines:
+                for item in changes.for_record(SourceTable.LINES, line.id):
+                    setattr(line, item["field"], item["new_value"])
             for line in lines:
                 result = fetch_data_utils.update_db(db, line)
                 if result.status == ResponseStatus.ERROR:
@@ -1049,102 +1035,24 @@ class PostConfirmation:
                 return result
             rates: List[Rates] = result.message
             
-            for item in rates_updates:
-                for rate in rates:
-                    if item["record_id"] == rate.id:
-                        setattr(rate, item["field"], item["new_value"])
-                        continue
+            for rate in rates:
+                for item in changes.for_record(SourceTable.RATES, rate.id):
+                    setattr(rate, item["field"], item["new_value"])
             for rate in rates:
                 result = fetch_data_utils.update_db(db, rate)
                 if result.status == ResponseStatus.ERROR:
                     return result
             
-        return SystemResponse.internal_response(
-            ResponseStatus.SUCCESS, 
-            origin, 
-            (header_updates, lines_updates, rates_updates))
-    
-    def _build_dict_structure(updates: list) -> dict:
-        return {
-            "source": updates[0],
-            "header_id": updates[1], 
-            "record_id": updates[2], 
-            "field": updates[3],
-            "old_value": updates[4],
-            "new_value": updates[5]
-            }
-    
-    def _get_ids(
-        header_updates: list, 
-        lines_updates: list, 
-        rates_updates: list) -> tuple:
-        
-        header_ids, lines_ids, rates_ids = [], [], []
-        
-        header_ids.extend(item["record_id"] for item in header_updates if item["record_id"] not in header_ids)
-        lines_ids.extend(item["record_id"] for item in lines_updates if item["record_id"] not in lines_ids)
-        rates_ids.extend(item["record_id"] for item in rates_updates if item["record_id"] not in rates_ids)
-        
-        return (header_ids, lines_ids, rates_ids)
+        return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, changes)
     
     @staticmethod
-    def build_post_updates_structure(tables: list) -> InternalResponse:
+    def build_post_updates_structure(changes: ChangeSet) -> InternalResponse:
         origin = inspect.stack()[0].function
         
-        relevant_changes = []
-
-        for table in tables:
-            for change in table:
-                header_id = change["header_id"]
-                record_id = change["record_id"]
-                source = change["source"]
-                field = change["field"]
-                old_value = change["old_value"]
-                new_value = change["new_value"]
-                
-                header_entry = next(
-                    (entry for entry in relevant_changes if header_id in entry), None
-                )
-                if not header_entry:
-                    header_entry = {header_id: {SourceTable.HEADER.value: [], SourceTable.LINES.value: {}}}
-                    relevant_changes.append(header_entry)
-
-                header_data = header_entry[header_id]
-
-                if source == SourceTable.HEADER.value:
-                    header_data[SourceTable.HEADER.value].append(
-                        {
-                            "field": field,
-                            "old_value": old_value,
-                            "new_value": new_value,
-                        }
-                    )
-                elif source == SourceTable.LINES.value:
-                    if record_id not in header_data[SourceTable.LINES.value]:
-                        header_data[SourceTable.LINES.value][record_id] = {"fields": [], SourceTable.RATES.value: []}
-                    header_data[SourceTable.LINES.value][record_id]["fields"].append(
-                        {
-                            "field": field,
-                            "old_value": old_value,
-                            "new_value": new_value,
-                        }
-                    )
-                elif source == SourceTable.RATES.value:
-                    if record_id not in header_data[SourceTable.LINES.value]:
-                        header_data[SourceTable.LINES.value][record_id] = {"fields": [], SourceTable.RATES.value: []}
-                    header_data[SourceTable.LINES.value][record_id][SourceTable.RATES.value].append(
-                        {
-                            "rate_id": record_id,
-                            "field": field,
-                            "old_value": old_value,
-                            "new_value": new_value,
-                        }
-                    )
-                    
         return SystemResponse.internal_response(
                 ResponseStatus.SUCCESS, 
                 origin, 
-                relevant_changes)
+                changes.by_header())
 
 
 class UpdatePost:
@@ -1156,45 +1064,54 @@ class UpdatePost:
         ) -> InternalResponse:
         
         origin = inspect.stack()[0].function
-        update_header, update_lines, update_rates = [], [], []
         
+        if any(item.table > 2 for item in update_data.tables):
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR,
+                origin, 
+                "Invalid specified source table")
+        
+        # Header diffs wait on geocoding, lines and rates diffs on the
+        # database: run them together, each blocking branch in its own session
+        branches = []
         for item in update_data.tables:
-            
             if item.table == 0:
-                source = SourceTable.HEADER
-                header_result: InternalResponse = await HeaderPostsService._update_header(
-                    db, source, user_id, item.table, item.changes
-                )
-                if header_result.status == ResponseStatus.ERROR:
-                    return header_result
-                update_header = header_result.message
-                
+                branches.append((item.table, HeaderPostsService._update_header(
+                    db, SourceTable.HEADER, user_id, item.table, item.changes
+                )))
             elif item.table == 1:
-                source = SourceTable.LINES
-                lines_result: InternalResponse = await LinesPostService._update_lines(
-                    db, source, user_id, item.table, item.changes
-                )
-                if lines_result.status == ResponseStatus.ERROR:
-                    return lines_result
-                update_lines = lines_result.message
-                
+                branches.append((item.table, UpdatePost._run_in_session(
+                    LinesPostService._update_lines, 
+                    SourceTable.LINES, user_id, item.table, item.changes
+                )))
             elif item.table == 2:
-                source = SourceTable.RATES
-                result_rates: InternalResponse = await RatesPostService._update_rates(
-                    db, source, user_id, item.table, item.changes
-                )
-                if result_rates.status == ResponseStatus.ERROR:
-                    return result_rates
-                update_rates = result_rates.message
-            
-            if item.table > 2:
-                return SystemResponse.internal_response(
-                ResponseStatus.ERROR,
-                origin, 
-                "Invalid specified source table")
-
-        update_details = (update_header, update_lines, update_rates)
-        return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, update_details)
+                branches.append((item.table, UpdatePost._run_in_session(
+                    RatesPostService._update_rates, 
+                    SourceTable.RATES, user_id, item.table, item.changes
+                )))
+        
+        results: List[InternalResponse] = await asyncio.gather(
+            *(branch for _, branch in branches)
+        )
+        
+        update_details = [[], [], []]
+        for (table, _), result in zip(branches, results):
+            if result.status == ResponseStatus.ERROR:
+                return result
+            update_details[table] = result.message
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, origin, tuple(update_details))
+    
+    @staticmethod
+    async def _run_in_session(branch, *args) -> InternalResponse:
+        """Run a blocking table diff in a worker thread with its own session"""
+        def run():
+            db = SessionLocal()
+            try:
+                return branch(db, *args)
+            finally:
+                db.close()
+        return await asyncio.to_thread(run)
     
     @staticmethod
     def _track_changes(
@@ -0,0 +1,278 @@
+import asyncio
+import inspect
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.connection import SessionLocal
+from app.models import (
+    EmailOutbox,
+    EventsHeaders,
+    Subscriptions,
+    Users,
+    VerificationCodes,
+)
+from app.responses import InternalResponse, SystemResponse
+from app.schemas import HeaderStatus, ResponseStatus
+from app.services.notification_service import NotificationService
+from app.services.outbox_service import FAILED, SENT
+
+
+class PurgeService:
+    @staticmethod
+    def purge_deleted_events(db: Session, batch_size: int) -> InternalResponse:
+        """
+        Physically remove a batch of soft-deleted headers. Lines and rates go
+        through ON DELETE CASCADE. Rows locked by another worker are skipped.
+
+        Args:
+            db (Session): DB Session
+            batch_size (int): Maximum number of headers removed
+
+        Returns:
+            InternalResponse: Removed header ids and the (title, email, full_name)
+            subscriber notifications on success
+        """
+        origin = inspect.stack()[0].function
+
+        try:
+            headers = db.execute(
+                select(EventsHeaders.id, EventsHeaders.title)
+                .where(EventsHeaders.status == HeaderStatus.DELETED)
+                .order_by(EventsHeaders.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not headers:
+                db.rollback()
+                return SystemResponse.internal_response(
+                    ResponseStatus.SUCCESS, origin, ([], [])
+                )
+
+            titles = {header_id: title for header_id, title in headers}
+            header_ids = list(titles)
+            subscribers = db.execute(
+                select(Subscriptions.event_id, Users.email, Users.full_name)
+                .join(Users, Users.id == Subscriptions.user_id)
+                .where(Subscriptions.event_id.in_(header_ids))
+            ).all()
+
+            db.execute(
+                delete(Subscriptions).where(Subscriptions.event_id.in_(header_ids)),
+                execution_options={"synchronize_session": False},
+            )
+            db.execute(
+                delete(EventsHeaders).where(EventsHeaders.id.in_(header_ids)),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, f"Purge failed: {str(e)}"
+            )
+
+        notifications = [
+            (titles[event_id], email, full_name)
+            for event_id, email, full_name in subscribers
+        ]
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, origin, (header_ids, notifications)
+        )
+
+    @staticmethod
+    def purge_expired_codes(
+        db: Session, before: datetime, batch_size: int
+    ) -> InternalResponse:
+        """
+        Remove a batch of verification codes expired before a cutoff. Rows
+        locked by another worker are skipped.
+
+        Args:
+            db (Session): DB Session
+            before (datetime): Cutoff on the expiration date
+            batch_size (int): Maximum number of removed codes
+
+        Returns:
+            InternalResponse: Number of removed codes on success
+        """
+        origin = inspect.stack()[0].function
+
+        expired = (
+            select(VerificationCodes.email)
+            .where(VerificationCodes.expires_at < before)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        try:
+            result = db.execute(
+                delete(VerificationCodes).where(VerificationCodes.email.in_(expired)),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, f"Code purge failed: {str(e)}"
+            )
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, origin, result.rowcount
+        )
+
+    @staticmethod
+    def purge_delivered_emails(
+        db: Session, before: datetime, batch_size: int
+    ) -> InternalResponse:
+        """
+        Remove a batch of sent or failed outbox emails created before a
+        cutoff. Rows locked by another worker are skipped.
+
+        Args:
+            db (Session): DB Session
+            before (datetime): Cutoff on the creation date
+            batch_size (int): Maximum number of removed emails
+
+        Returns:
+            InternalResponse: Number of removed emails on success
+        """
+        origin = inspect.stack()[0].function
+
+        delivered = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.status.in_((SENT, FAILED)),
+                EmailOutbox.created_at < before,
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        try:
+            result = db.execute(
+                delete(EmailOutbox).where(EmailOutbox.id.in_(delivered)),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, f"Outbox purge failed: {str(e)}"
+            )
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, origin, result.rowcount
+        )
+
+    @staticmethod
+    def is_off_peak(now: datetime) -> bool:
+        """
+        Check if the UTC hour falls in the configured purge window.
+        The window may wrap midnight and is always open when start == end
+        """
+        start, end = settings.purge_start_hour, settings.purge_end_hour
+        if start == end:
+            return True
+        if start < end:
+            return start <= now.hour < end
+        return now.hour >= start or now.hour < end
+
+    @staticmethod
+    def run_purge() -> int:
+        """
+        Drain soft-deleted headers in batches and notify their subscribers
+
+        Returns:
+            int: Number of removed headers
+        """
+        purged = 0
+        db = SessionLocal()
+        try:
+            while True:
+                result: InternalResponse = PurgeService.purge_deleted_events(
+                    db, settings.purge_batch_size
+                )
+                if result.status == ResponseStatus.ERROR:
+                    print(result.message)
+                    break
+                header_ids, notifications = result.message
+                purged += len(header_ids)
+                result = NotificationService.notify_deleted(db, notifications)
+                if result.status == ResponseStatus.ERROR:
+                    print(result.message)
+                if len(header_ids) < settings.purge_batch_size:
+                    break
+        finally:
+            db.close()
+        return purged
+
+    @staticmethod
+    def run_code_purge() -> int:
+        """
+        Drain verification codes expired for longer than the retention, an
+        expired code is still needed to request a new one
+
+        Returns:
+            int: Number of removed codes
+        """
+        purged = 0
+        before = datetime.now(timezone.utc) - timedelta(
+            minutes=settings.code_retention_minutes
+        )
+        db = SessionLocal()
+        try:
+            while True:
+                result: InternalResponse = PurgeService.purge_expired_codes(
+                    db, before, settings.code_purge_batch_size
+                )
+                if result.status == ResponseStatus.ERROR:
+                    print(result.message)
+                    break
+                purged += result.message
+                if result.message < settings.code_purge_batch_size:
+                    break
+        finally:
+            db.close()
+        return purged
+
+    @staticmethod
+    def run_email_purge() -> int:
+        """
+        Drain outbox emails sent or failed for longer than the retention
+
+        Returns:
+            int: Number of removed emails
+        """
+        purged = 0
+        before = datetime.now(timezone.utc) - timedelta(
+            days=settings.email_retention_days
+        )
+        db = SessionLocal()
+        try:
+            while True:
+                result: InternalResponse = PurgeService.purge_delivered_emails(
+                    db, before, settings.email_purge_batch_size
+                )
+                if result.status == ResponseStatus.ERROR:
+                    print(result.message)
+                    break
+                purged += result.message
+                if result.message < settings.email_purge_batch_size:
+                    break
+        finally:
+            db.close()
+        return purged
+
+    @staticmethod
+    async def run_worker():
+        """Background loop started with the application"""
+        while True:
+            await asyncio.sleep(settings.purge_interval_seconds)
+            if not PurgeService.is_off_peak(datetime.now(timezone.utc)):
+                continue
+            try:
+                await asyncio.to_thread(PurgeService.run_purge)
+                await asyncio.to_thread(PurgeService.run_code_purge)
+                await asyncio.to_thread(PurgeService.run_email_purge)
+            except Exception as e:
+                print(f"Purge worker error: {e}")
@@ -1,10 +1,11 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
 import app.models as models
+from app.schemas.schemas import HeaderStatus
 from app.utils import maps_utils
 
 
@@ -18,6 +19,7 @@ class RetrieveService:
         unit: int = 0,
     ):
         event_data = []
+        series_rates = RetrieveService.get_series_rates(db, lines)
 
         for header in headers:
             if lines:
@@ -58,6 +60,14 @@ class RetrieveService:
                     "isPublic": line.isPublic,
                 }
 
+                # Occurrences past the horizon are not stored and have no rate rows
+                if line.id is None and line.series_id is not None:
+                    line_dict["rates"] = [
+                        {"id": None, **rate} for rate in series_rates[line.series_id]
+                    ]
+                    event_dict["schedule"].append(line_dict)
+                    continue
+
                 rates = (
                     db.query(models.Rates).filter(models.Rates.line_id == line.id).all()
                 )
@@ -78,6 +88,21 @@ class RetrieveService:
 
         return event_data
 
+    @staticmethod
+    def get_series_rates(db: Session, lines: List[models.EventsLines]) -> dict:
+        """Rates of the series of the unstored occurrences, keyed by series id"""
+        series_ids = {
+            line.series_id for line in lines or [] if line.id is None and line.series_id
+        }
+        if not series_ids:
+            return {}
+        fetched_series = (
+            db.query(models.EventsSeries.id, models.EventsSeries.rates)
+            .filter(models.EventsSeries.id.in_(series_ids))
+            .all()
+        )
+        return {series_id: rates for series_id, rates in fetched_series}
+
     @staticmethod
     def generate_updated_events_structure(
         db: Session,
@@ -146,6 +171,7 @@ class RetrieveService:
                 and_(
                     models.EventsHeaders.id == selected_header_id,
                     models.EventsHeaders.owner_id == user_id,
+                    models.EventsHeaders.status != HeaderStatus.DELETED,
                 )
             )
             .first()
@@ -185,12 +211,19 @@ class RetrieveService:
 
     @staticmethod
     # type: ignore
-    def get_events_within_area(db: Session, lat: float, lon: float, radius: int = 10, unit: int = 0) -> (dict, List[float]):
+    def get_events_within_area(
+        db: Session,
+        lat: float,
+        lon: float,
+        radius: int = 10,
+        unit: int = 0,
+        until: Optional[datetime] = None,
+    ) -> (dict, List[float]):
         reference_point = [lat, lon]
         area = maps_utils.get_bounding_area(
             point=reference_point, radius=radius, units=unit
         )
         return (
-            maps_utils.get_within_events(area, db=db, lat=lat, lon=lon),
+            maps_utils.get_within_events(area, db=db, lat=lat, lon=lon, until=until),
             reference_point,
         )
@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import inspect
+import math
+import threading
+from datetime import datetime, timezone
+from typing import Dict
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.connection import SQLALCHAMEY_DATABASE_URL, SessionLocal
+from app.models import RevokedTokens
+from app.responses import InternalResponse, SystemResponse
+from app.schemas import ResponseStatus
+
+CHANNEL = "revoked_tokens"
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings, sized for a capacity and error rate"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.size = max(8, math.ceil(bits))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big")
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class RevocationSet:
+    """
+    Revoked token ids held in memory. The bloom filter answers most lookups
+    (tokens that were never revoked), the exact map confirms the rest.
+    Writers hold the lock, readers use the current (bloom, map) pair
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset({})
+
+    def _reset(self, revoked: Dict[str, datetime]):
+        """Swap in a new filter and map, the caller holds the lock"""
+        bloom = BloomFilter(
+            max(settings.revocation_bloom_capacity, len(revoked)),
+            settings.revocation_bloom_error_rate,
+        )
+        for jti in revoked:
+            bloom.add(jti)
+        self._state = (bloom, revoked)
+
+    def add(self, jti: str, expires_at: datetime):
+        with self._lock:
+            bloom, revoked = self._state
+            bloom.add(jti)
+            revoked[jti] = expires_at
+
+    def replace(self, revoked: Dict[str, datetime]):
+        with self._lock:
+            self._reset(dict(revoked))
+
+    def prune(self, now: datetime):
+        """Forget expired tokens, the signature check already rejects them"""
+        with self._lock:
+            _, revoked = self._state
+            self._reset(
+                {jti: expires for jti, expires in revoked.items() if expires > now}
+            )
+
+    def __contains__(self, jti: str) -> bool:
+        bloom, revoked = self._state
+        return jti in bloom and jti in revoked
+
+    def __len__(self) -> int:
+        return len(self._state[1])
+
+
+revocations = RevocationSet()
+
+
+class RevocationService:
+    @staticmethod
+    def revoke(
+        db: Session, jti: str, user_id: int, expires_at: datetime
+    ) -> InternalResponse:
+        """
+        Store a revoked token and notify every application instance
+
+        Args:
+            db (Session): DB Session
+            jti (str): Token id
+            user_id (int): Token owner
+            expires_at (datetime): Token expiration
+
+        Returns:
+            InternalResponse: Result of the process
+        """
+        origin = inspect.stack()[0].function
+
+        try:
+            db.execute(
+                pg_insert(RevokedTokens)
+                .values(jti=jti, user_id=user_id, expires_at=expires_at)
+                .on_conflict_do_nothing(index_elements=[RevokedTokens.jti])
+            )
+            db.execute(
+                select(
+                    func.pg_notify(CHANNEL, f"{jti} {int(expires_at.timestamp())}")
+                )
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, f"Token not revoked: {str(e)}"
+            )
+        revocations.add(jti, expires_at)
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, origin, "Token revoked"
+        )
+
+    @staticmethod
+    def load(db: Session) -> int:
+        """Drop expired revocations and load the rest in the in-memory set"""
+        now = datetime.now(timezone.utc)
+        db.execute(delete(RevokedTokens).where(RevokedTokens.expires_at <= now))
+        db.commit()
+        rows = db.execute(select(RevokedTokens.jti, RevokedTokens.expires_at)).all()
+        revocations.replace({jti: expires_at for jti, expires_at in rows})
+        return len(rows)
+
+    @staticmethod
+    def apply_notification(payload: str):
+        jti, expires = payload.split(" ")
+        revocations.add(jti, datetime.fromtimestamp(int(expires), timezone.utc))
+
+    @staticmethod
+    def _listen():
+        conn = psycopg2.connect(SQLALCHAMEY_DATABASE_URL)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    @staticmethod
+    def _reload():
+        db = SessionLocal()
+        try:
+            return RevocationService.load(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def run_listener():
+        """
+        Background loop started with the application. It listens before the
+        full reload so no revocation is missed, and reloads on reconnection
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            conn = None
+            try:
+                conn = await asyncio.to_thread(RevocationService._listen)
+                await asyncio.to_thread(RevocationService._reload)
+            except Exception as e:
+                print(f"Revocation listener error: {e}")
+                if conn is not None:
+                    conn.close()
+                await asyncio.sleep(settings.revocation_retry_seconds)
+                continue
+
+            ready = asyncio.Event()
+            loop.add_reader(conn.fileno(), ready.set)
+            try:
+                while True:
+                    try:
+                        await asyncio.wait_for(
+                            ready.wait(), settings.revocation_prune_seconds
+                        )
+                    except asyncio.TimeoutError:
+                        revocations.prune(datetime.now(timezone.utc))
+                        continue
+                    ready.clear()
+                    conn.poll()
+                    while conn.notifies:
+                        payload = conn.notifies.pop(0).payload
+                        try:
+                            RevocationService.apply_notification(payload)
+                        except (ValueError, OverflowError, OSError):
+                            print(f"Revocation listener ignored payload: {payload}")
+            except Exception as e:
+                print(f"Revocation listener error: {e}")
+            finally:
+                loop.remove_reader(conn.fileno())
+                conn.close()
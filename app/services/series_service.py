@@ -0,0 +1,83 @@
+import asyncio
+import inspect
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.connection import SessionLocal
+from app.models import EventsHeaders, EventsSeries
+from app.responses import InternalResponse, SystemResponse
+from app.schemas import HeaderStatus, ResponseStatus
+from app.utils import fetch_data_utils
+
+
+class SeriesService:
+    @staticmethod
+    def extend_horizon(db: Session, until: datetime) -> InternalResponse:
+        """
+        Materialize the occurrences of every series up to a horizon so the
+        lines stay indexable. Series locked by another worker are skipped.
+
+        Args:
+            db (Session): DB Session
+            until (datetime): Horizon (naive UTC)
+
+        Returns:
+            InternalResponse: Number of materialized lines on success
+        """
+        origin = inspect.stack()[0].function
+
+        try:
+            fetched_series = (
+                db.execute(
+                    select(EventsSeries)
+                    .join(EventsHeaders, EventsHeaders.id == EventsSeries.header_id)
+                    .where(
+                        EventsHeaders.status != HeaderStatus.DELETED,
+                        or_(
+                            EventsSeries.materialized_until.is_(None),
+                            EventsSeries.materialized_until < until,
+                        ),
+                    )
+                    .with_for_update(of=EventsSeries, skip_locked=True)
+                )
+                .scalars()
+                .all()
+            )
+            result = fetch_data_utils.insert_series_lines(
+                db, fetched_series, until, commit=False
+            )
+            if result.status == ResponseStatus.ERROR:
+                return result
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, f"Horizon extension failed: {str(e)}"
+            )
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, origin, len(result.message)
+        )
+
+    @staticmethod
+    async def run_worker():
+        """Background loop started with the application"""
+        while True:
+            await asyncio.sleep(settings.series_refresh_seconds)
+            until = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(
+                days=settings.series_horizon_days
+            )
+            db = SessionLocal()
+            try:
+                result = await asyncio.to_thread(
+                    SeriesService.extend_horizon, db, until
+                )
+                if result.status == ResponseStatus.ERROR:
+                    print(result.message)
+            except Exception as e:
+                print(f"Series worker error: {e}")
+            finally:
+                db.close()
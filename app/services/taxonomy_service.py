@@ -0,0 +1,139 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Categories, Subcategories, Tags
+from app.utils import fetch_data_utils
+
+
+def encode(data: Any) -> bytes:
+    """Compact JSON with sorted keys, so equal content gives equal bytes"""
+    return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+
+
+def make_etag(body: bytes) -> str:
+    """
+    ETag from the encoded content, identical on every replica. It is weak
+    because responses wrap the content with per-request meta, so equal tags
+    mean equal data, not byte-identical bodies
+    """
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header, as RFC 9110 requires"""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == opaque for candidate in candidates
+    )
+
+
+@dataclass(frozen=True)
+class TaxonomyEntry:
+    data: Any
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_data(cls, data: Any) -> "TaxonomyEntry":
+        body = encode(data)
+        return cls(data, body, make_etag(body))
+
+
+@dataclass(frozen=True)
+class Taxonomy:
+    version: int
+    categories: TaxonomyEntry
+    tags: Mapping[int, TaxonomyEntry]
+
+
+class TaxonomyService:
+    """
+    Categories and tags change only when the seed runs. They are loaded once
+    into a read-only snapshot, already encoded to JSON, and served from
+    memory until invalidated
+    """
+
+    _snapshot: Optional[Taxonomy] = None
+    _version = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def build(db: Session, version: int) -> Taxonomy:
+        categories = [
+            {"id": category_id, "category": name, "code": code}
+            for category_id, name, code in db.execute(
+                select(Categories.id, Categories.name, Categories.code).order_by(
+                    Categories.id
+                )
+            ).all()
+        ]
+        rows = db.execute(
+            select(
+                Subcategories.cat,
+                Tags.id,
+                Tags.name,
+                Tags.subcat,
+                Subcategories.code,
+                Subcategories.name,
+            )
+            .join(Subcategories, Subcategories.id == Tags.subcat)
+            .order_by(Tags.id)
+        ).all()
+
+        grouped: dict = {}
+        for category_id, *tag in rows:
+            grouped.setdefault(category_id, []).append(tuple(tag))
+        tags = {
+            category_id: TaxonomyEntry.from_data(
+                fetch_data_utils.build_tags(category_tags).message
+            )
+            for category_id, category_tags in grouped.items()
+        }
+
+        return Taxonomy(
+            version=version,
+            categories=TaxonomyEntry.from_data(tuple(categories)),
+            tags=MappingProxyType(tags),
+        )
+
+    @staticmethod
+    def load(db: Session) -> Taxonomy:
+        with TaxonomyService._lock:
+            version = TaxonomyService._version
+        taxonomy = TaxonomyService.build(db, version)
+        with TaxonomyService._lock:
+            if TaxonomyService._version == version:
+                TaxonomyService._snapshot = taxonomy
+        return taxonomy
+
+    @staticmethod
+    def get(db: Session) -> Taxonomy:
+        """Current snapshot, rebuilt from the database after invalidation"""
+        snapshot = TaxonomyService._snapshot
+        if snapshot is not None:
+            return snapshot
+        return TaxonomyService.load(db)
+
+    @staticmethod
+    def invalidate():
+        with TaxonomyService._lock:
+            TaxonomyService._version += 1
+            TaxonomyService._snapshot = None
+
+    @staticmethod
+    def get_categories(db: Session) -> TaxonomyEntry:
+        return TaxonomyService.get(db).categories
+
+    @staticmethod
+    def get_tags(db: Session, category_id: int) -> Optional[TaxonomyEntry]:
+        return TaxonomyService.get(db).tags.get(category_id)
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from typing import Optional
+
+import firebase_admin
+import google.auth.transport.requests
+from cachetools import TLRUCache
+from google.auth import exceptions, transport
+from google.oauth2 import id_token
+
+from app.config import settings
+
+FIREBASE_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/"
+    "securetoken@system.gserviceaccount.com"
+)
+FIREBASE_ISSUER = "https://securetoken.google.com/"
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class TokenCache:
+    """
+    Verified claims by token hash, bounded in size (LRU) and dropped at the
+    token's own expiration. The raw token is never kept in memory
+    """
+
+    def __init__(self, maxsize: int):
+        self._claims = TLRUCache(
+            maxsize, ttu=lambda _key, claims, _now: claims["exp"], timer=time.time
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            return self._claims.get(self.key(token))
+
+    def put(self, token: str, claims: dict):
+        with self._lock:
+            self._claims[self.key(token)] = claims
+
+    def clear(self):
+        with self._lock:
+            self._claims.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._claims)
+
+
+class FirebaseCerts(transport.Request):
+    """
+    HTTP transport for google-auth that serves the Firebase public keys from
+    memory until their Cache-Control max-age, so verifying a token never
+    waits on Google. Any other request goes through untouched
+    """
+
+    def __init__(self, url: str = FIREBASE_CERTS_URL):
+        self.url = url
+        self._http = google.auth.transport.requests.Request()
+        self._response = None
+        self.expires_at = 0.0
+
+    def refresh(self) -> float:
+        """Fetch the keys and return the time they stop being fresh"""
+        response = self._http(self.url, method="GET")
+        if response.status != 200:
+            raise exceptions.TransportError(
+                f"Could not fetch certificates at {self.url}"
+            )
+        match = MAX_AGE.search(response.headers.get("cache-control", ""))
+        max_age = (
+            int(match.group(1)) if match else settings.firebase_certs_refresh_seconds
+        )
+        self._response, self.expires_at = response, time.time() + max_age
+        return self.expires_at
+
+    def __call__(self, url, method="GET", **kwargs):
+        if url != self.url or method != "GET":
+            return self._http(url, method=method, **kwargs)
+        if self.expires_at <= time.time():
+            self.refresh()
+        return self._response
+
+
+access_tokens = TokenCache(settings.token_cache_size)
+firebase_tokens = TokenCache(settings.token_cache_size)
+firebase_certs = FirebaseCerts()
+
+
+class TokenService:
+    @staticmethod
+    def verify_firebase_token(token: str) -> dict:
+        """
+        Verify a Firebase ID token against the cached public keys and keep
+        its claims until it expires
+
+        Args:
+            token (str): Firebase ID token
+
+        Raises:
+            ValueError: Invalid or expired token
+
+        Returns:
+            dict: Token claims, with the Firebase user id under "uid"
+        """
+        claims = firebase_tokens.get(token)
+        if claims is not None:
+            return claims
+
+        project_id = firebase_admin.get_app().project_id
+        claims = id_token.verify_firebase_token(
+            token, firebase_certs, audience=project_id
+        )
+        subject = claims.get("sub")
+        if claims.get("iss") != FIREBASE_ISSUER + project_id:
+            raise ValueError("Firebase ID token has an incorrect issuer")
+        if not isinstance(subject, str) or not 0 < len(subject) <= 128:
+            raise ValueError("Firebase ID token has an invalid subject")
+
+        claims["uid"] = subject
+        firebase_tokens.put(token, claims)
+        return claims
+
+    @staticmethod
+    async def run_certs_refresher():
+        """
+        Background loop started with the application. It prefetches the
+        Firebase public keys and renews them shortly before they go stale
+        """
+        while True:
+            try:
+                expires_at = await asyncio.to_thread(firebase_certs.refresh)
+                delay = max(
+                    expires_at - time.time() - settings.firebase_certs_margin_seconds,
+                    settings.firebase_certs_retry_seconds,
+                )
+            except Exception as e:
+                print(f"Firebase certs refresh error: {e}")
+                delay = settings.firebase_certs_retry_seconds
+            await asyncio.sleep(delay)
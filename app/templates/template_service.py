@@ -1,37 +1,144 @@
+from pathlib import Path
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import select
 from datetime import datetime
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from markupsafe import escape
+from app.config import settings
 from app.models import EventsHeaders, EventsLines, Rates
 from app.utils.fetch_data_utils import get_header
-from app.services.post_service import SourceTable
+from app.schemas import HeaderStatus, SourceTable
 from app.utils.time_utils import convert_string_to_utc
 
+TEMPLATES_DIR = Path(__file__).resolve().parent
+
+
+class EmailTemplates:
+    """
+    Registry of the compiled email templates. Every template is compiled once
+    at startup and rendered from the cache; with templates_auto_reload the
+    files are checked for changes before rendering
+    """
+    
+    TEMPLATES = [
+        "email_verification_code.html",
+        "email_recovery.html",
+        "event_changed.html",
+        "event_deleted.html",
+    ]
+    environment = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=settings.templates_auto_reload,
+        cache_size=-1,
+    )
+    
+    @staticmethod
+    def load():
+        for name in EmailTemplates.TEMPLATES:
+            EmailTemplates.environment.get_template(name)
+    
+    @staticmethod
+    def get(name: str) -> Template:
+        return EmailTemplates.environment.get_template(name)
+    
+    @staticmethod
+    def render(name: str, **context) -> str:
+        return EmailTemplates.get(name).render(**context)
+
+
+CHANGES_HTML_HEAD = """
+        <html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; margin: 20px; }
+                h3, h4, h5 { margin-bottom: 0.5em; color: #264653; }
+                ul { list-style-type: none; padding-left: 1em; }
+                li { margin-bottom: 0.5em; }
+                .day-block { padding: 15px; margin-bottom: 20px; border-radius: 8px; }
+                .day-block:nth-child(even) { background-color: #f7f7f7; }
+                .day-block:nth-child(odd) { background-color: #e9ecef; }
+                .highlighted-date { 
+                    background-color: #3c3c3c; /* Light grey background */
+                    color: #f0f0f0; /* Darker text for contrast */
+                    font-weight: bold; 
+                    font-size: 18px;
+                    padding: 10px; 
+                    border-radius: 5px; 
+                    text-align: center; /* Center-align text */
+                    margin-bottom: 10px; /* Space below the date block */
+                }
+            </style>
+        </head>
+        <body>
+        """
+
 
 class HTMLTemplates:
     @staticmethod
-    def generate_event_changes_html(db: Session, changes: dict, user_id: int) -> str:
-        def fetch_header_data(header_id):
-            return (
-                db.query(EventsHeaders)
-                .filter(and_(EventsHeaders.owner_id == user_id, EventsHeaders.id == header_id))
-                .first()
-            )
+    def fetch_changed_records(db: Session, changes: list, user_id: int):
+        """
+        Load every header, line and rate referenced by the changes with one
+        IN query per table
 
-        def fetch_line_data(header_id, record_id):
-            return (
-                db.query(EventsLines)
-                .filter(and_(EventsLines.header_id == header_id, EventsLines.id == record_id))
-                .first()
-            )
+        Args:
+            db (Session): DB Session
+            changes (list): Changes grouped by header
+            user_id (int): Owner of the headers
+
+        Returns:
+            Tuple[dict, dict, dict]: Headers, lines and rates by id
+        """
+        header_ids, line_ids, rate_ids = set(), set(), set()
+        for change_group in changes:
+            for header_id, data in change_group.items():
+                header_ids.add(header_id)
+                for record_id, line_data in (data[SourceTable.LINES.value] or {}).items():
+                    line_ids.add(int(record_id))
+                    rate_ids.update(
+                        rate_change["rate_id"]
+                        for rate_change in line_data[SourceTable.RATES.value] or []
+                    )
+
+        headers = lines = rates = {}
+        if header_ids:
+            headers = {
+                header.id: header
+                for header in db.scalars(
+                    select(EventsHeaders).where(
+                        EventsHeaders.owner_id == user_id,
+                        EventsHeaders.id.in_(header_ids),
+                        EventsHeaders.status != HeaderStatus.DELETED,
+                    )
+                )
+            }
+        if line_ids:
+            lines = {
+                line.id: line
+                for line in db.scalars(
+                    select(EventsLines).where(EventsLines.id.in_(line_ids))
+                )
+            }
+        if rate_ids:
+            rates = {
+                rate.id: rate
+                for rate in db.scalars(select(Rates).where(Rates.id.in_(rate_ids)))
+            }
+        return headers, lines, rates
 
-        def fetch_rate_data(rate_id):
-            return db.query(Rates).filter(Rates.id == rate_id).first()
+    @staticmethod
+    def generate_event_changes_html(db: Session, changes: dict, user_id: int) -> str:
+        """
+        Build the changes block of the event_changed email. It is rendered
+        with |safe, so every value owners can edit is escaped here
+        """
+        headers, lines, rates = HTMLTemplates.fetch_changed_records(db, changes, user_id)
+        html = [CHANGES_HTML_HEAD]
 
         def format_header_changes(header_changes):
-            html = "<h4 style='color: #e76f51;'>Event Details Updated:</h4><ul>"
+            html.append("<h4 style='color: #e76f51;'>Event Details Updated:</h4><ul>")
             for change in header_changes:
-                field, old_value, new_value = change["field"], str(change["old_value"]), str(change["new_value"])
-                emoji = "📍" if field == "address" else "📝" if field == "title" else "🔄"
+                field, new_value = change["field"], escape(change["new_value"])
 
                 if field == "title":
                     text = f"Title has changed to '{new_value}'."
@@ -42,14 +149,13 @@ class HTMLTemplates:
                 else:
                     continue
 
-                html += f"<li>{emoji} {text}</li>"
-            return html + "</ul>"
+                html.append(f"<li>{emoji} {text}</li>")
+            html.append("</ul>")
 
-        def format_line_changes(record_id, line_data):
-            html = ""
-            line = fetch_line_data(header_id, record_id)
-            if not line:
-                return html
+        def format_line_changes(header_id, record_id, line_data):
+            line = lines.get(int(record_id))
+            if not line or line.header_id != header_id:
+                return
 
             formatted_start_day = line.start.strftime("%B %d")
             formatted_end_day = line.end.strftime("%B %d")
@@ -61,10 +167,10 @@ class HTMLTemplates:
                 else f"{formatted_start_day} ({formatted_start_time}h) to {formatted_end_day} ({formatted_end_time}h)"
             )
 
-            html += f"<div class='day-block'><h4 class='highlighted-date'>{date_line}</h4>"
+            html.append(f"<div class='day-block'><h4 class='highlighted-date'>{date_line}</h4>")
 
             if line_data["fields"]:
-                html += "<h5 style='color: #e76f51;'>Relevant Updates:</h5><ul>"
+                html.append("<h5 style='color: #e76f51;'>Relevant Updates:</h5><ul>")
                 for field_change in line_data["fields"]:
                     field, old_value, new_value = field_change["field"], field_change["old_value"], field_change["new_value"]
                     emoji = ""
@@ -74,7 +180,7 @@ class HTMLTemplates:
                     
                     if field == "capacity":
                         emoji = "🔺👥" if int(new_value) > int(old_value) else "🔻👥"
-                        text = f"Maximum {new_value} attendees."
+                        text = f"Maximum {escape(new_value)} attendees."
                     elif field == "isPublic":
                         emoji = "🔓" if new_value == "True" else "⛔"
                         text = "Now is public." if new_value == "True" else "Now is private."
@@ -87,16 +193,15 @@ class HTMLTemplates:
                         formatted_new_end_time = new_value.strftime("%H:%M")
                         text = f"Now it ends in {formatted_new_end_day} at {formatted_new_end_time}h."
 
-                    html += f"<li>{emoji} {text}</li>"
-                html += "</ul>"
-
-            return html
+                    html.append(f"<li>{emoji} {text}</li>")
+                html.append("</ul>")
 
         def format_rate_changes(rate_changes):
-            html = "<h5 style='color: #e76f51;'>💸 Rate Updates:</h5><ul>"
+            html.append("<h5 style='color: #e76f51;'>💸 Rate Updates:</h5><ul>")
             for rate_change in rate_changes:
-                rate = fetch_rate_data(rate_change["rate_id"])
+                rate = rates.get(rate_change["rate_id"])
                 if rate:
+                    title, currency = escape(rate.title), escape(rate.currency)
                     field = rate_change["field"]
                     old_value = str(rate_change["old_value"])
                     new_value = str(rate_change["new_value"])
@@ -109,56 +214,31 @@ class HTMLTemplates:
                             emoji = "🔺💲"
                         if float(new_value) < float(old_value):
                             emoji = "🔻💲"
-                        text = f"Now '{rate.title}': <strong>{new_value} {rate.currency}</strong>."
+                        text = f"Now '{title}': <strong>{escape(new_value)} {currency}</strong>."
                         if float(new_value) == 0.00:
                             emoji = "🤑"
-                            text = f"'{rate.title}' is now <strong>free!</strong>"
+                            text = f"'{title}' is now <strong>free!</strong>"
                     elif field == "currency":
-                        text = f"Now '{rate.title}' is in {new_value}."
+                        text = f"Now '{title}' is in {escape(new_value)}."
 
-                    html += f"<li>{emoji} {text}</li>"
-            return html + "</ul>"
-
-        html_content = """
-        <html>
-        <head>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; margin: 20px; }
-                h3, h4, h5 { margin-bottom: 0.5em; color: #264653; }
-                ul { list-style-type: none; padding-left: 1em; }
-                li { margin-bottom: 0.5em; }
-                .day-block { padding: 15px; margin-bottom: 20px; border-radius: 8px; }
-                .day-block:nth-child(even) { background-color: #f7f7f7; }
-                .day-block:nth-child(odd) { background-color: #e9ecef; }
-                .highlighted-date { 
-                    background-color: #3c3c3c; /* Light grey background */
-                    color: #f0f0f0; /* Darker text for contrast */
-                    font-weight: bold; 
-                    font-size: 18px;
-                    padding: 10px; 
-                    border-radius: 5px; 
-                    text-align: center; /* Center-align text */
-                    margin-bottom: 10px; /* Space below the date block */
-                }
-            </style>
-        </head>
-        <body>
-        """
+                    html.append(f"<li>{emoji} {text}</li>")
+            html.append("</ul>")
 
         for change_group in changes:
             for header_id, data in change_group.items():
-                header = fetch_header_data(header_id)
+                header = headers.get(header_id)
                 if header:
-                    html_content += f"<h3>{header.title.upper()}</h3><h4>📍 {header.address}</h4>"
+                    html.append(
+                        f"<h3>{escape(header.title.upper())}</h3>"
+                        f"<h4>📍 {escape(header.address)}</h4>"
+                    )
                     if data[SourceTable.HEADER.value]:
-                        html_content += format_header_changes(data[SourceTable.HEADER.value])
+                        format_header_changes(data[SourceTable.HEADER.value])
                     if data[SourceTable.LINES.value]:
                         for record_id, line_data in data[SourceTable.LINES.value].items():
-                            html_content += format_line_changes(record_id, line_data)
+                            format_line_changes(header_id, record_id, line_data)
                             if line_data[SourceTable.RATES.value]:
-                                html_content += format_rate_changes(line_data[SourceTable.RATES.value])
-
-        html_content += "</body></html>"
-        return html_content
-
+                                format_rate_changes(line_data[SourceTable.RATES.value])
 
+        html.append("</body></html>")
+        return "".join(html)
@@ -1,28 +1,28 @@
-import os
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from string import Template
+from typing import List, Tuple
 
 from app.responses import SystemResponse
 from app.schemas.schemas import ResponseStatus
 import inspect
 from app.utils.fetch_data_utils import (validate_email, 
-                                  get_user_data,
                                   get_code_owner)
 
 from app.schemas.schemas import InternalResponse
-from app.templates.template_service import HTMLTemplates
 
 import pdb
 
-from sqlalchemy import and_
+from jinja2 import TemplateNotFound
+from sqlalchemy import and_, insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from  app.models import Users
+from  app.models import EmailOutbox, Users
 from app.config import settings
 from app.oauth2 import create_email_code_token
 from app.services.retrieve_service import RetrieveService
+from app.templates.template_service import EmailTemplates
 
 from app.services.auth_service import AuthService
 
@@ -50,13 +50,14 @@ def is_email_taken(db: Session, email: str) -> InternalResponse:
         return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, "Email available")
     return result
 
-def send_auth_code(db: Session, email: str, template: int = 0):
+def send_auth_code(db: Session, email: str, template: int = 0, commit: bool = True):
     """Send email with an authentication generated code
 
     Args:
         db (Session): Database connection.
         email (str): Recipient email
         template (int, optional): Used HTML template {0: Account verification, 1: Password recovery}. Defaults to 0.
+        commit (bool, optional): Commit the queued email. Defaults to True.
 
     Returns:
         Union[dict, int]: Error details as a dictionary or the validation code on success.
@@ -64,7 +65,7 @@ def send_auth_code(db: Session, email: str, template: int = 0):
     status = ResponseStatus.ERROR
     origin = inspect.stack()[0].function
     
-    result: InternalResponse = AuthService.generate_code(db)
+    result: InternalResponse = AuthService.generate_code()
     if result.status == ResponseStatus.ERROR:
         return result
     verification_code = result.message
@@ -74,86 +75,157 @@ def send_auth_code(db: Session, email: str, template: int = 0):
 
     match template:
         case 0:
-            email_template_path = os.path.join(
-                os.getcwd(), "app", "templates", "email_verification_code.html"
-            )
+            template_name = "email_verification_code.html"
             subject = "Your Verification Code"
         case 1:
-            email_template_path = os.path.join(
-                os.getcwd(), "app", "templates", "email_recovery.html"
-            )
+            template_name = "email_recovery.html"
             subject = "Account Recovery Code"
         case _ :
             return SystemResponse.internal_response(
                 status, 
                 origin,
                 "HTML Template not found")
+        
+    verification_url = f"{settings.domain}{VERIFY_CODE_ROUTE}"
     try:
-        with open(email_template_path, "r") as f:
-            template_content = f.read()
-    except FileNotFoundError:
+        html_content = EmailTemplates.render(
+            template_name,
+            verification_token=verification_token,
+            verification_url=verification_url,
+            verification_code=verification_code,
+        )
+    except TemplateNotFound:
         return SystemResponse.internal_response(
                 status, 
                 origin,
                 "Email verification code template not found")
-        
-    verification_url = f"{settings.domain}{VERIFY_CODE_ROUTE}"
-    template = Template(template_content)
-    html_content = template.substitute(
-        verification_token=verification_token,
-        verification_url=verification_url,
-        verification_code=verification_code,
-    )
 
-    response: InternalResponse = send_email(email, subject, html_content)
+    response: InternalResponse = enqueue_email(db, email, subject, html_content, commit)
     if response.status== ResponseStatus.ERROR:
         return response
     return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, verification_code)
 
-def send_updated_events(
+def enqueue_email(
     db: Session, 
-    user_id: int, 
-    changes: list) -> InternalResponse:
-    
-    #TODO: REFACTOR JOB
+    email: str, 
+    subject: str, 
+    html_content: str,
+    commit: bool = True) -> InternalResponse:
+    """
+    Queue an email in the outbox, the outbox workers deliver it
+
+    Args:
+        db (Session): Database connection.
+        email (str): Recipient email
+        subject (str): Email subject
+        html_content (str): Body of the email based on an HTML/CSS file
+        commit (bool, optional): Commit the row, flush it otherwise. Defaults to True.
+
+    Returns:
+        InternalResponse: Queued email id on success
+    """
     status = ResponseStatus.ERROR
     origin = inspect.stack()[0].function
-    subject = "Updated Activity"
     
-    result: InternalResponse = get_user_data(db, user_id)
-    if result.status == ResponseStatus.ERROR:
-        return SystemResponse.internal_response(result.status, result.origin, result.message)
-
-    email_template_path = os.path.join(
-        os.getcwd(), "app", "templates", "event_changed.html"
-    )
+    outbox = EmailOutbox(recipient=email, subject=subject, html=html_content)
     try:
-        with open(email_template_path, "r") as f:
-            template_content = f.read()
-    except FileNotFoundError:
-        return SystemResponse.internal_response(status, origin, "Updated Event template not found")
-
-    email, full_name, _ = result.message
-    name = full_name.split(" ") if len(full_name) > 1 else full_name
-    name = name[0] if len(name) > 1 else name
-    logo = f"{settings.domain}/static/assets/images/logo_color.png"
+        db.add(outbox)
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+    except SQLAlchemyError as e:
+        db.rollback()
+        return SystemResponse.internal_response(status, origin, f"Email could not be queued: {str(e)}")
+    return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, outbox.id)
+
+def enqueue_emails(
+    db: Session, 
+    messages: List[Tuple[str, str, str]]) -> InternalResponse:
+    """
+    Queue several emails in the outbox with a single multi-row insert
+
+    Args:
+        db (Session): Database connection.
+        messages (List[Tuple[str, str, str]]): (email, subject, html_content) tuples
+
+    Returns:
+        InternalResponse: Number of queued emails on success
+    """
+    status = ResponseStatus.ERROR
+    origin = inspect.stack()[0].function
     
-    html_body = ""
-    html_body = HTMLTemplates.generate_event_changes_html(db, changes, user_id)
+    if not messages:
+        return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, 0)
+    rows = [
+        {"recipient": email, "subject": subject, "html": html_content}
+        for email, subject, html_content in messages
+    ]
+    try:
+        db.execute(insert(EmailOutbox), rows)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        return SystemResponse.internal_response(status, origin, f"Emails could not be queued: {str(e)}")
+    return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, len(rows))
 
-    template = Template(template_content)
-    html_content = template.substitute(
-        user_name=name, event_details=html_body, logo=logo
-    )
+def build_message(email: str, subject: str, html_content: str) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg["From"] = settings.email
+    msg["To"] = email
+    msg["Subject"] = subject
+    msg.attach(MIMEText(html_content, "html", "utf-8"))
+    return msg
 
-    result: InternalResponse = send_email(email, subject, html_content)
-    if result.status == ResponseStatus.ERROR:
-        return result
-    return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, "Changes sent via email")
+class SMTPSession:
+    """
+    Authenticated SMTP connection reused across messages. It connects on
+    the first send and reconnects once if the server dropped it meanwhile
+    """
+    
+    def __init__(self):
+        self._server = None
+    
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(
+            settings.smtp_server, 
+            settings.smtp_port, 
+            timeout=settings.smtp_timeout_seconds)
+        if settings.smtp_starttls:
+            server.starttls()
+        if settings.email_password:
+            server.login(settings.email, settings.email_password)
+        return server
+    
+    def send(self, email: str, subject: str, html_content: str):
+        message = build_message(email, subject, html_content).as_string()
+        if self._server is None:
+            self._server = self._connect()
+        try:
+            self._server.sendmail(settings.email, email, message)
+        except smtplib.SMTPServerDisconnected:
+            self._server = self._connect()
+            self._server.sendmail(settings.email, email, message)
+    
+    def close(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._server = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
 
 def send_email(email: str, subject: str, html_content: str):
     """
-    Send email with a specific HTML content
+    Send email with a specific HTML content right away. Request handlers
+    should use enqueue_email instead
 
     Args:
         email (str): Recipient email
@@ -165,19 +237,10 @@ def send_email(email: str, subject: str, html_content: str):
     """
     status = ResponseStatus.ERROR
     origin = inspect.stack()[0].function
-    
-    msg = MIMEMultipart()
-    msg["From"] = settings.email
-    msg["To"] = email
-    msg["Subject"] = subject
-    msg.attach(MIMEText(html_content, "html", "utf-8"))
 
     try:
-        server = smtplib.SMTP(settings.smtp_server, settings.smtp_port)
-        server.starttls()
-        server.login(settings.email, settings.email_password)
-        server.sendmail(settings.email, email, msg.as_string())
-        server.quit()
+        with SMTPSession() as server:
+            server.send(email, subject, html_content)
 
         return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, "Email sent")
 
@@ -188,10 +251,10 @@ def send_email(email: str, subject: str, html_content: str):
     except Exception as e:
         return SystemResponse.internal_response(status, origin, f"An unexpected error occurred: {str(e)}")
 
-def resend_auth_code(db: Session, code: int):
+def resend_auth_code(db: Session, code: int, email: str):
     origin = inspect.stack()[0].function
     
-    result: InternalResponse = get_code_owner(db, code)
+    result: InternalResponse = get_code_owner(db, code, email)
     if result.status == ResponseStatus.ERROR:
         return result
     
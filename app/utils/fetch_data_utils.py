@@ -1,15 +1,27 @@
 from app.responses import SystemResponse
-from app.schemas.schemas import ResponseStatus
+from app.schemas.schemas import HeaderStatus, ResponseStatus
 from app.schemas.schemas import InternalResponse
 import inspect
 from typing import Union, List
 from sqlalchemy.orm import Session
-from app.models import Users, EventsHeaders, EventsLines, Rates, Categories, Tags, Subcategories
+from app.models import (Users, EventsHeaders, EventsLines, EventsSeries, Rates, 
+                        EventsDrafts, VerificationCodes)
 from app.services.common.structures import GenerateStructureService
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi.encoders import jsonable_encoder
+import hashlib
+import json
 from app.utils.time_utils import is_date_expired, compute_expiration_time
+from app.utils import recurrence_utils
+from app.config import settings
+from datetime import datetime, timedelta, timezone
 from app.utils.utils import hash_password, is_password_valid
 
+LINE_FIELDS = ("start", "end", "capacity", "isPublic", "rates")
+RATE_FIELDS = ("title", "amount", "currency")
+
 def validate_email(db: Session, email: str) -> InternalResponse:
     """
     Validate if email is available (account already exists in the database)
@@ -25,7 +37,12 @@ def validate_email(db: Session, email: str) -> InternalResponse:
     origin = inspect.stack()[0].function
     
     try:
-        user = db.query(Users).filter(and_(Users.email == email, Users.is_validated == True)).first() # noqa: E712
+        user = (
+            db.query(Users)
+            .filter(and_(
+                func.lower(Users.email) == email.lower(),
+                Users.is_validated == True))  # noqa: E712
+            .first())
         if not user:
             status = ResponseStatus.ERROR
             message = "Not found"
@@ -93,7 +110,7 @@ def validate_username(db: Session, username: str) -> InternalResponse:
         user = (
             db.query(Users)
             .filter(and_(
-                Users.username == username, 
+                func.lower(Users.username) == username.lower(), 
                 Users.is_validated == True)).  # noqa: E712
             first())
         
@@ -118,7 +135,7 @@ def validate_account(db: Session, username: str, password: str) -> InternalRespo
             db.query(
                 Users)
             .filter(and_(
-                Users.username == username,
+                func.lower(Users.username) == username.lower(),
                 Users.is_validated == True)).  # noqa: E712
             first())
         
@@ -133,34 +150,6 @@ def validate_account(db: Session, username: str, password: str) -> InternalRespo
     
     return SystemResponse.internal_response(status, origin, message)
 
-def account_is_available(
-    db: Session, 
-    email: str, 
-    username: str) -> InternalResponse:
-
-    status = ResponseStatus.SUCCESS
-    origin = inspect.stack()[0].function
-    
-    try:
-        user = (
-            db.query(
-                Users)
-            .filter(or_(
-                Users.username == username,
-                Users.email == email)).
-            first())
-        
-        if not user:
-            message = "Not found"
-        else:
-            status = ResponseStatus.ERROR
-            message = user
-    except Exception as exc:
-        status = ResponseStatus.ERROR
-        message = f"Database error raised: {exc}"
-    
-    return SystemResponse.internal_response(status, origin, message)
-
 def validate_code(db: Session, code: int, email: str) -> InternalResponse:
     """Check if a code has not expired yet and still exists
 
@@ -175,21 +164,57 @@ def validate_code(db: Session, code: int, email: str) -> InternalResponse:
     status = ResponseStatus.ERROR
     origin = inspect.stack()[0].function
     
-    fetched_record = (
-        db.query(Users)
-        .filter(and_(Users.code == code, 
-                     Users.email == email))
-        .first()
-    )
+    fetched_record = db.execute(
+        select(Users, VerificationCodes.expires_at)
+        .join(VerificationCodes, VerificationCodes.email == func.lower(Users.email))
+        .where(and_(VerificationCodes.email == email.lower(), 
+                    VerificationCodes.code == code))
+    ).first()
 
-    if not fetched_record or not fetched_record.code_expiration:
+    if not fetched_record:
         return SystemResponse.internal_response(status, origin, "Code not found")
-    result: InternalResponse = is_date_expired(fetched_record.code_expiration)
+    user, expires_at = fetched_record
+    result: InternalResponse = is_date_expired(expires_at)
     if result.status == ResponseStatus.ERROR:
         return result
     return SystemResponse.internal_response(ResponseStatus.SUCCESS, 
                                             origin, 
-                                            fetched_record)
+                                            user)
+
+def store_code(db: Session, email: str, code: int) -> InternalResponse:
+    """
+    Save the pending code of an email, replacing any previous one. Emails
+    are stored lowercased, lookups lowercase the given email as well
+
+    Args:
+        db (Session): DB Session
+        email (str): Email the code is sent to
+        code (int): Verification code
+
+    Returns:
+        InternalResponse: Expiration of the code on success
+    """
+    origin = inspect.stack()[0].function
+    
+    result: InternalResponse = compute_expiration_time()
+    if result.status == ResponseStatus.ERROR:
+        return result
+    expires_at = result.message
+    
+    statement = pg_insert(VerificationCodes).values(
+        email=email.lower(), code=int(code), expires_at=expires_at)
+    try:
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[VerificationCodes.email],
+            set_={"code": statement.excluded.code, 
+                  "expires_at": statement.excluded.expires_at}))
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        return SystemResponse.internal_response(
+            ResponseStatus.ERROR, origin, f"Code not stored: {str(e)}")
+    return SystemResponse.internal_response(
+        ResponseStatus.SUCCESS, origin, expires_at)
 
 def refresh_code(db: Session, 
                  code: int, 
@@ -202,24 +227,18 @@ def refresh_code(db: Session,
     
     user = (
         db.query(Users)
-        .filter(and_(Users.username == username, 
-                     Users.email == email))
+        .filter(and_(func.lower(Users.username) == username.lower(), 
+                     func.lower(Users.email) == email.lower()))
         .first()
     )
     
     if not user:
             return SystemResponse.internal_response(status, origin, "User not found")
     if not isRecovery:
-        if not user.code_expiration:
+        if not db.get(VerificationCodes, email.lower()):
             return SystemResponse.internal_response(status, origin, "Code not found")
     
-    result = compute_expiration_time()
-    if result.status == ResponseStatus.ERROR:
-        return result
-    user.code = code
-    user.code_expiration = result.message
-    
-    result = update_db(db, user)
+    result = store_code(db, email, code)
     if result.status == ResponseStatus.ERROR:
         return result
     return SystemResponse.internal_response(ResponseStatus.SUCCESS, 
@@ -230,8 +249,8 @@ def add_user(db: Session, user: Users):
     origin = inspect.stack()[0].function
     
     user.is_validated = True
-    user.code = None
-    user.code_expiration = None
+    db.execute(delete(VerificationCodes).where(
+        VerificationCodes.email == user.email.lower()))
     
     result: InternalResponse = update_db(db, user)
     if result.status == ResponseStatus.ERROR:
@@ -241,13 +260,14 @@ def add_user(db: Session, user: Users):
         origin, 
         result.message)
 
-def get_code_owner(db: Session, code: int) -> InternalResponse:
+def get_code_owner(db: Session, code: int, email: str) -> InternalResponse:
     """
-    Get owner (user) of a code
+    Get owner (user) of a code. Codes are scoped to an email
 
     Args:
         db (Session): DB Session
         code (int): Provided code
+        email (str): Email the code was sent to
 
     Returns:
         InternalResponse: Internal response
@@ -262,8 +282,11 @@ def get_code_owner(db: Session, code: int) -> InternalResponse:
                 Users.email, 
                 Users.full_name, 
                 Users.username)
-            .filter(Users.code == code).  # noqa: E712
-            first())
+            .join(VerificationCodes, 
+                  VerificationCodes.email == func.lower(Users.email))
+            .filter(and_(VerificationCodes.email == email.lower(), 
+                         VerificationCodes.code == code))
+            .first())
         
         if not user:
             status = ResponseStatus.ERROR
@@ -300,25 +323,246 @@ def add_post(
     user_id: int,
     header_id: int, 
     lines: any) -> InternalResponse:
+    """
+    Approve a header and store its series, lines and rates. Everything is
+    written in one transaction, a failure leaves nothing posted
+
+    Args:
+        db (Session): DB Session
+        user_id (int): Owner id
+        header_id (int): Header id
+        lines (any): Packed lines
+
+    Returns:
+        InternalResponse: Inserted lines ids
+    """
     origin = inspect.stack()[0].function
     
-    result: InternalResponse = approve_header_status(db, user_id, header_id)
-    if result.status == ResponseStatus.ERROR:
-        return result
+    series_result: InternalResponse = build_series(header_id, lines)
+    if series_result.status == ResponseStatus.ERROR:
+        return series_result
+    series, lines = series_result.message
     lines_result: InternalResponse = build_lines(header_id, lines)
     if lines_result.status == ResponseStatus.ERROR:
         return lines_result
-    result = commit_db(db, lines_result.message[0], True)
-    if result.status == ResponseStatus.ERROR:
-        return result
-    result = build_rates(lines_result.message)
-    if result.status == ResponseStatus.ERROR:
-        return result
-    result = commit_db(db, result.message, True)
-    if result.status == ResponseStatus.ERROR:
-        return result
+    try:
+        result: InternalResponse = approve_header_status(db, user_id, header_id)
+        if result.status == ResponseStatus.ERROR:
+            db.rollback()
+            return result
+        if series:
+            db.add_all(series)
+            db.flush()
+            horizon = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(
+                days=settings.series_horizon_days)
+            result = insert_series_lines(db, series, horizon, commit=False)
+            if result.status == ResponseStatus.ERROR:
+                return result
+        result = bulk_insert_lines(db, lines_result.message, commit=False)
+        if result.status == ResponseStatus.ERROR:
+            return result
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        return SystemResponse.internal_response(
+            ResponseStatus.ERROR, origin, f"Post could not be saved: {str(e)}")
     return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, result.message)
 
+def bulk_insert_lines(
+    db: Session,
+    result_lines: tuple,
+    commit: bool = True
+    ) -> InternalResponse:
+    """
+    Insert lines and their rates with one multi-row INSERT per table
+
+    Args:
+        db (Session): DB Session
+        result_lines (tuple): (lines models, line rates) from build_lines
+        commit (bool, optional): Commit the transaction. Defaults to True.
+
+    Returns:
+        InternalResponse: Inserted lines ids
+    """
+    origin = inspect.stack()[0].function
+    
+    lines, _ = result_lines
+    if not lines:
+        return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, [])
+    try:
+        line_ids = db.scalars(
+            insert(EventsLines).returning(EventsLines.id, sort_by_parameter_order=True),
+            [
+                {
+                    "header_id": line.header_id,
+                    "series_id": line.series_id,
+                    "start": _to_naive_utc(line.start),
+                    "end": _to_naive_utc(line.end),
+                    "capacity": line.capacity,
+                    "isPublic": line.isPublic,
+                }
+                for line in lines
+            ],
+        ).all()
+        for line, line_id in zip(lines, line_ids):
+            line.id = line_id
+        
+        rates_result: InternalResponse = build_rates(result_lines)
+        if rates_result.status == ResponseStatus.ERROR:
+            db.rollback()
+            return rates_result
+        if rates_result.message:
+            db.execute(
+                insert(Rates),
+                [
+                    {
+                        "title": rate.title,
+                        "amount": rate.amount,
+                        "currency": rate.currency,
+                        "line_id": rate.line_id,
+                    }
+                    for rate in rates_result.message
+                ],
+            )
+        if commit:
+            db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        return SystemResponse.internal_response(
+            ResponseStatus.ERROR, origin, f"Lines insertion failed: {str(e)}")
+    return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, line_ids)
+
+def _hash_draft(lines: list) -> str:
+    content = json.dumps(lines, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def save_draft(
+    db: Session,
+    user_id: int,
+    header_id: int,
+    lines: list
+    ) -> InternalResponse:
+    """
+    Store the generated lines of a header until they are confirmed.
+    Content already stored in a live draft is not written again, so the
+    pages of one generation share a single draft
+
+    Args:
+        db (Session): DB Session
+        user_id (int): Owner id
+        header_id (int): Header id
+        lines (list): Flat generated lines, each one with its group key
+
+    Returns:
+        InternalResponse: Draft id
+    """
+    origin = inspect.stack()[0].function
+    
+    lines = jsonable_encoder(lines)
+    now = datetime.now(timezone.utc)
+    try:
+        fetched_header = db.scalar(
+            select(EventsHeaders.id).where(
+                EventsHeaders.id == header_id,
+                EventsHeaders.owner_id == user_id,
+                EventsHeaders.status != HeaderStatus.DELETED,
+            )
+        )
+        if not fetched_header:
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, origin, "Header not found")
+        
+        content_hash = _hash_draft(lines)
+        draft_id = db.scalar(
+            select(EventsDrafts.id).where(
+                EventsDrafts.header_id == header_id,
+                EventsDrafts.owner_id == user_id,
+                EventsDrafts.content_hash == content_hash,
+                EventsDrafts.expires_at > now,
+            )
+        )
+        if draft_id:
+            return SystemResponse.internal_response(
+                ResponseStatus.SUCCESS, origin, draft_id)
+        
+        db.execute(
+            delete(EventsDrafts).where(
+                EventsDrafts.owner_id == user_id,
+                EventsDrafts.expires_at <= now,
+            )
+        )
+        expires_at = now + timedelta(seconds=settings.draft_ttl_seconds)
+        statement = pg_insert(EventsDrafts).values(
+            header_id=header_id,
+            owner_id=user_id,
+            content_hash=content_hash,
+            lines=lines,
+            expires_at=expires_at,
+        )
+        draft_id = db.scalar(
+            statement.on_conflict_do_update(
+                constraint="uq_events_drafts_header_hash",
+                set_={"expires_at": expires_at},
+            ).returning(EventsDrafts.id)
+        )
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        return SystemResponse.internal_response(
+            ResponseStatus.ERROR, origin, f"Draft could not be saved: {str(e)}")
+    return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, draft_id)
+
+def confirm_draft(
+    db: Session,
+    user_id: int,
+    header_id: int,
+    draft_id: int
+    ) -> InternalResponse:
+    """
+    Post the lines stored in a draft. The draft is claimed with
+    DELETE ... RETURNING in the same transaction as the post, so a
+    repeated confirmation finds no draft and posts nothing
+
+    Args:
+        db (Session): DB Session
+        user_id (int): Owner id
+        header_id (int): Header the draft was generated for
+        draft_id (int): Draft id
+
+    Returns:
+        InternalResponse: Internal response
+    """
+    origin = inspect.stack()[0].function
+    
+    try:
+        claimed_lines = db.scalar(
+            delete(EventsDrafts)
+            .where(
+                EventsDrafts.id == draft_id,
+                EventsDrafts.owner_id == user_id,
+                EventsDrafts.header_id == header_id,
+                EventsDrafts.expires_at > datetime.now(timezone.utc),
+            )
+            .returning(EventsDrafts.lines)
+        )
+    except SQLAlchemyError as e:
+        db.rollback()
+        return SystemResponse.internal_response(
+            ResponseStatus.ERROR, origin, f"Draft could not be claimed: {str(e)}")
+    if claimed_lines is None:
+        db.rollback()
+        return SystemResponse.internal_response(
+            ResponseStatus.ERROR, origin, "Draft not found or expired")
+    
+    lines = {}
+    for line in claimed_lines:
+        line = dict(line)
+        lines.setdefault(line.pop("group"), []).append(line)
+    result: InternalResponse = add_post(db, user_id, header_id, lines)
+    if result.status == ResponseStatus.ERROR:
+        db.rollback()
+    return result
+
 def commit_db(
     db: Session, 
     data: any, 
@@ -435,6 +679,160 @@ def build_lines(
                 line_rates.append(value["rates"])
     return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, (lines_models, line_rates))
 
+def _to_naive_utc(value: Union[str, datetime]) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _flatten_rates(rates: any) -> list:
+    if isinstance(rates, dict):
+        return [rates]
+    if hasattr(rates, "model_dump"):
+        return [rates.model_dump()]
+    if isinstance(rates, list):
+        return [rate for item in rates for rate in _flatten_rates(item)]
+    return []
+
+def _is_valid_line(line: any) -> bool:
+    """Check the fields add_post reads, rates nested as build_rates expects"""
+    if not isinstance(line, dict) or any(field not in line for field in LINE_FIELDS):
+        return False
+    try:
+        _to_naive_utc(line["start"]), _to_naive_utc(line["end"])
+    except (AttributeError, TypeError, ValueError):
+        return False
+    rates = line["rates"] if isinstance(line["rates"], list) else [line["rates"]]
+    rates = [
+        rate for item in rates for rate in (item if isinstance(item, list) else [item])
+    ]
+    return all(
+        isinstance(rate, dict) and all(field in rate for field in RATE_FIELDS)
+        for rate in rates
+    )
+
+def build_series(
+    header_id: int,
+    lines: dict
+    ) -> InternalResponse:
+    """
+    Replace every repeated group of lines matching a recurrence rule by a
+    single EventsSeries. Groups that no rule reproduces stay as lines
+
+    Args:
+        header_id (int): Header id
+        lines (dict): Packed lines as returned by LinesPostService
+
+    Returns:
+        InternalResponse: (series models, remaining packed lines)
+    """
+    origin = inspect.stack()[0].function
+    
+    if not isinstance(lines, dict):
+        return SystemResponse.internal_response(
+            ResponseStatus.ERROR, 
+            origin, 
+            "Expected dict for lines")
+    
+    series_models, remaining = [], {}
+    for key, value in lines.items():
+        group = value if isinstance(value, list) else [value]
+        if not all(_is_valid_line(line) for line in group):
+            return SystemResponse.internal_response(
+                ResponseStatus.ERROR, 
+                origin, 
+                "Invalid line structure")
+        if not isinstance(value, list) or len(value) < 2:
+            remaining[key] = value
+            continue
+        starts = [_to_naive_utc(line["start"]) for line in value]
+        ends = [_to_naive_utc(line["end"]) for line in value]
+        first = value[0]
+        is_uniform = all(
+            line["isPublic"] == first["isPublic"]
+            and line["capacity"] == first["capacity"]
+            and line["rates"] == first["rates"]
+            for line in value
+        ) and len({end - start for start, end in zip(starts, ends)}) == 1
+        rule = recurrence_utils.infer_rrule(starts) if is_uniform else None
+        if not rule:
+            remaining[key] = value
+            continue
+        series_models.append(
+            EventsSeries(
+                header_id=header_id,
+                rrule=rule,
+                dtstart=starts[0],
+                dtend=ends[0],
+                exdates=[],
+                capacity=first["capacity"],
+                isPublic=first["isPublic"],
+                rates=_flatten_rates(first["rates"]))
+        )
+    return SystemResponse.internal_response(
+        ResponseStatus.SUCCESS, origin, (series_models, remaining))
+
+def materialize_series(
+    series: EventsSeries,
+    until: datetime
+    ) -> List[EventsLines]:
+    """
+    Build the lines of a series up to a horizon and move its
+    materialized_until mark. The first occurrence is always materialized
+
+    Args:
+        series (EventsSeries): Stored series
+        until (datetime): Horizon (naive UTC)
+
+    Returns:
+        List[EventsLines]: New lines, not yet added to the session
+    """
+    after = series.materialized_until or series.dtstart - timedelta(microseconds=1)
+    until = max(until, series.dtstart)
+    if until <= after:
+        return []
+    duration = series.dtend - series.dtstart
+    occurrences = recurrence_utils.expand_rrule(
+        series.rrule, series.dtstart, after, until, series.exdates)
+    series.materialized_until = until
+    return [
+        EventsLines(
+            header_id=series.header_id,
+            series_id=series.id,
+            start=start,
+            end=start + duration,
+            capacity=series.capacity,
+            isPublic=series.isPublic)
+        for start in occurrences
+    ]
+
+def insert_series_lines(
+    db: Session,
+    series: List[EventsSeries],
+    until: datetime,
+    commit: bool = True
+    ) -> InternalResponse:
+    """
+    Materialize stored series up to a horizon. Each new line gets its own
+    rate rows, copied from the series rates, like any other line
+
+    Args:
+        db (Session): DB Session
+        series (List[EventsSeries]): Stored series
+        until (datetime): Horizon (naive UTC)
+        commit (bool, optional): Commit the transaction. Defaults to True.
+
+    Returns:
+        InternalResponse: Inserted lines ids
+    """
+    lines, rates = [], []
+    for item in series:
+        materialized = materialize_series(item, until)
+        lines.extend(materialized)
+        rates.extend([item.rates] * len(materialized))
+    return bulk_insert_lines(db, (lines, rates), commit)
+
 def approve_header_status(db: Session, 
     user_id: int, 
     header_id: int
@@ -447,8 +845,10 @@ def approve_header_status(db: Session,
         and_(
             EventsHeaders.owner_id == user_id,
             EventsHeaders.id == header_id,
+            EventsHeaders.status != HeaderStatus.DELETED,
         )
     )
+    .with_for_update()
     .first()
     )
 
@@ -458,71 +858,8 @@ def approve_header_status(db: Session,
         return SystemResponse.internal_response(ResponseStatus.ERROR, origin, "Post already approved")
     
     fetched_header.status = 3
-    result: InternalResponse = commit_db(db, fetched_header)
-    if result.status == ResponseStatus.ERROR:
-        return result
-    return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, result.message)
-
-def get_categories(
-    db: Session, 
-    ) -> InternalResponse:
-    origin = inspect.stack()[0].function
-    
-    categories = db.query(
-        Categories.id, 
-        Categories.name, 
-        Categories.code
-        ).all()
-    
-    if not categories:
-        return SystemResponse.internal_response(
-            ResponseStatus.ERROR, 
-            origin, 
-            "Not found")
-    
-    response = [
-        {"id": row[0], "category": row[1], "code": row[2]} for row in categories
-    ]
-    return SystemResponse.internal_response(
-            ResponseStatus.SUCCESS, 
-            origin, 
-            response)
-
-def get_tags(
-    db: Session,
-    category_id: int, 
-    ) -> InternalResponse:
-    origin = inspect.stack()[0].function
-    
-    fetched_data = (
-        db.query(
-            Tags.id,
-            Tags.name,
-            Tags.subcat,
-            Subcategories.code,
-            Subcategories.name,
-        )
-        .join(Subcategories, Subcategories.id == Tags.subcat)
-        .join(Categories, Categories.id == Subcategories.cat)
-        .filter(Categories.id == category_id)
-        .all()
-    )
-    
-    if not fetched_data:
-        return SystemResponse.internal_response(
-            ResponseStatus.ERROR, 
-            origin, 
-            "Not found")
-        
-    result = build_tags(fetched_data)
-    if result.status == ResponseStatus.ERROR:
-        return result
-    
-    tags = result.message
-    return SystemResponse.internal_response(
-            ResponseStatus.SUCCESS, 
-            origin, 
-            tags)
+    db.flush()
+    return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, fetched_header)
 
 def build_tags(
     tags: list,
@@ -530,31 +867,19 @@ def build_tags(
     
     origin = inspect.stack()[0].function
     result = {}
+    subcategories = {}
     for tag_id, tag_name, subcat_id, subcat_code, subcat_name in tags:
-        subcategory_key = subcat_code
-
-        if subcat_name not in result:
-            result[subcat_name] = []
-
-        subcategory_exists = False
-        for subcategory in result[subcat_name]:
-            if subcategory["subcategory_code"] == subcategory_key:
-                subcategory_exists = True
-                subcategory["tags"].append({"id": tag_id, "name": tag_name})
-                break
+        subcategory = subcategories.get((subcat_name, subcat_code))
+        if subcategory is None:
+            subcategory = {"subcategory_code": subcat_code, "tags": []}
+            subcategories[(subcat_name, subcat_code)] = subcategory
+            result.setdefault(subcat_name, []).append(subcategory)
+        subcategory["tags"].append({"id": tag_id, "name": tag_name})
 
-        if not subcategory_exists:
-            result[subcat_name].append(
-                {
-                    "subcategory_code": subcategory_key,
-                    "tags": [{"id": tag_id, "name": tag_name}],
-                }
-            )
-    final_result = {category_name: result[category_name] for category_name in result}
     return SystemResponse.internal_response(
             ResponseStatus.SUCCESS, 
             origin, 
-            final_result)
+            result)
 
 def get_header(
     db: Session, 
@@ -568,14 +893,16 @@ def get_header(
         header = (
                 db.query(EventsHeaders)
                 .filter(and_(EventsHeaders.owner_id == user_id, 
-                            EventsHeaders.id == header_id))
+                            EventsHeaders.id == header_id,
+                            EventsHeaders.status != HeaderStatus.DELETED))
                 .first()
             )
     elif isinstance(header_id, list) and all(isinstance(d, int) for d in header_id):
         header = (
                 db.query(EventsHeaders)
                 .filter(and_(EventsHeaders.owner_id == user_id, 
-                            EventsHeaders.id.in_(header_id)))
+                            EventsHeaders.id.in_(header_id),
+                            EventsHeaders.status != HeaderStatus.DELETED))
                 .all()
             )
     else:
@@ -604,7 +931,9 @@ def get_header_from_lines(
     header = (
             db.query(EventsHeaders)
             .join(EventsLines, EventsLines.header_id == EventsHeaders.id)
-            .filter(EventsLines.id.in_(lines_ids), EventsHeaders.owner_id == user_id)
+            .filter(EventsLines.id.in_(lines_ids), 
+                    EventsHeaders.owner_id == user_id,
+                    EventsHeaders.status != HeaderStatus.DELETED)
             .first()
         )
     
@@ -654,7 +983,9 @@ def get_header_and_lines_from_rates(
             db.query(EventsHeaders.id, EventsLines.id)
             .join(EventsLines, EventsLines.header_id == EventsHeaders.id)
             .join(Rates, Rates.line_id == EventsLines.id)
-            .filter(Rates.id.in_(rates_ids), EventsHeaders.owner_id == user_id)
+            .filter(Rates.id.in_(rates_ids), 
+                    EventsHeaders.owner_id == user_id,
+                    EventsHeaders.status != HeaderStatus.DELETED)
             .all()
         )
     
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from math import acos, asin, cos, degrees, radians, sin
 
 import httpx
@@ -10,7 +10,7 @@ from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from app.responses import SystemResponse, InternalResponse
-from app.schemas.schemas import ResponseStatus
+from app.schemas.schemas import HeaderStatus, ResponseStatus
 import inspect
 from typing import List
 import pdb
@@ -19,7 +19,7 @@ import app.models as models
 from app.models import EventsHeaders
 from app.config import settings
 from app.database.connection import get_db
-from app.utils import time_utils
+from app.utils import recurrence_utils, time_utils
 
 NOMINATIM_BASE_URL = settings.nominatim_base_url
 USER_AGENT = settings.user_agent
@@ -182,7 +182,11 @@ def get_bounding_area(
     return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, data)
 
 def get_within_events(
-    area: dict, lat: float, lon: float, db: Session = Depends(get_db)
+    area: dict, 
+    lat: float, 
+    lon: float, 
+    db: Session = Depends(get_db), 
+    until: datetime = None,
 ):
     user_tz = pytz.timezone(time_utils.get_timezone_by_coordinates(lat, lon))
     current_time_utc = datetime.now(pytz.utc)
@@ -206,9 +210,13 @@ def get_within_events(
                 models.EventsLines.isPublic == True,  # noqa: E712
             ),
         )
-        .filter(func.ST_Within(models.EventsHeaders.geom, bounding_box))
+        .filter(
+            func.ST_Within(models.EventsHeaders.geom, bounding_box),
+            models.EventsHeaders.status != HeaderStatus.DELETED,
+        )
         .all()
     )
+    results += get_series_occurrences(db, bounding_box, until)
 
     if not results:
         return {"status": "error", "details": "Event not found or empty event"}
@@ -221,6 +229,64 @@ def get_within_events(
     return {"status": "success", "details": (headers, lines)}
 
 
+def get_series_occurrences(db: Session, bounding_box, until: datetime = None) -> list:
+    """
+    Expand the occurrences of public series beyond their materialized horizon
+
+    Args:
+        db (Session): DB Session
+        bounding_box: Searched area
+        until (datetime, optional): Window end requested by the client, naive
+        dates are taken as UTC. Defaults to now plus the series horizon and
+        is capped at series_window_max_days.
+
+    Returns:
+        list: (header, transient line) pairs, lines are not added to the session
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if until is None:
+        until = now + timedelta(days=settings.series_horizon_days)
+    elif until.tzinfo is not None:
+        until = until.astimezone(timezone.utc).replace(tzinfo=None)
+    until = min(until, now + timedelta(days=settings.series_window_max_days))
+
+    fetched_series = (
+        db.query(models.EventsHeaders, models.EventsSeries)
+        .join(
+            models.EventsSeries,
+            models.EventsSeries.header_id == models.EventsHeaders.id,
+        )
+        .filter(
+            func.ST_Within(models.EventsHeaders.geom, bounding_box),
+            models.EventsHeaders.status != HeaderStatus.DELETED,
+            models.EventsSeries.isPublic == True,  # noqa: E712
+            or_(
+                models.EventsSeries.materialized_until.is_(None),
+                models.EventsSeries.materialized_until < until,
+            ),
+        )
+        .all()
+    )
+
+    occurrences = []
+    for header, series in fetched_series:
+        duration = series.dtend - series.dtstart
+        after = max(series.materialized_until or datetime.min, now - duration)
+        for start in recurrence_utils.expand_rrule(
+            series.rrule, series.dtstart, after, until, series.exdates
+        ):
+            line = models.EventsLines(
+                header_id=header.id,
+                series_id=series.id,
+                start=start,
+                end=start + duration,
+                capacity=series.capacity,
+                isPublic=series.isPublic,
+            )
+            occurrences.append((header, line))
+    return occurrences
+
+
 def compute_distance(pointA: tuple, pointB: tuple, units: int = 0) -> float:
     """Compute Haversine distance between two points
 
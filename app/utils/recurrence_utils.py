@@ -0,0 +1,219 @@
+"""Vectorized recurrence engine
+
+Occurrences are computed arithmetically over NumPy ``datetime64[us]`` arrays
+instead of stepping one date at a time. Every generator takes one or more
+anchors (first start/end pairs) and returns a ``Schedule`` whose arrays have
+shape ``(anchors, occurrences)``. Datetimes are handled as wall-clock times,
+timezone information is reattached when converting back to Python objects.
+"""
+
+from datetime import datetime, tzinfo
+from itertools import zip_longest
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from dateutil.rrule import rruleset, rrulestr
+
+WEEKDAYS_MASK = "1111100"
+WEEKEND_MASK = "0000011"
+
+# Rules LinesPostService can produce, in the order they are tried
+RRULE_CANDIDATES = [
+    "FREQ=DAILY",
+    "FREQ=WEEKLY",
+    "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    "FREQ=WEEKLY;BYDAY=SA,SU",
+    "FREQ=MONTHLY",
+    "FREQ=YEARLY",
+]
+
+DateInput = Union[datetime, Sequence[datetime]]
+
+
+class Schedule(NamedTuple):
+    """Start and end occurrences, one row per anchor"""
+
+    starts: np.ndarray
+    ends: np.ndarray
+
+    def to_pairs(
+        self, row: int = 0, tz: Optional[tzinfo] = None
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Convert one row of the schedule to (start, end) datetime tuples
+
+        Args:
+            row (int, optional): Anchor row. Defaults to 0.
+            tz (Optional[tzinfo], optional): Timezone to attach. Defaults to None.
+
+        Returns:
+            List[Tuple[datetime, datetime]]: Occurrences
+        """
+        starts = self.starts[row].astype(object)
+        ends = self.ends[row].astype(object)
+        if tz is not None:
+            return [
+                (start.replace(tzinfo=tz), end.replace(tzinfo=tz))
+                for start, end in zip(starts, ends)
+            ]
+        return list(zip(starts, ends))
+
+
+def to_datetime64(dates: DateInput) -> np.ndarray:
+    """
+    Convert datetimes to a 1-D naive ``datetime64[us]`` array
+
+    Args:
+        dates (DateInput): Single datetime or sequence of datetimes
+
+    Returns:
+        np.ndarray: Wall-clock times
+    """
+    if isinstance(dates, datetime):
+        dates = [dates]
+    return np.array([date.replace(tzinfo=None) for date in dates], dtype="M8[us]")
+
+
+def repeat_days(
+    start: DateInput, end: DateInput, occurrences: int, step: int = 1
+) -> Schedule:
+    """
+    Repeat every ``step`` days (use step=7 for weekly)
+
+    Args:
+        start (DateInput): Anchor starting dates
+        end (DateInput): Anchor ending dates
+        occurrences (int): Number of occurrences per anchor
+        step (int, optional): Days between occurrences. Defaults to 1.
+
+    Returns:
+        Schedule: Occurrences
+    """
+    starts, ends = to_datetime64(start), to_datetime64(end)
+    offsets = np.arange(occurrences) * np.timedelta64(step, "D")
+    return Schedule(starts[:, None] + offsets, ends[:, None] + offsets)
+
+
+def repeat_busdays(
+    start: DateInput, end: DateInput, occurrences: int, weekmask: str
+) -> Schedule:
+    """
+    Repeat on the days allowed by a business day mask. When the anchor falls
+    on a masked-out day the first occurrence rolls forward to the next valid
+    day, keeping the original duration
+
+    Args:
+        start (DateInput): Anchor starting dates
+        end (DateInput): Anchor ending dates
+        occurrences (int): Number of occurrences per anchor
+        weekmask (str): Valid days, Monday first (e.g. WEEKDAYS_MASK)
+
+    Returns:
+        Schedule: Occurrences
+    """
+    starts, ends = to_datetime64(start), to_datetime64(end)
+    days = starts.astype("M8[D]")
+    time_of_day = starts - days
+    duration = ends - starts
+
+    occurrence_days = np.busday_offset(
+        days[:, None], np.arange(occurrences), roll="forward", weekmask=weekmask
+    )
+    occurrence_starts = occurrence_days + time_of_day[:, None]
+    return Schedule(occurrence_starts, occurrence_starts + duration[:, None])
+
+
+def _add_months(dates: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """
+    Shift each date by every month offset, clipping the day to the end of the
+    target month (same rule as ``relativedelta(months=n)`` from the anchor)
+    """
+    days = dates.astype("M8[D]")
+    time_of_day = (dates - days)[:, None]
+    first_of_month = dates.astype("M8[M]")
+    day_of_month = (days - first_of_month.astype("M8[D]")).astype(int)[:, None]
+
+    target_months = first_of_month[:, None] + months
+    month_length = (
+        (target_months + 1).astype("M8[D]") - target_months.astype("M8[D]")
+    ).astype(int)
+    clipped_days = np.minimum(day_of_month, month_length - 1)
+    return (
+        target_months.astype("M8[D]")
+        + clipped_days.astype("m8[D]")
+        + time_of_day
+    ).astype("M8[us]")
+
+
+def repeat_months(
+    start: DateInput, end: DateInput, occurrences: int, step: int = 1
+) -> Schedule:
+    """
+    Repeat every ``step`` months (use step=12 for yearly). Offsets are taken
+    from the anchor, so a 31st keeps returning to the last day of each month
+
+    Args:
+        start (DateInput): Anchor starting dates
+        end (DateInput): Anchor ending dates
+        occurrences (int): Number of occurrences per anchor
+        step (int, optional): Months between occurrences. Defaults to 1.
+
+    Returns:
+        Schedule: Occurrences
+    """
+    offsets = np.arange(occurrences) * step
+    return Schedule(
+        _add_months(to_datetime64(start), offsets),
+        _add_months(to_datetime64(end), offsets),
+    )
+
+
+def infer_rrule(starts: Sequence[datetime]) -> Optional[str]:
+    """
+    Find the RRULE reproducing exactly a list of occurrence starts
+
+    Args:
+        starts (Sequence[datetime]): Naive occurrence starts, sorted
+
+    Returns:
+        Optional[str]: RRULE (e.g. "RRULE:FREQ=WEEKLY;COUNT=52") or None
+    """
+    if len(starts) < 2:
+        return None
+    for candidate in RRULE_CANDIDATES:
+        rule = f"RRULE:{candidate};COUNT={len(starts)}"
+        expanded = rrulestr(rule, dtstart=starts[0])
+        if all(a == b for a, b in zip_longest(expanded, starts)):
+            return rule
+    return None
+
+
+def expand_rrule(
+    rule: str,
+    dtstart: datetime,
+    after: datetime,
+    before: datetime,
+    exdates: Optional[Sequence[datetime]] = None,
+) -> List[datetime]:
+    """
+    Expand the occurrences of a rule inside (after, before]
+
+    Args:
+        rule (str): RRULE string
+        dtstart (datetime): First occurrence
+        after (datetime): Window start, excluded
+        before (datetime): Window end, included
+        exdates (Optional[Sequence[datetime]], optional): Excluded occurrences
+
+    Returns:
+        List[datetime]: Occurrence starts
+    """
+    occurrences = rruleset()
+    occurrences.rrule(rrulestr(rule, dtstart=dtstart))
+    for exdate in exdates or []:
+        occurrences.exdate(exdate)
+    return [
+        occurrence
+        for occurrence in occurrences.between(after, before, inc=True)
+        if occurrence != after
+    ]
@@ -1,17 +1,17 @@
 from datetime import datetime, timedelta, timezone
-from typing import List, Tuple, Union
+from typing import Callable, List, Tuple, Union
 
 from app.responses import SystemResponse, InternalResponse
 from app.schemas.schemas import ResponseStatus
 import inspect
 
 from app.config import settings
+from app.utils import recurrence_utils
 
 import pytz
 import pdb
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from dateutil.relativedelta import relativedelta
 from timezonefinder import TimezoneFinder
 
 
@@ -134,6 +134,59 @@ def convert_string_to_utc(
             f"Raised exception: {exc}")
     return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, date_dt)
 
+def _repeat(
+    start: Union[datetime, List[datetime]],
+    end: Union[datetime, List[datetime]],
+    origin: str,
+    build: Callable[..., recurrence_utils.Schedule],
+    *args) -> InternalResponse:
+    """
+    Validate the provided dates and expand them with a recurrence generator
+
+    Args:
+        start (Union[datetime, List[datetime]]): Starting dates (UTC)
+        end (Union[datetime, List[datetime]]): Ending dates (UTC)
+        origin (str): Caller name
+        build (Callable[..., recurrence_utils.Schedule]): Recurrence generator
+        args: Generator arguments (occurrences, step or weekmask)
+
+    Returns:
+        InternalResponse: {0: [(start, end), ...]} for single dates or
+        {"0": [...], "1": [...]} for lists of dates
+    """
+    if isinstance(start, datetime) and isinstance(end, datetime):
+        result = is_start_before_end(start, end)
+        if result.status == ResponseStatus.ERROR:
+            return result
+        schedule = build(start, end, *args)
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, 
+            origin, 
+            {0: schedule.to_pairs(0, start.tzinfo)})
+
+    if isinstance(start, List) and isinstance(end, List):
+        pairs = list(zip(start, end))
+        for item_start, item_end in pairs:
+            result = is_start_before_end(item_start, item_end)
+            if result.status == ResponseStatus.ERROR:
+                return result
+        if not pairs:
+            return SystemResponse.internal_response(ResponseStatus.SUCCESS, origin, {})
+        starts, ends = zip(*pairs)
+        schedule = build(list(starts), list(ends), *args)
+        return SystemResponse.internal_response(
+            ResponseStatus.SUCCESS, 
+            origin, 
+            {
+                str(index): schedule.to_pairs(index, item_start.tzinfo)
+                for index, item_start in enumerate(starts)
+            })
+
+    return SystemResponse.internal_response(
+        ResponseStatus.ERROR, 
+        origin, 
+        "Invalid dates structure provided")
+
 def repeat_daily(
     start: datetime, 
     end: datetime, 
@@ -149,24 +202,8 @@ def repeat_daily(
     Returns:
         InternalResponse: Internal response
     """
-    repeats_dict = {}
-    repeats = []
     origin = inspect.stack()[0].function
-    
-    result = is_start_before_end(start, end)
-    if result.status == ResponseStatus.ERROR:
-            return result
-        
-    for _ in range(occurrences):
-        repeats.append((start, end))
-        start += timedelta(days=1)
-        end += timedelta(days=1)
-    repeats_dict[0] = repeats
-    
-    return SystemResponse.internal_response(
-        ResponseStatus.SUCCESS, 
-        origin, 
-        repeats_dict)
+    return _repeat(start, end, origin, recurrence_utils.repeat_days, occurrences, 1)
 
 def repeat_weekly(
     start: Union[datetime, List[datetime]],
@@ -184,48 +221,8 @@ def repeat_weekly(
     Returns:
         InternalResponse: Internal response
     """
-    repeats = []
-    repeats_dict = {}
     origin = inspect.stack()[0].function
-    status = ResponseStatus.SUCCESS
-
-    if isinstance(start, datetime) and isinstance(start, datetime):
-        result = is_start_before_end(start, end)
-        if result.status == ResponseStatus.ERROR:
-                return result
-        for _ in range(occurrences):
-            repeats.append((start, end))
-            start += timedelta(weeks=1)
-            end += timedelta(weeks=1)
-        repeats_dict[0] = repeats
-        return SystemResponse.internal_response(
-        status, 
-        origin, 
-        repeats_dict)
-
-    if isinstance(start, List) and isinstance(end, List):
-        index = 0
-        for item_start, item_end in zip(start, end):
-            result = is_start_before_end(item_start, item_end)
-            if result.status == ResponseStatus.ERROR:
-                return result
-            repeats_dict[str(index)] = repeats
-            for _ in range(occurrences):
-                repeats.append((item_start, item_end))
-                item_start += timedelta(weeks=1)
-                item_end += timedelta(weeks=1)
-            index += 1
-            repeats = []
-        return SystemResponse.internal_response(
-        status, 
-        origin, 
-        repeats_dict)
-    else:
-        return SystemResponse.internal_response(
-        ResponseStatus.ERROR, 
-        origin, 
-        "Invalid dates structure provided")
-
+    return _repeat(start, end, origin, recurrence_utils.repeat_days, occurrences, 7)
 
 def repeat_monthly(
     start: Union[datetime, List[datetime]],
@@ -242,47 +239,8 @@ def repeat_monthly(
     Returns:
         InternalResponse: Internal response
     """
-    repeats = []
-    repeats_dict = {}
     origin = inspect.stack()[0].function
-    status = ResponseStatus.SUCCESS
-
-    if isinstance(start, datetime) and isinstance(start, datetime):
-        result = is_start_before_end(start, end)
-        if result.status == ResponseStatus.ERROR:
-                return result
-        for _ in range(occurrences):
-            repeats.append((start, end))
-            start += relativedelta(months=1)
-            end += relativedelta(months=1)
-        repeats_dict[0] = repeats
-        return SystemResponse.internal_response(
-        status, 
-        origin, 
-        repeats_dict)
-
-    if isinstance(start, List) and isinstance(end, List):
-        index = 0
-        for item_start, item_end in zip(start, end):
-            result = is_start_before_end(item_start, item_end)
-            if result.status == ResponseStatus.ERROR:
-                return result
-            repeats_dict[str(index)] = repeats
-            for _ in range(occurrences):
-                repeats.append((item_start, item_end))
-                item_start += relativedelta(months=1)
-                item_end += relativedelta(months=1)
-            index += 1
-            repeats = []
-        return SystemResponse.internal_response(
-        status, 
-        origin, 
-        repeats_dict)
-    else:
-        return SystemResponse.internal_response(
-        ResponseStatus.ERROR, 
-        origin, 
-        "Invalid dates structure provided")
+    return _repeat(start, end, origin, recurrence_utils.repeat_months, occurrences, 1)
 
 def repeat_yearly(
     start: Union[datetime, List[datetime]],
@@ -299,47 +257,8 @@ def repeat_yearly(
     Returns:
         InternalResponse: Internal response
     """
-    repeats = []
-    repeats_dict = {}
     origin = inspect.stack()[0].function
-    status = ResponseStatus.SUCCESS
-
-    if isinstance(start, datetime) and isinstance(start, datetime):
-        result = is_start_before_end(start, end)
-        if result.status == ResponseStatus.ERROR:
-                return result
-        for _ in range(occurrences):
-            repeats.append((start, end))
-            start += relativedelta(years=1)
-            end += relativedelta(years=1)
-        repeats_dict[0] = repeats
-        return SystemResponse.internal_response(
-        status, 
-        origin, 
-        repeats_dict)
-
-    if isinstance(start, List) and isinstance(end, List):
-        index = 0
-        for item_start, item_end in zip(start, end):
-            result = is_start_before_end(item_start, item_end)
-            if result.status == ResponseStatus.ERROR:
-                return result
-            repeats_dict[str(index)] = repeats
-            for _ in range(occurrences):
-                repeats.append((item_start, item_end))
-                item_start += relativedelta(years=1)
-                item_end += relativedelta(years=1)
-            index += 1
-            repeats = []
-        return SystemResponse.internal_response(
-        status, 
-        origin, 
-        repeats_dict)
-    else:
-        return SystemResponse.internal_response(
-        ResponseStatus.ERROR, 
-        origin, 
-        "Invalid dates structure provided")
+    return _repeat(start, end, origin, recurrence_utils.repeat_months, occurrences, 12)
 
 def repeat_weekday(
     start: datetime, 
@@ -356,24 +275,10 @@ def repeat_weekday(
     Returns:
         InternalResponse: Internal response
     """
-    repeats = []
-    repeats_dict = {}
     origin = inspect.stack()[0].function
-    
-    result = is_start_before_end(start, end)
-    if result.status == ResponseStatus.ERROR:
-            return result
-    while occurrences > 0:
-        if start.weekday() < 5:
-            repeats.append((start, end))
-            occurrences -= 1
-        start += timedelta(days=1)
-        end += timedelta(days=1)
-    repeats_dict[0] = repeats
-    return SystemResponse.internal_response(
-        ResponseStatus.SUCCESS, 
-        origin, 
-        repeats_dict)
+    return _repeat(
+        start, end, origin, recurrence_utils.repeat_busdays, 
+        occurrences, recurrence_utils.WEEKDAYS_MASK)
 
 def repeat_weekend(
     start, 
@@ -390,24 +295,10 @@ def repeat_weekend(
     Returns:
         InternalResponse: Internal response
     """
-    repeats = []
-    repeats_dict = {}
     origin = inspect.stack()[0].function
-    
-    result = is_start_before_end(start, end)
-    if result.status == ResponseStatus.ERROR:
-            return result
-    while occurrences > 0:
-        if start.weekday() >= 5:
-            repeats.append((start, end))
-            occurrences -= 1
-        start += timedelta(days=1)
-        end += timedelta(days=1)
-    repeats_dict[0] = repeats
-    return SystemResponse.internal_response(
-        ResponseStatus.SUCCESS, 
-        origin, 
-        repeats_dict)
+    return _repeat(
+        start, end, origin, recurrence_utils.repeat_busdays, 
+        occurrences, recurrence_utils.WEEKEND_MASK)
 
 def set_weekdays(
     start: datetime, 
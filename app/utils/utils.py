@@ -2,10 +2,14 @@ from app.responses import SystemResponse, InternalResponse
 from app.schemas.schemas import ResponseStatus
 import inspect
 
+import math
 import random
 import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Union
+from typing import Callable, List, Union
 
 import pytz
 from passlib.context import CryptContext
@@ -13,12 +17,137 @@ from sqlalchemy import and_, asc, desc, or_
 from sqlalchemy.orm import Session
 
 import app.models as models
+from app.config import settings
 from app.oauth2 import decode_access_token
 from app.schemas import schemas
 
 utc = pytz.UTC
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PASSWORD_SCHEMES = ["argon2", "bcrypt"]
+
+
+def build_pwd_context(
+    argon2_time_cost: int = settings.argon2_time_cost,
+    bcrypt_rounds: int = settings.bcrypt_rounds,
+) -> CryptContext:
+    """
+    Build the password context from the deployment settings. Hashes from a
+    non-default scheme, with other memory or parallelism, or below the
+    configured cost floor are reported by needs_update
+
+    Args:
+        argon2_time_cost (int, optional): Argon2 iterations for new hashes
+        bcrypt_rounds (int, optional): Bcrypt log rounds for new hashes
+
+    Returns:
+        CryptContext: Password context
+    """
+    return CryptContext(
+        schemes=PASSWORD_SCHEMES,
+        default=settings.password_scheme,
+        deprecated="auto",
+        argon2__type="ID",
+        argon2__memory_cost=settings.argon2_memory_cost,
+        argon2__parallelism=settings.argon2_parallelism,
+        argon2__default_rounds=argon2_time_cost,
+        argon2__min_rounds=min(argon2_time_cost, settings.argon2_time_cost),
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=min(bcrypt_rounds, settings.bcrypt_rounds),
+    )
+
+
+pwd_context = build_pwd_context()
+
+
+def _measure_hash(context: CryptContext) -> float:
+    elapsed = time.perf_counter()
+    context.hash("calibration-password")
+    return time.perf_counter() - elapsed
+
+
+def calibrate_pwd_context(target_ms: int) -> CryptContext:
+    """
+    Pick the cost of the default scheme so one hash (and so one verify)
+    takes about ``target_ms`` on this hardware. The configured cost stays
+    as the floor, calibration can only make hashes stronger
+
+    Args:
+        target_ms (int): Target verify latency in milliseconds
+
+    Returns:
+        CryptContext: Calibrated context, also installed as pwd_context
+    """
+    global pwd_context
+
+    target = target_ms / 1000
+    if settings.password_scheme == "argon2":
+        per_iteration = _measure_hash(build_pwd_context(argon2_time_cost=1))
+        time_cost = max(settings.argon2_time_cost, round(target / per_iteration))
+        pwd_context = build_pwd_context(argon2_time_cost=time_cost)
+    else:
+        base = _measure_hash(build_pwd_context(bcrypt_rounds=4))
+        rounds = 4 + math.floor(math.log2(max(target / base, 1)))
+        rounds = min(max(settings.bcrypt_rounds, rounds), 31)
+        pwd_context = build_pwd_context(bcrypt_rounds=rounds)
+    return pwd_context
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when every hashing slot, running or pending, is taken"""
+
+    def __init__(self, stats: dict):
+        super().__init__("Password hashing pool saturated")
+        self.stats = stats
+
+
+class HashingPool:
+    """
+    Dedicated executor for password hashing. At most ``workers`` hashes run
+    at once and ``max_pending`` more may wait for a worker; any other call
+    is rejected right away instead of holding a request thread
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hashing"
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def run(self, fn: Callable, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingPoolSaturated(self.stats())
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Queue depth and counters of the pool"""
+        with self._lock:
+            running = min(self._in_flight, self.workers)
+            return {
+                "workers": self.workers,
+                "running": running,
+                "queued": self._in_flight - running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+hashing_pool = HashingPool(settings.hashing_workers, settings.hashing_max_pending)
 
 
 def hash_password(pwd: str) -> InternalResponse:
@@ -31,11 +160,16 @@ def hash_password(pwd: str) -> InternalResponse:
         _type_: Hashed password
     """
     origin = inspect.stack()[0].function
-    message = pwd_context.hash(pwd)
+    message = hashing_pool.run(pwd_context.hash, pwd)
     return SystemResponse.internal_response(
         ResponseStatus.SUCCESS, origin, message)
 
 
+def password_needs_update(hashed_password: str) -> bool:
+    """Check if a stored hash was made with an outdated scheme or cost"""
+    return pwd_context.needs_update(hashed_password)
+
+
 def is_password_valid(plain_password: str, hash_password: str) -> dict:
     """Verifies a given plain password is valid
 
@@ -47,7 +181,7 @@ def is_password_valid(plain_password: str, hash_password: str) -> dict:
         bool: True or False if matches
     """
     origin = inspect.stack()[0].function
-    result = pwd_context.verify(plain_password, hash_password)
+    result = hashing_pool.run(pwd_context.verify, plain_password, hash_password)
     
     status=ResponseStatus.SUCCESS
     message="Accepted password"
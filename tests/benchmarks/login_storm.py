@@ -0,0 +1,74 @@
+"""
+Login storm benchmark, kept out of the unit suite.
+
+Fires a burst of real /auth/login requests at a running server together
+with cheap requests to another endpoint, and reports the latency of both.
+With the bounded hashing pool the cheap requests keep a low latency and the
+excess logins are answered with 503 at once.
+
+Run the server with RATE_LIMIT_ENABLED=false, otherwise the login budget
+answers most of the storm with 429:
+
+    python -m tests.benchmarks.login_storm --username user --password secret
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+async def timed(client: httpx.AsyncClient, method: str, path: str, **kwargs):
+    started = time.perf_counter()
+    response = await client.request(method, path, **kwargs)
+    return response.status_code, time.perf_counter() - started
+
+
+def summary(name: str, results: list) -> str:
+    latencies = sorted(latency for _, latency in results)
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    statuses = dict(Counter(status for status, _ in results))
+    return (
+        f"{name}: {len(results)} requests, statuses {statuses}, "
+        f"median {statistics.median(latencies) * 1000:.0f}ms, "
+        f"p95 {p95 * 1000:.0f}ms, max {latencies[-1] * 1000:.0f}ms"
+    )
+
+
+async def storm(args: argparse.Namespace):
+    limits = httpx.Limits(max_connections=args.logins + args.others)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        credentials = {"username": args.username, "password": args.password}
+        logins = [
+            timed(client, "POST", "/auth/login", data=credentials)
+            for _ in range(args.logins)
+        ]
+        others = [timed(client, "GET", args.other_path) for _ in range(args.others)]
+        started = time.perf_counter()
+        results = await asyncio.gather(*logins, *others)
+        elapsed = time.perf_counter() - started
+
+    print(summary("login", results[: args.logins]))
+    print(summary(args.other_path, results[args.logins:]))
+    print(f"total {elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--others", type=int, default=8)
+    parser.add_argument("--other-path", default="/legal/terms-of-service/")
+    parser.add_argument("--timeout", type=float, default=60)
+    asyncio.run(storm(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
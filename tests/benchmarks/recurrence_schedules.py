@@ -0,0 +1,60 @@
+"""
+Recurrence schedule benchmark, kept out of the unit suite.
+
+Times repeat_days and repeat_busdays over large schedules and reports the
+best and median run of each, so regressions in the vectorised expansion
+show up without a wall-clock assertion in the tests:
+
+    python -m tests.benchmarks.recurrence_schedules --occurrences 20000
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app.utils import recurrence_utils
+
+
+def timed(build, repeats: int) -> list:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summary(name: str, timings: list) -> str:
+    return (
+        f"{name}: best {min(timings) * 1000:.1f}ms, "
+        f"median {statistics.median(timings) * 1000:.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--occurrences", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    start = datetime(2024, 1, 31, 15, 30)
+    end = start + timedelta(hours=2)
+    cases = {
+        "repeat_days": lambda: recurrence_utils.repeat_days(
+            start, end, args.occurrences
+        ),
+        "repeat_busdays weekdays": lambda: recurrence_utils.repeat_busdays(
+            start, end, args.occurrences, recurrence_utils.WEEKDAYS_MASK
+        ),
+        "repeat_busdays weekend": lambda: recurrence_utils.repeat_busdays(
+            start, end, args.occurrences, recurrence_utils.WEEKEND_MASK
+        ),
+    }
+    print(f"{args.occurrences} occurrences, {args.repeats} runs")
+    for name, build in cases.items():
+        print(summary(name, timed(build, args.repeats)))
+
+
+if __name__ == "__main__":
+    main()
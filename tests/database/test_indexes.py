@@ -0,0 +1,147 @@
+import pytest
+from sqlalchemy import and_, func, inspect, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database.connection import engine
+from app.models import EventsHeaders, EventsLines, Rates, Users, VerificationCodes
+
+HOT_INDEXES = {
+    "events_lines": {"ix_events_lines_header_id"},
+    "rate": {"ix_rate_line_id"},
+    "events_headers": {
+        "ix_events_headers_owner_id",
+        "ix_events_headers_owner_id_staging",
+    },
+    "users": {"uq_users_lower_username", "uq_users_lower_email"},
+    "verification_codes": {
+        "ix_verification_codes_email_code",
+        "ix_verification_codes_expires_at",
+    },
+}
+
+
+def explain(connection, query) -> str:
+    statement = query.statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    rows = connection.execute(text(f"EXPLAIN {statement}")).all()
+    return "\n".join(row[0] for row in rows)
+
+
+class TestModelIndexes:
+
+    @pytest.mark.parametrize("table, expected", HOT_INDEXES.items())
+    def test_hot_indexes_declared(self, table, expected):
+        tables = {
+            "events_lines": EventsLines,
+            "rate": Rates,
+            "events_headers": EventsHeaders,
+            "users": Users,
+            "verification_codes": VerificationCodes,
+        }
+        declared = {index.name for index in tables[table].__table__.indexes}
+
+        assert expected.issubset(declared)
+
+
+class TestQueryPlans:
+    """Requires a migrated PostgreSQL database, skipped otherwise"""
+
+    @pytest.fixture(scope="class")
+    def connection(self):
+        try:
+            connection = engine.connect()
+        except OperationalError:
+            pytest.skip("PostgreSQL database not available")
+
+        existing = set(inspect(connection).get_table_names())
+        if not set(HOT_INDEXES).issubset(existing):
+            connection.close()
+            pytest.skip("Database schema not migrated")
+
+        # Tables are tiny in test databases, force the planner to show
+        # whether an index path exists at all
+        connection.execute(text("SET enable_seqscan = off"))
+        yield connection
+        connection.rollback()
+        connection.close()
+
+    @pytest.fixture(scope="class")
+    def db(self, connection):
+        return Session(bind=connection)
+
+    def test_header_from_lines_join_avoids_seq_scan(self, connection, db):
+        query = (
+            db.query(EventsHeaders)
+            .join(EventsLines, EventsLines.header_id == EventsHeaders.id)
+            .filter(EventsLines.id.in_([1, 2]), EventsHeaders.owner_id == 1)
+        )
+
+        assert "Seq Scan" not in explain(connection, query)
+
+    def test_owned_lines_uses_header_index(self, connection, db):
+        query = db.query(EventsLines).filter(EventsLines.header_id.in_([1, 2]))
+
+        assert "ix_events_lines_header_id" in explain(connection, query)
+
+    def test_rates_by_line_uses_index(self, connection, db):
+        query = db.query(Rates).filter(Rates.line_id.in_([1, 2]))
+
+        assert "ix_rate_line_id" in explain(connection, query)
+
+    def test_headers_by_owner_uses_index(self, connection, db):
+        query = db.query(EventsHeaders).filter(EventsHeaders.owner_id == 1)
+
+        assert "ix_events_headers_owner_id" in explain(connection, query)
+
+    def test_pending_headers_uses_partial_index(self, connection, db):
+        query = db.query(EventsHeaders).filter(
+            and_(EventsHeaders.status == 1, EventsHeaders.owner_id == 1)
+        )
+
+        assert "ix_events_headers_owner_id_staging" in explain(connection, query)
+
+    def test_rates_ownership_join_avoids_seq_scan(self, connection, db):
+        query = (
+            db.query(EventsHeaders.id, EventsLines.id)
+            .join(EventsLines, EventsLines.header_id == EventsHeaders.id)
+            .join(Rates, Rates.line_id == EventsLines.id)
+            .filter(Rates.id.in_([1, 2]), EventsHeaders.owner_id == 1)
+        )
+
+        assert "Seq Scan" not in explain(connection, query)
+
+    def test_code_lookup_is_index_only(self, connection, db):
+        query = db.query(VerificationCodes.expires_at).filter(
+            VerificationCodes.email == "test@mail.com",
+            VerificationCodes.code == 123456,
+        )
+
+        plan = explain(connection, query)
+        assert "Index Only Scan" in plan
+        assert "ix_verification_codes_email_code" in plan
+
+    def test_expired_codes_use_index(self, connection, db):
+        query = db.query(VerificationCodes.email).filter(
+            VerificationCodes.expires_at < "2024-01-01"
+        )
+
+        assert "ix_verification_codes_expires_at" in explain(connection, query)
+
+    @pytest.mark.parametrize(
+        "column, value, index",
+        [
+            (Users.username, "texample", "uq_users_lower_username"),
+            (Users.email, "test@mail.com", "uq_users_lower_email"),
+        ],
+    )
+    def test_account_lookup_uses_lower_index(
+        self, connection, db, column, value, index
+    ):
+        query = db.query(Users).filter(
+            and_(func.lower(column) == value, Users.is_validated == True)  # noqa: E712
+        )
+
+        assert index in explain(connection, query)
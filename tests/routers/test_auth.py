@@ -1,5 +1,5 @@
 import json
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 
 import jwt
 import pytest
@@ -37,9 +37,7 @@ class TestAuth:
             password="hashed_password",
             full_name="Test Example",
             username="texample",
-            code=123456,
             is_validated=True,
-            code_expiration=datetime.now(timezone.utc),
         )
 
         mock_session.query().filter().first.return_value = mock_user
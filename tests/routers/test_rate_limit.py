@@ -0,0 +1,244 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from limits import parse
+from limits.storage import MemoryStorage, storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+from pytest_mock import MockFixture
+from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
+
+from app import oauth2
+from app.config import Settings
+from app.rate_limit import (
+    BatchedStorage,
+    build_limiter,
+    get_client_address,
+    limiter,
+    rate_limit_handler,
+    rate_limit_key,
+)
+from app.routers import auth
+from app.services.revocation_service import RevocationSet
+from app.services.token_service import TokenCache
+
+
+def make_request(headers: dict, client=("10.0.0.1", 4321)) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in headers.items()
+            ],
+            "client": client,
+        }
+    )
+
+
+@pytest.fixture
+def sessions(mocker: MockFixture):
+    mocker.patch.object(oauth2, "access_tokens", TokenCache(100))
+    mocker.patch.object(oauth2, "revocations", RevocationSet())
+
+
+class TestRateLimitKey:
+
+    @pytest.mark.parametrize(
+        "forwarded, proxies, expected",
+        [
+            (None, 1, "10.0.0.1"),
+            ("1.1.1.1", 1, "1.1.1.1"),
+            ("1.1.1.1, 2.2.2.2", 1, "2.2.2.2"),
+            ("1.1.1.1, 2.2.2.2", 2, "1.1.1.1"),
+            ("1.1.1.1, 2.2.2.2", 5, "1.1.1.1"),
+            ("1.1.1.1, 2.2.2.2", 0, "10.0.0.1"),
+        ],
+    )
+    def test_client_address(self, mocker: MockFixture, forwarded, proxies, expected):
+        mocker.patch("app.rate_limit.settings.rate_limit_trusted_proxies", proxies)
+        headers = {"X-Forwarded-For": forwarded} if forwarded else {}
+
+        assert get_client_address(make_request(headers)) == expected
+
+    def test_forwarded_header_ignored_by_default(self, mocker: MockFixture):
+        default = Settings.model_fields["rate_limit_trusted_proxies"].default
+        mocker.patch("app.rate_limit.settings.rate_limit_trusted_proxies", default)
+
+        request = make_request({"X-Forwarded-For": "1.1.1.1"})
+
+        assert get_client_address(request) == "10.0.0.1"
+
+    def test_verify_code_limited(self):
+        limits = limiter._route_limits[f"{auth.__name__}.{auth.verify_code.__name__}"]
+
+        assert [str(limit.limit) for limit in limits] == ["10 per 1 minute"]
+
+    def test_key_from_user(self, sessions):
+        token = oauth2.create_access_token({"user_id": 7})
+        request = make_request({"Authorization": f"Bearer {token}"})
+
+        assert rate_limit_key(request) == "user:7"
+
+    def test_key_from_address_on_invalid_token(self, sessions, mocker: MockFixture):
+        mocker.patch("app.rate_limit.settings.rate_limit_trusted_proxies", 1)
+        request = make_request(
+            {"Authorization": "Bearer not-a-token", "X-Forwarded-For": "1.1.1.1"}
+        )
+
+        assert rate_limit_key(request) == "ip:1.1.1.1"
+
+
+class TestRouteBudgets:
+
+    @pytest.fixture
+    def client(self, sessions, mocker: MockFixture):
+        mocker.patch("app.rate_limit.settings.rate_limit_trusted_proxies", 1)
+        limiter = Limiter(key_func=rate_limit_key, storage_uri="memory://")
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
+
+        @app.post("/login")
+        @limiter.limit("2/minute")
+        def login(request: Request):
+            return {}
+
+        @app.get("/geocode")
+        @limiter.limit("1/minute")
+        def geocode(request: Request):
+            return {}
+
+        return TestClient(app)
+
+    def test_routes_have_separate_budgets(self, client):
+        headers = {"X-Forwarded-For": "1.1.1.1"}
+
+        statuses = [
+            client.post("/login", headers=headers).status_code for _ in range(3)
+        ]
+
+        assert statuses == [200, 200, 429]
+        assert client.get("/geocode", headers=headers).status_code == 200
+
+    def test_clients_behind_ingress_have_own_budget(self, client):
+        for address in ("1.1.1.1", "2.2.2.2"):
+            response = client.get("/geocode", headers={"X-Forwarded-For": address})
+            assert response.status_code == 200
+
+        response = client.get("/geocode", headers={"X-Forwarded-For": "1.1.1.1"})
+        assert response.status_code == 429
+        assert response.json()["status"] == "error"
+
+    def test_users_have_own_budget(self, client):
+        for user_id in (1, 2):
+            token = oauth2.create_access_token({"user_id": user_id})
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "X-Forwarded-For": "1.1.1.1",
+            }
+            response = client.get("/geocode", headers=headers)
+            assert response.status_code == 200
+
+
+class TestBatchedStorage:
+
+    @pytest.fixture(autouse=True)
+    def sync_settings(self, mocker: MockFixture):
+        mocker.patch("app.rate_limit.settings.rate_limit_sync_hits", 10)
+        mocker.patch("app.rate_limit.settings.rate_limit_sync_ms", 60_000)
+
+    def test_wraps_shared_storage(self):
+        storage = storage_from_string("batched+memory://")
+
+        assert isinstance(storage, BatchedStorage)
+        assert isinstance(storage.shared, MemoryStorage)
+
+    def test_hits_synchronised_in_batches(self, mocker: MockFixture):
+        storage = storage_from_string("batched+memory://")
+        spy = mocker.spy(storage.shared, "incr")
+
+        counts = [storage.incr("key", 60) for _ in range(100)]
+
+        assert counts == list(range(1, 101))
+        # First hit, then one call every 10 hits, 9 hits still local
+        assert spy.call_count == 10
+        assert storage.shared.get("key") == 91
+        assert storage.get("key") == 100
+
+    def test_hits_synchronised_after_interval(self, mocker: MockFixture):
+        mock_time = mocker.patch("app.rate_limit.time.time", return_value=1000.0)
+        mocker.patch("app.rate_limit.settings.rate_limit_sync_ms", 100)
+        storage = storage_from_string("batched+memory://")
+        storage.incr("key", 60)
+        storage.incr("key", 60)
+
+        assert storage.shared.get("key") == 1
+
+        mock_time.return_value = 1000.2
+        storage.incr("key", 60)
+
+        assert storage.shared.get("key") == 3
+
+    def test_cluster_limit_within_one_batch(self):
+        replicas = [storage_from_string("batched+memory://") for _ in range(2)]
+        replicas[1].shared = replicas[0].shared
+        limiters = [FixedWindowRateLimiter(replica) for replica in replicas]
+        item = parse("50/minute")
+
+        admitted = sum(
+            limiters[index % 2].hit(item, "user:1") for index in range(400)
+        )
+
+        assert 50 <= admitted <= 50 + 2 * 9
+
+    def test_unknown_key_reads_shared(self):
+        storage = storage_from_string("batched+memory://")
+        storage.shared.incr("key", 60, amount=4)
+
+        assert storage.get("key") == 4
+
+    def test_clear(self):
+        storage = storage_from_string("batched+memory://")
+        storage.incr("key", 60)
+        storage.clear("key")
+
+        assert storage.get("key") == 0
+
+
+class TestLimiterStrategy:
+
+    def test_default_strategy_unchanged(self, mocker: MockFixture):
+        mocker.patch("app.rate_limit.settings", Settings())
+
+        assert isinstance(build_limiter().limiter, MovingWindowRateLimiter)
+
+    def test_batched_storage_with_default_strategy(self, mocker: MockFixture):
+        mocker.patch(
+            "app.rate_limit.settings",
+            Settings(rate_limit_storage_uri="batched+memory://"),
+        )
+
+        limiter = build_limiter()
+        item = parse("1/minute")
+
+        assert isinstance(limiter.limiter, FixedWindowRateLimiter)
+        assert isinstance(limiter.limiter.storage, BatchedStorage)
+        assert limiter.limiter.hit(item, "user:1")
+        assert not limiter.limiter.hit(item, "user:1")
+
+    def test_batched_storage_rejects_explicit_moving_window(
+        self, mocker: MockFixture
+    ):
+        mocker.patch(
+            "app.rate_limit.settings",
+            Settings(
+                rate_limit_storage_uri="batched+memory://",
+                rate_limit_strategy="moving-window",
+            ),
+        )
+
+        with pytest.raises(ValueError, match="not supported by batched storage"):
+            build_limiter()
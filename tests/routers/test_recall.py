@@ -1,14 +1,30 @@
 import json
-from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
 
 import pytest
 from fastapi import HTTPException
 from pytest_mock import MockerFixture
-from sqlalchemy.orm import Session
 
 from app.exception_handlers import custom_http_exception_handler
 from app.routers import recall
-from app.schemas import schemas
+from app.services.taxonomy_service import (
+    Taxonomy,
+    TaxonomyEntry,
+    TaxonomyService,
+)
+
+CATEGORIES = [
+    {"id": 1, "category": "Sports", "code": "cat.1"},
+    {"id": 6, "category": "Travel", "code": "cat.6"},
+]
+TAGS = {
+    "Destinations": [
+        {
+            "subcategory_code": "subcat.6.1",
+            "tags": [{"id": 251, "name": "Paris"}, {"id": 252, "name": "Tokyo"}],
+        }
+    ],
+}
 
 
 class TestRecall:
@@ -24,122 +40,71 @@ class TestRecall:
 
         return mock_request
 
-    def test_get_categories_success(self, mocker: MockerFixture, mock_request):
-        db_session = mocker.Mock()
-
-        mock_db_response = [
-            (1, "Sports", "cat.1"),
-            (2, "Culture", "cat.2"),
-            (3, "Tech", "cat.3"),
-            (4, "Media", "cat.4"),
-            (5, "Food", "cat.5"),
-            (6, "Travel", "cat.6"),
-            (7, "Fashion", "cat.7"),
-            (8, "Health & Wellness", "cat.8"),
-        ]
-        mock_expected_data = [
-            {"id": row[0], "category": row[1], "code": row[2]}
-            for row in mock_db_response
-        ]
-
-        db_session.query().all.return_value = mock_db_response
-        expected_output = schemas.SuccessResponse(
-            status="success",
-            message="Categories settings",
-            data=mock_expected_data,
-            meta={
-                "request_id": mock_request.headers.get("request-id"),
-                "client": mock_request.headers.get("client-type"),
-            },
+    @pytest.fixture
+    def taxonomy(self, mocker: MockerFixture):
+        taxonomy = Taxonomy(
+            version=0,
+            categories=TaxonomyEntry.from_data(tuple(CATEGORIES)),
+            tags=MappingProxyType({6: TaxonomyEntry.from_data(TAGS)}),
+        )
+        mocker.patch.object(TaxonomyService, "get", return_value=taxonomy)
+        return taxonomy
+
+    def test_get_categories_success(
+        self, mocker: MockerFixture, mock_request, taxonomy
+    ):
+        result = recall.get_categories(
+            mocker.Mock(), if_none_match=None, request=mock_request
         )
 
-        response = recall.get_categories(db_session, request=mock_request)
-
-        assert expected_output == response
-
-    def test_get_categories_exception(self, mocker: MockerFixture, mock_request):
-        db_session = mocker.Mock()
-
-        db_session.query().all.return_value = None
-        expected_error = {
-            "status": "error",
-            "message": "Not Found",
-            "data": {"type": "GetCategories", "message": "Not Found", "details": None},
-            "meta": {
-                "request_id": mock_request.headers.get("request-id"),
-                "client": mock_request.headers.get("client-type"),
-            },
+        assert json.loads(result.body) == {
+            "status": "success",
+            "message": "Categories Settings",
+            "data": CATEGORIES,
+            "meta": {"request_id": "default_request_id", "client": "unknown"},
         }
+        assert result.media_type == "application/json"
+        assert result.headers["ETag"] == taxonomy.categories.etag
 
-        with pytest.raises(HTTPException) as exception_data:
-            recall.get_categories(db_session, request=mock_request)
-
-        error_output = custom_http_exception_handler(mock_request, exception_data.value)
-        error_body = error_output.body.decode("utf-8")
-        error_response = json.loads(error_body)
-
-        assert expected_error == error_response
-
-    def test_get_tags_success(self, mocker: MockerFixture, mock_request):
+    def test_get_categories_not_modified(
+        self, mocker: MockerFixture, mock_request, taxonomy
+    ):
         db_session = mocker.Mock()
 
-        mock_db_response = [
-            (251, "Paris", 26, "subcat.6.1", "Destinations"),
-            (252, "New York City", 26, "subcat.6.1", "Destinations"),
-            (253, "Tokyo", 26, "subcat.6.1", "Destinations"),
-            (254, "Rome", 26, "subcat.6.1", "Destinations"),
-            (255, "London", 26, "subcat.6.1", "Destinations"),
-            (300, "Travel Blog", 30, "subcat.6.5", "Travel Photography"),
-        ]
-
-        mock_expected_data = {
-            "Destinations": [
-                {
-                    "subcategory_code": "subcat.6.1",
-                    "tags": [
-                        {"id": 251, "name": "Paris"},
-                        {"id": 252, "name": "New York City"},
-                        {"id": 253, "name": "Tokyo"},
-                        {"id": 254, "name": "Rome"},
-                        {"id": 255, "name": "London"},
-                    ],
-                }
-            ],
-            "Travel Photography": [
-                {
-                    "subcategory_code": "subcat.6.5",
-                    "tags": [{"id": 300, "name": "Travel Blog"}],
-                }
-            ],
-        }
-
-        db_session.query.return_value.join.return_value.join.return_value.filter.return_value.all.return_value = (
-            mock_db_response
-        )
-        expected_output = schemas.SuccessResponse(
-            status="success",
-            message="Tags",
-            data=mock_expected_data,
-            meta={
-                "request_id": mock_request.headers.get("request-id"),
-                "client": mock_request.headers.get("client-type"),
-            },
+        result = recall.get_categories(
+            db_session,
+            if_none_match=taxonomy.categories.etag,
+            request=mock_request,
         )
 
-        response = recall.get_tags(3, db_session, request=mock_request)
+        assert result.status_code == 304
+        assert result.headers["ETag"] == taxonomy.categories.etag
+        db_session.execute.assert_not_called()
 
-        assert expected_output == response
+    def test_get_tags_success(self, mocker: MockerFixture, mock_request, taxonomy):
+        result = recall.get_tags(
+            6, mocker.Mock(), if_none_match='"stale"', request=mock_request
+        )
 
-    def test_get_tags_exception(self, mocker: MockerFixture, mock_request):
-        db_session = mocker.Mock()
+        assert json.loads(result.body)["data"] == TAGS
+        assert taxonomy.tags[6].body in result.body
+        assert result.headers["ETag"] == taxonomy.tags[6].etag
 
-        db_session.query.return_value.join.return_value.join.return_value.filter.return_value.all.return_value = (
-            None
+    def test_get_tags_not_modified(self, mocker: MockerFixture, mock_request, taxonomy):
+        result = recall.get_tags(
+            6,
+            mocker.Mock(),
+            if_none_match=f'"stale", {taxonomy.tags[6].etag.removeprefix("W/")}',
+            request=mock_request,
         )
+
+        assert result.status_code == 304
+
+    def test_get_tags_exception(self, mocker: MockerFixture, mock_request, taxonomy):
         expected_error = {
             "status": "error",
-            "message": "Not Found",
-            "data": {"type": "GetTags", "message": "Not Found", "details": None},
+            "message": "Not found",
+            "data": {"type": "Tags Settings", "message": "Not found", "details": None},
             "meta": {
                 "request_id": mock_request.headers.get("request-id"),
                 "client": mock_request.headers.get("client-type"),
@@ -147,7 +112,9 @@ class TestRecall:
         }
 
         with pytest.raises(HTTPException) as exception_data:
-            recall.get_tags(3, db_session, request=mock_request)
+            recall.get_tags(
+                3, mocker.Mock(), if_none_match=None, request=mock_request
+            )
 
         error_output = custom_http_exception_handler(mock_request, exception_data.value)
         error_body = error_output.body.decode("utf-8")
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas import NewPostLinesInput, UpdatePostConfirmInput
+
+
+@pytest.fixture
+def mock_line():
+    return {
+        "start": "2025-01-06T18:00:00+02:00",
+        "end": "2025-01-06T20:00:00+02:00",
+        "rate": {"title": "General", "amount": 10.0, "currency": "EUR"},
+        "isPublic": True,
+        "capacity": 50,
+    }
+
+
+@pytest.fixture
+def mock_lines_input(mock_line):
+    return {
+        "header_id": 1,
+        "user_timezone": "Europe/Madrid",
+        "line": mock_line,
+        "repeat": False,
+        "custom_option_selected": False,
+    }
+
+
+@pytest.fixture
+def mock_change():
+    return {
+        "status": "success",
+        "source": "events_headers",
+        "message": None,
+        "header_id": 1,
+        "record_id": 1,
+        "field": "title",
+        "old_value": "Old",
+        "new_value": "New",
+    }
+
+
+class TestNewPostLinesInput:
+
+    def test_single_line_normalised(self, mock_lines_input):
+        posting_lines = NewPostLinesInput(**mock_lines_input)
+        line = posting_lines.line[0]
+
+        assert len(posting_lines.line) == 1
+        assert len(line.rate) == 1
+        assert line.start == datetime(2025, 1, 6, 16, 0, tzinfo=timezone.utc)
+        assert line.start.tzinfo is timezone.utc
+
+    def test_naive_dates_taken_as_utc(self, mock_lines_input):
+        mock_lines_input["line"]["start"] = "2025-01-06T18:00:00"
+        mock_lines_input["line"]["end"] = "2025-01-06T20:00:00"
+
+        line = NewPostLinesInput(**mock_lines_input).line[0]
+
+        assert line.end == datetime(2025, 1, 6, 20, 0, tzinfo=timezone.utc)
+
+    @pytest.mark.parametrize(
+        "field, value, error",
+        [
+            ("line", [], "line"),
+            ("when_to", 5, "when_to"),
+            ("for_days", [0, 7], "for_days"),
+            ("line", {"start": "2025-01-06T18:00:00Z"}, "line.0.end"),
+        ],
+    )
+    def test_invalid_shapes(self, mock_lines_input, field, value, error):
+        mock_lines_input[field] = value
+
+        with pytest.raises(ValidationError, match=error):
+            NewPostLinesInput(**mock_lines_input)
+
+    def test_end_before_start(self, mock_lines_input):
+        mock_lines_input["line"]["end"] = "2025-01-06T17:00:00+02:00"
+
+        with pytest.raises(ValidationError, match="Line end must be after its start"):
+            NewPostLinesInput(**mock_lines_input)
+
+    def test_large_payload_validation(self, mock_lines_input, mock_line):
+        start = datetime(2025, 1, 6, 18, 0, tzinfo=timezone.utc)
+        mock_lines_input["line"] = [
+            dict(
+                mock_line,
+                start=(start + timedelta(days=day)).isoformat(),
+                end=(start + timedelta(days=day, hours=2)).isoformat(),
+            )
+            for day in range(5_000)
+        ]
+
+        elapsed = time.perf_counter()
+        posting_lines = NewPostLinesInput(**mock_lines_input)
+        elapsed = time.perf_counter() - elapsed
+
+        assert len(posting_lines.line) == 5_000
+        assert all(line.start.tzinfo is timezone.utc for line in posting_lines.line)
+        assert elapsed < 0.5
+
+
+class TestUpdatePostConfirmInput:
+
+    def test_tables_by_position(self, mock_change):
+        line_change = dict(mock_change, source="events_lines", field="capacity")
+
+        confirmed = UpdatePostConfirmInput(data=[[mock_change], [line_change], []])
+
+        assert confirmed.data[1][0].field == "capacity"
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            [[], []],
+            [[], [], [], []],
+            [[], [{"source": "events_headers"}], []],
+        ],
+    )
+    def test_invalid_tables(self, mock_change, data):
+        data = [
+            [dict(mock_change, **item) for item in table] for table in data
+        ]
+
+        with pytest.raises(ValidationError):
+            UpdatePostConfirmInput(data=data)
@@ -1,6 +1,9 @@
+import time
+
 import pytest
 from app.models import EventsHeaders
-from app.services.common.structures import GenerateStructureService
+from app.schemas import SourceTable
+from app.services.common.structures import ChangeSet, GenerateStructureService
 
 @pytest.fixture
 def mock_header_record():
@@ -40,3 +43,65 @@ class TestGenerateStructureService:
             assert response == expected_serialized_header_record
         else:
             assert response == None  # noqa: E711
+
+def make_change(source, header_id, record_id, field, old_value=None, new_value=None):
+    return {
+        "source": source,
+        "header_id": header_id,
+        "record_id": record_id,
+        "field": field,
+        "old_value": old_value,
+        "new_value": new_value,
+    }
+
+class TestChangeSet:
+    
+    @pytest.fixture
+    def mock_changes(self):
+        return [
+            make_change("events_headers", 1, 1, "title", "Old", "New"),
+            make_change("events_lines", 1, 10, "capacity", 5, 10),
+            make_change("rates", 1, 30, "amount", 5.0, 0.0),
+            make_change("events_lines", 1, 10, "isPublic", True, False),
+            make_change("events_lines", 2, 20, "capacity", 1, 2),
+        ]
+    
+    def test_record_index(self, mock_changes):
+        changes = ChangeSet(mock_changes)
+        
+        assert len(changes) == 5
+        assert changes.record_ids(SourceTable.LINES) == [10, 20]
+        assert changes.record_ids(SourceTable.RATES) == [30]
+        assert [c["field"] for c in changes.for_record(SourceTable.LINES, 10)] == [
+            "capacity", "isPublic"]
+        assert changes.for_record(SourceTable.LINES, 99) == []
+    
+    def test_by_header(self, mock_changes):
+        grouped = ChangeSet(mock_changes).by_header()
+        
+        assert [list(group) for group in grouped] == [[1], [2]]
+        header = grouped[0][1]
+        assert header["events_headers"] == [
+            {"field": "title", "old_value": "Old", "new_value": "New"}]
+        assert len(header["events_lines"][10]["fields"]) == 2
+        assert header["events_lines"][30] == {
+            "fields": [],
+            "rates": [{"rate_id": 30, "field": "amount", "old_value": 5.0, "new_value": 0.0}],
+        }
+    
+    def test_bulk_edit_scales_linearly(self):
+        def build(size):
+            elapsed = time.perf_counter()
+            changes = ChangeSet(
+                make_change("events_lines", record_id % 10, record_id, field)
+                for record_id in range(size)
+                for field in ("start", "end")
+            )
+            for record_id in changes.record_ids(SourceTable.LINES):
+                changes.for_record(SourceTable.LINES, record_id)
+            changes.by_header()
+            return time.perf_counter() - elapsed
+        
+        small, large = build(5_000), build(50_000)
+        
+        assert large < small * 30
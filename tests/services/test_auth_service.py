@@ -0,0 +1,270 @@
+import secrets
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import insert, inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database.connection import engine
+from app.models import Users, VerificationCodes
+from app.schemas.schemas import RegisterInput, ResponseStatus
+from app.services.auth_service import CODE_SPACE, AuthService
+from app.utils.fetch_data_utils import (
+    get_code_owner,
+    refresh_code,
+    store_code,
+    validate_code,
+)
+from app.utils.utils import HashingPoolSaturated
+
+
+@pytest.fixture
+def database_session():
+    """Session over a rolled back transaction, needs a migrated PostgreSQL"""
+    try:
+        connection = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL database not available")
+    transaction = connection.begin()
+    if "verification_codes" not in inspect(connection).get_table_names():
+        connection.close()
+        pytest.skip("Database schema not migrated")
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+class TestAuthService:
+
+    @pytest.fixture
+    def user(self):
+        return Users(id=1, username="user", password="$2b$12$legacyhash")
+
+    @pytest.fixture
+    def mock_utils(self, mocker: MockerFixture, user):
+        mocker.patch(
+            "app.services.auth_service.fetch_data_utils.validate_account",
+            return_value=mocker.Mock(status=ResponseStatus.SUCCESS, message=user),
+        )
+        mocker.patch(
+            "app.services.auth_service.utils.is_password_valid",
+            return_value=mocker.Mock(status=ResponseStatus.SUCCESS),
+        )
+        return mocker.patch("app.services.auth_service.utils.hash_password")
+
+    @pytest.mark.parametrize("needs_update", [True, False])
+    def test_validate_user_rehash(
+        self, mocker: MockerFixture, mock_utils, user, needs_update
+    ):
+        db_session = mocker.Mock()
+        mocker.patch(
+            "app.services.auth_service.utils.password_needs_update",
+            return_value=needs_update,
+        )
+        mock_utils.return_value = mocker.Mock(
+            status=ResponseStatus.SUCCESS, message="$argon2id$newhash"
+        )
+
+        result = AuthService.validate_user(db_session, "user", "Secret123!")
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert user.password == (
+            "$argon2id$newhash" if needs_update else "$2b$12$legacyhash"
+        )
+        assert db_session.commit.call_count == int(needs_update)
+
+    def test_validate_user_skips_rehash_when_busy(
+        self, mocker: MockerFixture, mock_utils, user
+    ):
+        db_session = mocker.Mock()
+        mocker.patch(
+            "app.services.auth_service.utils.password_needs_update", return_value=True
+        )
+        mock_utils.side_effect = HashingPoolSaturated({})
+
+        result = AuthService.validate_user(db_session, "user", "Secret123!")
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert user.password == "$2b$12$legacyhash"
+        db_session.commit.assert_not_called()
+
+
+class TestAddUser:
+
+    @pytest.fixture
+    def credentials(self):
+        return RegisterInput(
+            email="new@mail.com",
+            password="$argon2id$hash",
+            full_name="New User",
+            username="newuser",
+        )
+
+    def test_add_user_single_statement(self, mocker: MockerFixture, credentials):
+        db_session = mocker.Mock()
+        db_session.execute.return_value.scalar.return_value = 7
+
+        result = AuthService.add_user(db_session, credentials)
+        insert_sql = str(
+            db_session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        )
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == 7
+        assert "ON CONFLICT DO NOTHING" in insert_sql
+        assert "RETURNING users.id" in insert_sql
+        db_session.execute.assert_called_once()
+        db_session.commit.assert_called_once()
+
+    def test_add_user_without_commit(self, mocker: MockerFixture, credentials):
+        db_session = mocker.Mock()
+        db_session.execute.return_value.scalar.return_value = 7
+
+        result = AuthService.add_user(db_session, credentials, commit=False)
+
+        assert result.status == ResponseStatus.SUCCESS
+        db_session.commit.assert_not_called()
+
+    def test_add_user_taken(self, mocker: MockerFixture, credentials):
+        db_session = mocker.Mock()
+        db_session.execute.return_value.scalar.return_value = None
+
+        result = AuthService.add_user(db_session, credentials)
+
+        assert result.status == ResponseStatus.ERROR
+        assert result.message == "Username or email already registered"
+
+    def test_add_user_error(self, mocker: MockerFixture, credentials):
+        db_session = mocker.Mock()
+        db_session.execute.side_effect = OperationalError("INSERT", {}, Exception())
+
+        result = AuthService.add_user(db_session, credentials)
+
+        assert result.status == ResponseStatus.ERROR
+        db_session.rollback.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "username, email, added",
+        [
+            ("NewUser", "other@mail.com", False),
+            ("other", "NEW@Mail.com", False),
+            ("other", "other@mail.com", True),
+        ],
+    )
+    def test_add_user_case_insensitive(
+        self, database_session, credentials, username, email, added
+    ):
+        assert AuthService.add_user(database_session, credentials).status == (
+            ResponseStatus.SUCCESS
+        )
+        duplicate = credentials.model_copy(
+            update={"username": username, "email": email}
+        )
+
+        result = AuthService.add_user(database_session, duplicate)
+
+        assert (result.status == ResponseStatus.SUCCESS) is added
+
+    def test_add_user_rolled_back_can_retry(self, database_session, credentials):
+        result = AuthService.add_user(database_session, credentials, commit=False)
+        assert result.status == ResponseStatus.SUCCESS
+        database_session.rollback()
+
+        result = AuthService.add_user(database_session, credentials)
+
+        assert result.status == ResponseStatus.SUCCESS
+
+
+class TestGenerateCode:
+
+    def test_code_format(self, mocker: MockerFixture):
+        mock_randbelow = mocker.patch(
+            "app.services.auth_service.secrets.randbelow", return_value=42
+        )
+
+        result = AuthService.generate_code()
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == "000042"
+        mock_randbelow.assert_called_once_with(CODE_SPACE)
+
+
+class TestOutstandingCodes:
+    """Requires a migrated PostgreSQL database, skipped otherwise"""
+
+    OUTSTANDING = 100_000
+
+    def test_codes_resolve_by_email(self, database_session):
+        db_session = database_session
+        expiration = datetime.now(timezone.utc) + timedelta(minutes=15)
+        emails = [f"load{index}@mail.com" for index in range(self.OUTSTANDING)]
+        db_session.execute(
+            insert(Users),
+            [
+                {
+                    "username": email.split("@")[0],
+                    "full_name": "Load Test",
+                    "email": email,
+                    "password": "-",
+                    "is_validated": False,
+                }
+                for email in emails
+            ],
+        )
+        codes = [
+            {
+                "email": email,
+                "code": secrets.randbelow(CODE_SPACE),
+                "expires_at": expiration,
+            }
+            for email in emails
+        ]
+        db_session.execute(insert(VerificationCodes), codes)
+
+        owners = {}
+        for row in codes:
+            owners.setdefault(row["code"], []).append(row["email"])
+        shared = [(code, emails) for code, emails in owners.items() if len(emails) > 1]
+
+        # With 100k pending codes many are shared, they never need to be unique
+        assert shared
+        for code, emails in shared[:200]:
+            for email in emails:
+                result = get_code_owner(db_session, code, email)
+                assert result.status == ResponseStatus.SUCCESS
+                assert result.message.email == email
+                result = validate_code(db_session, code, email)
+                assert result.status == ResponseStatus.SUCCESS
+                assert result.message.email == email
+
+    def test_codes_ignore_email_case(self, database_session):
+        db_session = database_session
+        db_session.execute(
+            insert(Users).values(
+                username="CaseUser",
+                full_name="Case User",
+                email="Case.User@Mail.com",
+                password="-",
+                is_validated=False,
+            )
+        )
+        assert store_code(db_session, "CASE.user@mail.com", 123456).status == (
+            ResponseStatus.SUCCESS
+        )
+
+        assert db_session.get(VerificationCodes, "case.user@mail.com").code == 123456
+        for email in ("Case.User@Mail.com", "case.user@mail.com"):
+            assert validate_code(db_session, 123456, email).status == (
+                ResponseStatus.SUCCESS
+            )
+            assert get_code_owner(db_session, 123456, email).status == (
+                ResponseStatus.SUCCESS
+            )
+        result = refresh_code(db_session, 654321, "CASE.USER@mail.com", "caseuser")
+        assert result.status == ResponseStatus.SUCCESS
+        assert db_session.get(VerificationCodes, "case.user@mail.com").code == 654321
@@ -0,0 +1,98 @@
+import pytest
+from pytest_mock import MockFixture
+from sqlalchemy.dialects import postgresql
+
+from app.schemas import DeletePostInput
+from app.schemas.bases import Deletes
+from app.services.event_service import EventDeleteService
+
+
+def compiled_sql(db_session) -> str:
+    statement = db_session.execute.call_args.args[0]
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestEventDeleteService:
+
+    @pytest.fixture
+    def db_session(self, mocker: MockFixture):
+        return mocker.Mock()
+
+    @pytest.fixture
+    def build_input(self):
+        def _build(table: int, ids: list):
+            return DeletePostInput(
+                table=table, deletes=[Deletes(id=item) for item in ids]
+            )
+
+        return _build
+
+    def test_delete_headers_soft_deletes(self, db_session, build_input):
+        db_session.execute.return_value.scalars.return_value.all.return_value = [1, 2]
+
+        result = EventDeleteService.delete_events(
+            db_session, build_input(0, [1, 2]), 1
+        )
+        sql = compiled_sql(db_session)
+
+        assert result == {"status": "success", "details": "Headers [1, 2] deleted"}
+        assert db_session.execute.call_count == 1
+        assert sql.startswith("UPDATE events_headers SET status")
+        assert "events_headers.owner_id" in sql
+        assert "events_headers.status !=" in sql
+        assert "RETURNING" in sql
+        db_session.commit.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "table, target, joined, expected",
+        [
+            (1, "events_lines", ["events_headers"], "Lines [1, 2] deleted"),
+            (2, "rate", ["events_lines", "events_headers"], "Rates [1, 2] deleted"),
+        ],
+    )
+    def test_delete_events_single_statement(
+        self, db_session, build_input, table, target, joined, expected
+    ):
+        db_session.execute.return_value.scalars.return_value.all.return_value = [1, 2]
+
+        result = EventDeleteService.delete_events(
+            db_session, build_input(table, [1, 2]), 1
+        )
+        sql = compiled_sql(db_session)
+
+        assert result == {"status": "success", "details": expected}
+        assert db_session.execute.call_count == 1
+        assert sql.startswith(f"DELETE FROM {target}")
+        assert "RETURNING" in sql
+        assert "events_headers.owner_id" in sql
+        for table_name in joined:
+            assert table_name in sql.split("WHERE")[0]
+        db_session.delete.assert_not_called()
+        db_session.query.assert_not_called()
+        db_session.commit.assert_called_once()
+
+    def test_delete_events_single_record_message(self, db_session, build_input):
+        db_session.execute.return_value.scalars.return_value.all.return_value = [3]
+
+        result = EventDeleteService.delete_events(db_session, build_input(1, [3]), 1)
+
+        assert result == {"status": "success", "details": "Line [3] deleted"}
+
+    @pytest.mark.parametrize(
+        "table, expected",
+        [
+            (0, "Header record not found"),
+            (1, "Lines record not found"),
+            (2, "Rates records not found"),
+        ],
+    )
+    def test_delete_events_not_owned(self, db_session, build_input, table, expected):
+        db_session.execute.return_value.scalars.return_value.all.return_value = []
+
+        result = EventDeleteService.delete_events(
+            db_session, build_input(table, [9]), 1
+        )
+
+        assert result == {"status": "error", "details": expected}
+        db_session.commit.assert_not_called()
+        db_session.rollback.assert_called_once()
@@ -0,0 +1,119 @@
+import pytest
+from pytest_mock import MockFixture
+from sqlalchemy.exc import OperationalError
+
+from app.schemas import SourceTable
+from app.schemas.schemas import ResponseStatus
+from app.services.notification_service import NotificationService
+
+
+def header_changes(header_id: int) -> dict:
+    return {
+        header_id: {
+            SourceTable.HEADER.value: [
+                {"field": "title", "old_value": "Old", "new_value": "New"}
+            ],
+            SourceTable.LINES.value: {},
+        }
+    }
+
+
+class TestNotificationService:
+
+    @pytest.fixture
+    def db_session(self, mocker: MockFixture):
+        return mocker.Mock()
+
+    @pytest.fixture
+    def mock_enqueue(self, mocker: MockFixture):
+        return mocker.patch(
+            "app.services.notification_service.email_utils.enqueue_emails"
+        )
+
+    def test_get_recipients_dedupes(self, db_session):
+        db_session.execute.return_value.all.return_value = [
+            (1, "owner@mail.com", "Owner User"),
+            (2, "owner@mail.com", "Owner User"),
+            (1, "Sub@Mail.com", "Sub User"),
+            (1, "sub@mail.com", "Sub User"),
+        ]
+
+        result = NotificationService.get_recipients(db_session, [1, 2])
+        query = str(db_session.execute.call_args.args[0])
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == {
+            "owner@mail.com": ("Owner User", {1, 2}),
+            "sub@mail.com": ("Sub User", {1}),
+        }
+        assert "UNION ALL" in query
+        db_session.execute.assert_called_once()
+
+    def test_get_recipients_error(self, db_session):
+        db_session.execute.side_effect = OperationalError("SELECT", {}, Exception())
+
+        result = NotificationService.get_recipients(db_session, [1])
+
+        assert result.status == ResponseStatus.ERROR
+
+    def test_notify_updated_renders_once_per_summary(
+        self, db_session, mock_enqueue, mocker: MockFixture
+    ):
+        recipients = {"owner@mail.com": ("Owner User", {1, 2})}
+        recipients.update(
+            {f"sub{index}@mail.com": ("Sub User", {1}) for index in range(1000)}
+        )
+        mocker.patch.object(
+            NotificationService,
+            "get_recipients",
+            return_value=mocker.Mock(status=ResponseStatus.SUCCESS, message=recipients),
+        )
+        mock_render = mocker.patch(
+            "app.services.notification_service.HTMLTemplates."
+            "generate_event_changes_html",
+            side_effect=lambda db, changes, owner_id: f"<p>{len(changes)} changed</p>",
+        )
+
+        NotificationService.notify_updated(
+            db_session, 5, [header_changes(1), header_changes(2)]
+        )
+        messages = mock_enqueue.call_args.args[1]
+
+        assert mock_render.call_count == 2
+        assert len(messages) == 1001
+        assert "2 changed" in messages[0][2] and "Hello Owner" in messages[0][2]
+        assert "1 changed" in messages[1][2] and "Hello Sub" in messages[1][2]
+        mock_enqueue.assert_called_once()
+
+    def test_notify_deleted_groups_by_recipient(self, db_session, mock_enqueue):
+        notifications = [
+            ("Concert", "test@mail.com", "John Doe"),
+            ("Match", "TEST@mail.com", "John Doe"),
+            ("Concert", "test@mail.com", "John Doe"),
+            ("Match", "other@mail.com", "Jane Roe"),
+        ]
+
+        NotificationService.notify_deleted(db_session, notifications)
+        messages = mock_enqueue.call_args.args[1]
+
+        assert [email for email, _, _ in messages] == [
+            "test@mail.com",
+            "other@mail.com",
+        ]
+        assert "Concert, Match" in messages[0][2]
+        assert "Hello John" in messages[0][2]
+
+    def test_notify_deleted_escapes_titles(self, db_session, mock_enqueue):
+        NotificationService.notify_deleted(
+            db_session, [("<b>Concert</b>", "test@mail.com", "John Doe")]
+        )
+        html_content = mock_enqueue.call_args.args[1][0][2]
+
+        assert "&lt;b&gt;Concert&lt;/b&gt;" in html_content
+        assert "{{" not in html_content
+
+    def test_notify_deleted_empty(self, db_session, mock_enqueue):
+        result = NotificationService.notify_deleted(db_session, [])
+
+        assert result.message == 0
+        mock_enqueue.assert_not_called()
@@ -0,0 +1,120 @@
+import smtplib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pytest_mock import MockFixture
+from sqlalchemy.exc import OperationalError
+
+from app.models import EmailOutbox
+from app.schemas.schemas import ResponseStatus
+from app.services.outbox_service import OutboxService
+from app.utils.email_utils import SMTPSession
+
+
+class TestOutboxService:
+
+    @pytest.fixture
+    def db_session(self, mocker: MockFixture):
+        return mocker.Mock()
+
+    @pytest.fixture
+    def pending(self):
+        return [
+            EmailOutbox(
+                id=index,
+                recipient=f"user{index}@mail.com",
+                subject="Test",
+                html="<p> Test </p>",
+                status="pending",
+                attempts=0,
+            )
+            for index in (1, 2)
+        ]
+
+    def test_deliver_batch_sends_over_one_session(
+        self, db_session, pending, mocker: MockFixture
+    ):
+        db_session.execute.return_value.all.return_value = pending
+        smtp = mocker.Mock()
+        smtp.send.side_effect = lambda *_: db_session.commit.assert_called_once()
+
+        result = OutboxService.deliver_batch(db_session, smtp, 10)
+        claim_sql = str(db_session.execute.call_args_list[0].args[0])
+        results = db_session.execute.call_args_list[1].args[1]
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == 2
+        assert claim_sql.startswith("UPDATE email_outbox SET status")
+        assert "FOR UPDATE" in claim_sql
+        assert smtp.send.call_count == 2
+        assert [row["status"] for row in results] == ["sent", "sent"]
+        assert all(row["sent_at"] for row in results)
+        smtp.close.assert_not_called()
+        assert db_session.commit.call_count == 2
+
+    def test_deliver_batch_backoff(self, db_session, pending, mocker: MockFixture):
+        mocker.patch("app.services.outbox_service.settings.email_backoff_seconds", 30)
+        mocker.patch("app.services.outbox_service.settings.email_max_attempts", 3)
+        db_session.execute.return_value.all.return_value = pending
+        pending[1].attempts = 2
+        smtp = mocker.Mock()
+        smtp.send.side_effect = smtplib.SMTPRecipientsRefused({})
+
+        before = datetime.now(timezone.utc)
+        OutboxService.deliver_batch(db_session, smtp, 10)
+        first, second = db_session.execute.call_args_list[1].args[1]
+
+        assert first["status"] == "pending"
+        assert first["attempts"] == 1
+        assert first["next_attempt_at"] - before >= timedelta(seconds=30)
+        assert second["status"] == "failed"
+        assert second["attempts"] == 3
+        assert smtp.close.call_count == 2
+
+    def test_deliver_batch_nothing_due(self, db_session, mocker: MockFixture):
+        db_session.execute.return_value.all.return_value = []
+
+        result = OutboxService.deliver_batch(db_session, mocker.Mock(), 10)
+
+        assert result.message == 0
+        assert db_session.execute.call_count == 1
+
+    @pytest.mark.parametrize("attempts, seconds", [(1, 30), (2, 60), (4, 240)])
+    def test_backoff(self, mocker: MockFixture, attempts, seconds):
+        mocker.patch("app.services.outbox_service.settings.email_backoff_seconds", 30)
+
+        assert OutboxService.backoff(attempts) == timedelta(seconds=seconds)
+
+    def test_deliver_batch_error(self, db_session, mocker: MockFixture):
+        db_session.execute.side_effect = OperationalError("UPDATE", {}, Exception())
+        smtp = mocker.Mock()
+
+        result = OutboxService.deliver_batch(db_session, smtp, 10)
+
+        assert result.status == ResponseStatus.ERROR
+        smtp.send.assert_not_called()
+        db_session.rollback.assert_called_once()
+
+    def test_deliver_batch_local_server(self, db_session, pending, mocker: MockFixture):
+        controller = pytest.importorskip("aiosmtpd.controller")
+        handler = pytest.importorskip("aiosmtpd.handlers").Sink()
+        server = controller.Controller(handler, hostname="127.0.0.1", port=8025)
+        mocker.patch("app.services.outbox_service.settings.email_backoff_seconds", 30)
+        mocker.patch("app.utils.email_utils.settings.smtp_server", "127.0.0.1")
+        mocker.patch("app.utils.email_utils.settings.smtp_port", 8025)
+        mocker.patch("app.utils.email_utils.settings.smtp_starttls", False)
+        mocker.patch("app.utils.email_utils.settings.email_password", "")
+        mock_smtp = mocker.patch("smtplib.SMTP", wraps=smtplib.SMTP)
+        db_session.execute.return_value.all.return_value = pending
+
+        server.start()
+        try:
+            with SMTPSession() as smtp:
+                result = OutboxService.deliver_batch(db_session, smtp, 10)
+        finally:
+            server.stop()
+
+        results = db_session.execute.call_args_list[1].args[1]
+        assert result.message == 2
+        assert [row["status"] for row in results] == ["sent", "sent"]
+        assert mock_smtp.call_count == 1
@@ -1,11 +1,18 @@
+import asyncio
+import time
+
 import pytest
 from unittest.mock import AsyncMock
+from pydantic import ValidationError
 from pytest_mock import MockFixture
 
-from app.services.post_service import HeaderPostsService
+from app.config import settings
+from app.services.post_service import (HeaderPostsService, LinesPostService, 
+                                       PostConfirmation, UpdatePost)
 from app.services.common.structures import GenerateStructureService
-from app.schemas import NewPostHeaderInput
-from app.models import Categories, EventsHeaders
+from app.schemas import (NewPostHeaderInput, NewPostLinesInput, 
+                         UpdatePostConfirmInput, UpdatePostInput)
+from app.models import Categories, EventsHeaders, EventsLines
 
 class DatabaseSession:
     def __init__(self, mocker: MockFixture):
@@ -277,4 +284,191 @@ class TestHeaderPostServiceHelpers:
 
         result = await HeaderPostsService._validate_location(mock_header_input)
 
-        assert result == mock_expected_output_error
\ No newline at end of file
+        assert result == mock_expected_output_error
+
+
+@pytest.fixture
+def mock_lines_input():
+    return {
+        "header_id": 1,
+        "user_timezone": "Europe/Madrid",
+        "line": {
+            "start": "2025-01-06T18:00:00Z",
+            "end": "2025-01-06T20:00:00Z",
+            "rate": {"title": "General", "amount": 10.0, "currency": "EUR"},
+            "isPublic": True,
+            "capacity": 50,
+        },
+        "repeat": True,
+        "custom_option_selected": False,
+        "when_to": 1,
+        "occurrences": 10,
+    }
+
+class TestLinesPostService:
+    
+    @pytest.mark.asyncio
+    async def test_process_lines_repeated(self, mock_lines_input):
+        lines = LinesPostService(1, NewPostLinesInput(**mock_lines_input))
+        
+        result = await lines.process_lines()
+        packed = result.message.message
+        
+        assert list(packed) == [0]
+        assert len(packed[0]) == 10
+        assert packed[0][1]["start"].isoformat() == "2025-01-13T18:00:00+00:00"
+        assert packed[0][1]["capacity"] == 50
+    
+    @pytest.mark.asyncio
+    async def test_process_lines_paginated(self, mock_lines_input):
+        lines = LinesPostService(1, NewPostLinesInput(**mock_lines_input))
+        
+        result = await lines.process_lines(page=3, page_size=4)
+        page = result.message.message
+        
+        assert (page["total"], page["page"], page["page_size"]) == (10, 3, 4)
+        assert len(page["lines"][0]) == 2
+        assert page["lines"][0][0]["start"].isoformat() == "2025-03-03T18:00:00+00:00"
+    
+    @pytest.mark.asyncio
+    async def test_process_lines_weekdays_not_repeated(self, mock_lines_input):
+        mock_lines_input.update(
+            repeat=False, custom_option_selected=True, for_days=(2, 4)
+        )
+        lines = LinesPostService(1, NewPostLinesInput(**mock_lines_input))
+        
+        result = await lines.process_lines()
+        packed = result.message.message
+        
+        assert [line["start"].day for line in packed.values()] == [6, 8, 10]
+    
+    def test_pack_lines_is_lazy(self, mock_lines_input, mocker: MockFixture):
+        lines = LinesPostService(1, NewPostLinesInput(**mock_lines_input))
+        pair = mocker.sentinel.start, mocker.sentinel.end
+        generated = {0: (pair for _ in range(10**9))}
+        
+        packed = lines._pack_lines(generated, 5, 2)
+        
+        assert len(packed[0]) == 2
+    
+    @pytest.mark.parametrize("occurrences", [0, settings.max_occurrences + 1])
+    def test_occurrences_limit(self, mock_lines_input, occurrences):
+        mock_lines_input["occurrences"] = occurrences
+        
+        with pytest.raises(ValidationError, match="occurrences"):
+            NewPostLinesInput(**mock_lines_input)
+
+class TestPostConfirmation:
+    
+    @pytest.fixture
+    def mock_confirm_input(self):
+        def change(status, record_id, field, new_value):
+            return {
+                "status": status,
+                "source": "events_lines",
+                "message": None,
+                "header_id": 1,
+                "record_id": record_id,
+                "field": field,
+                "old_value": None,
+                "new_value": new_value,
+            }
+        return UpdatePostConfirmInput(data=[
+            [],
+            [
+                change("success", 10, "capacity", 20),
+                change("error", 10, "capacity", 99),
+                change("success", 11, "isPublic", False),
+                change("success", 10, "isPublic", False),
+            ],
+            [],
+        ])
+    
+    def test_update_db_applies_changes_by_record(
+        self, 
+        mocker: MockFixture, 
+        mock_confirm_input):
+        
+        lines = [EventsLines(id=10, capacity=5, isPublic=True), 
+                 EventsLines(id=11, capacity=5, isPublic=True)]
+        mock_fetch = mocker.patch(
+            "app.utils.fetch_data_utils.get_selected_lines_from_same_header",
+            return_value=mocker.Mock(status="success", message=lines))
+        mocker.patch(
+            "app.utils.fetch_data_utils.update_db",
+            return_value=mocker.Mock(status="success"))
+        
+        result = PostConfirmation.update_db(mocker.Mock(), 1, mock_confirm_input.data)
+        grouped = PostConfirmation.build_post_updates_structure(result.message).message
+        
+        mock_fetch.assert_called_once_with(mocker.ANY, 1, [10, 11])
+        assert (lines[0].capacity, lines[0].isPublic) == (20, False)
+        assert (lines[1].capacity, lines[1].isPublic) == (5, False)
+        assert len(grouped[0][1]["events_lines"][10]["fields"]) == 2
+
+class TestUpdatePost:
+    
+    @pytest.fixture
+    def mock_update_input(self):
+        def table(number):
+            return {
+                "table": number, 
+                "changes": [{"id": 1, "update": [{"field": "title", "value": "New"}]}],
+            }
+        return UpdatePostInput(tables=[table(2), table(0), table(1)])
+    
+    @pytest.fixture
+    def mock_branches(self, mocker: MockFixture):
+        async def update_header(*args):
+            await asyncio.sleep(0.2)
+            return mocker.Mock(status="success", message=["header"])
+        
+        def update_table(label, status="success"):
+            def update(*args):
+                time.sleep(0.2)
+                return mocker.Mock(status=status, message=[label])
+            return update
+        
+        mocker.patch("app.services.post_service.SessionLocal")
+        mocker.patch(
+            "app.services.post_service.HeaderPostsService._update_header", 
+            side_effect=update_header)
+        mocker.patch(
+            "app.services.post_service.LinesPostService._update_lines", 
+            side_effect=update_table("lines"))
+        return mocker.patch(
+            "app.services.post_service.RatesPostService._update_rates", 
+            side_effect=update_table("rates"))
+    
+    @pytest.mark.asyncio
+    async def test_update_post_data_concurrent(self, mock_update_input, mock_branches):
+        elapsed = time.perf_counter()
+        result = await UpdatePost.update_post_data(None, 1, mock_update_input)
+        elapsed = time.perf_counter() - elapsed
+        
+        assert result.status == "success"
+        assert result.message == (["header"], ["lines"], ["rates"])
+        assert elapsed < 0.5
+    
+    @pytest.mark.asyncio
+    async def test_update_post_data_errors(
+        self, 
+        mocker: MockFixture, 
+        mock_update_input, 
+        mock_branches):
+        
+        mock_branches.side_effect = lambda *args: mocker.Mock(
+            status="error", message="Unauthorized user")
+        
+        result = await UpdatePost.update_post_data(None, 1, mock_update_input)
+        
+        assert result.message == "Unauthorized user"
+    
+    @pytest.mark.asyncio
+    async def test_update_post_data_invalid_table(self, mock_update_input, mock_branches):
+        mock_update_input.tables[0].table = 3
+        
+        result = await UpdatePost.update_post_data(None, 1, mock_update_input)
+        
+        assert result.message == "Invalid specified source table"
+        mock_branches.assert_not_called()
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pytest_mock import MockFixture
+from sqlalchemy.exc import OperationalError
+
+from app.schemas.schemas import ResponseStatus
+from app.services.purge_service import PurgeService
+
+
+class TestPurgeService:
+
+    @pytest.fixture
+    def db_session(self, mocker: MockFixture):
+        return mocker.Mock()
+
+    def test_purge_deleted_events_empty(self, db_session):
+        db_session.execute.return_value.all.return_value = []
+
+        result = PurgeService.purge_deleted_events(db_session, 10)
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == ([], [])
+        assert db_session.execute.call_count == 1
+        db_session.commit.assert_not_called()
+
+    def test_purge_deleted_events_batch(self, db_session, mocker: MockFixture):
+        headers = mocker.Mock()
+        headers.all.return_value = [(1, "Concert"), (2, "Match")]
+        subscribers = mocker.Mock()
+        subscribers.all.return_value = [(2, "test@mail.com", "John Doe")]
+        db_session.execute.side_effect = [headers, subscribers, None, None]
+
+        result = PurgeService.purge_deleted_events(db_session, 10)
+        select_sql = str(db_session.execute.call_args_list[0].args[0])
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == ([1, 2], [("Match", "test@mail.com", "John Doe")])
+        assert "FOR UPDATE" in select_sql
+        assert db_session.execute.call_count == 4
+        db_session.commit.assert_called_once()
+
+    def test_purge_deleted_events_error(self, db_session):
+        db_session.execute.side_effect = OperationalError("SELECT", {}, Exception())
+
+        result = PurgeService.purge_deleted_events(db_session, 10)
+
+        assert result.status == ResponseStatus.ERROR
+        db_session.rollback.assert_called_once()
+
+    def test_run_purge_drains_batches(self, mocker: MockFixture):
+        mock_session = mocker.patch("app.services.purge_service.SessionLocal")
+        mocker.patch("app.services.purge_service.settings.purge_batch_size", 2)
+        mock_notify = mocker.patch(
+            "app.services.purge_service.NotificationService.notify_deleted"
+        )
+        mocker.patch(
+            "app.services.purge_service.PurgeService.purge_deleted_events",
+            side_effect=[
+                mocker.Mock(
+                    status=ResponseStatus.SUCCESS,
+                    message=([1, 2], [("Concert", "test@mail.com", "John Doe")]),
+                ),
+                mocker.Mock(status=ResponseStatus.SUCCESS, message=([3], [])),
+            ],
+        )
+
+        assert PurgeService.run_purge() == 3
+        assert mock_notify.call_args_list == [
+            mocker.call(
+                mock_session.return_value, [("Concert", "test@mail.com", "John Doe")]
+            ),
+            mocker.call(mock_session.return_value, []),
+        ]
+
+    def test_purge_expired_codes(self, db_session):
+        db_session.execute.return_value.rowcount = 3
+        before = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        result = PurgeService.purge_expired_codes(db_session, before, 10)
+        delete_sql = str(db_session.execute.call_args.args[0])
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == 3
+        assert "DELETE FROM verification_codes" in delete_sql
+        assert "FOR UPDATE" in delete_sql
+        db_session.commit.assert_called_once()
+
+    def test_purge_expired_codes_error(self, db_session):
+        db_session.execute.side_effect = OperationalError("DELETE", {}, Exception())
+
+        result = PurgeService.purge_expired_codes(
+            db_session, datetime(2024, 1, 1, tzinfo=timezone.utc), 10
+        )
+
+        assert result.status == ResponseStatus.ERROR
+        db_session.rollback.assert_called_once()
+
+    def test_run_code_purge_drains_batches(self, mocker: MockFixture):
+        mocker.patch("app.services.purge_service.SessionLocal")
+        mocker.patch("app.services.purge_service.settings.code_purge_batch_size", 2)
+        mocker.patch("app.services.purge_service.settings.code_retention_minutes", 60)
+        mock_purge = mocker.patch(
+            "app.services.purge_service.PurgeService.purge_expired_codes",
+            side_effect=[
+                mocker.Mock(status=ResponseStatus.SUCCESS, message=2),
+                mocker.Mock(status=ResponseStatus.SUCCESS, message=1),
+            ],
+        )
+
+        assert PurgeService.run_code_purge() == 3
+        before = mock_purge.call_args.args[1]
+        assert before < datetime.now(timezone.utc) - timedelta(minutes=59)
+
+    def test_purge_delivered_emails(self, db_session):
+        db_session.execute.return_value.rowcount = 4
+        before = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        result = PurgeService.purge_delivered_emails(db_session, before, 10)
+        delete_sql = str(db_session.execute.call_args.args[0])
+        params = db_session.execute.call_args.args[0].compile().params
+
+        assert result.message == 4
+        assert "DELETE FROM email_outbox" in delete_sql
+        assert "FOR UPDATE" in delete_sql
+        assert ["sent", "failed"] in params.values()
+        db_session.commit.assert_called_once()
+
+    def test_run_email_purge_drains_batches(self, mocker: MockFixture):
+        mocker.patch("app.services.purge_service.SessionLocal")
+        mocker.patch("app.services.purge_service.settings.email_purge_batch_size", 2)
+        mocker.patch("app.services.purge_service.settings.email_retention_days", 30)
+        mock_purge = mocker.patch(
+            "app.services.purge_service.PurgeService.purge_delivered_emails",
+            side_effect=[
+                mocker.Mock(status=ResponseStatus.SUCCESS, message=2),
+                mocker.Mock(status=ResponseStatus.SUCCESS, message=0),
+            ],
+        )
+
+        assert PurgeService.run_email_purge() == 2
+        before = mock_purge.call_args.args[1]
+        assert before < datetime.now(timezone.utc) - timedelta(days=29)
+
+    @pytest.mark.parametrize(
+        "start, end, hour, expected",
+        [
+            (2, 6, 3, True),
+            (2, 6, 6, False),
+            (22, 4, 23, True),
+            (22, 4, 12, False),
+            (0, 0, 15, True),
+        ],
+    )
+    def test_is_off_peak(self, mocker: MockFixture, start, end, hour, expected):
+        mocker.patch("app.services.purge_service.settings.purge_start_hour", start)
+        mocker.patch("app.services.purge_service.settings.purge_end_hour", end)
+        now = datetime(2024, 1, 1, hour, tzinfo=timezone.utc)
+
+        assert PurgeService.is_off_peak(now) is expected
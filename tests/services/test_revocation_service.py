@@ -0,0 +1,200 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from pytest_mock import MockFixture
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+from app import oauth2
+from app.database.connection import engine
+from app.schemas.schemas import ResponseStatus
+from app.services import revocation_service
+from app.services.revocation_service import (
+    BloomFilter,
+    RevocationService,
+    RevocationSet,
+)
+
+
+@pytest.fixture
+def revocations(mocker: MockFixture):
+    revoked = RevocationSet()
+    mocker.patch.object(revocation_service, "revocations", revoked)
+    mocker.patch.object(oauth2, "revocations", revoked)
+    return revoked
+
+
+class TestRevocationSet:
+
+    def test_bloom_filter_error_rate(self):
+        bloom = BloomFilter(10_000, 0.01)
+        for index in range(10_000):
+            bloom.add(f"revoked-{index}")
+
+        false_positives = sum(f"valid-{index}" in bloom for index in range(10_000))
+
+        assert all(f"revoked-{index}" in bloom for index in range(10_000))
+        assert false_positives < 200
+
+    def test_prune_expired(self):
+        now = datetime.now(timezone.utc)
+        revoked = RevocationSet()
+        revoked.add("expired", now - timedelta(minutes=1))
+        revoked.add("active", now + timedelta(minutes=1))
+
+        revoked.prune(now)
+
+        assert "expired" not in revoked
+        assert "active" in revoked
+        assert len(revoked) == 1
+
+    def test_apply_notification(self, revocations):
+        RevocationService.apply_notification("abc123 1893456000")
+
+        assert "abc123" in revocations
+
+    def test_concurrent_add_and_prune(self):
+        now = datetime.now(timezone.utc)
+        revoked = RevocationSet()
+        expires_at = now + timedelta(minutes=1)
+
+        def add(worker: int):
+            for index in range(2_000):
+                revoked.add(f"{worker}-{index}", expires_at)
+
+        def prune():
+            for _ in range(200):
+                revoked.prune(now)
+
+        threads = [threading.Thread(target=add, args=(worker,)) for worker in range(4)]
+        threads.append(threading.Thread(target=prune))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(revoked) == 8_000
+        assert all(f"3-{index}" in revoked for index in range(2_000))
+
+    @pytest.mark.parametrize("payload", ["abc123", "abc123 soon", "abc123 1 2"])
+    def test_apply_notification_malformed(self, revocations, payload):
+        with pytest.raises(ValueError):
+            RevocationService.apply_notification(payload)
+
+        assert len(revocations) == 0
+
+
+class TestRevocationService:
+
+    def test_revoke_notifies(self, revocations, mocker: MockFixture):
+        db_session = mocker.Mock()
+        expires_at = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+        result = RevocationService.revoke(db_session, "abc123", 1, expires_at)
+        statements = [str(call.args[0]) for call in db_session.execute.call_args_list]
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert "ON CONFLICT (jti) DO NOTHING" in statements[0]
+        assert "pg_notify" in statements[1]
+        assert "abc123" in revocations
+        db_session.commit.assert_called_once()
+
+    def test_revoke_error(self, revocations, mocker: MockFixture):
+        db_session = mocker.Mock()
+        db_session.execute.side_effect = OperationalError("INSERT", {}, Exception())
+
+        result = RevocationService.revoke(
+            db_session, "abc123", 1, datetime.now(timezone.utc)
+        )
+
+        assert result.status == ResponseStatus.ERROR
+        assert "abc123" not in revocations
+
+    def test_decode_rejects_revoked_token(self, revocations):
+        token = oauth2.create_access_token({"user_id": 1})
+        claims = oauth2.decode_access_token_claims(token)
+
+        assert oauth2.decode_access_token(token) == "1"
+
+        revocations.add(claims["jti"], datetime.now(timezone.utc) + timedelta(hours=1))
+        with pytest.raises(HTTPException) as exc:
+            oauth2.decode_access_token(token)
+        assert exc.value.status_code == 401
+
+    def test_decode_rejects_token_without_jti(self, revocations):
+        token = oauth2.jwt.encode(
+            {"user_id": 1, "exp": datetime.now(timezone.utc) + timedelta(minutes=5)},
+            oauth2.SECRET_KEY,
+            algorithm=oauth2.ALGORITHM,
+        )
+
+        with pytest.raises(HTTPException):
+            oauth2.decode_access_token(token)
+
+
+class TestRevocationListener:
+    """Requires a migrated PostgreSQL database, skipped otherwise"""
+
+    @pytest.fixture
+    def user_id(self):
+        try:
+            connection = engine.connect()
+        except OperationalError:
+            pytest.skip("PostgreSQL database not available")
+        with connection:
+            if "revoked_tokens" not in inspect(connection).get_table_names():
+                pytest.skip("Database schema not migrated")
+            user_id = connection.execute(text("SELECT id FROM users LIMIT 1")).scalar()
+        if user_id is None:
+            pytest.skip("No users in the database")
+        return user_id
+
+    def test_revocation_reaches_listener(
+        self, revocations, user_id, mocker: MockFixture
+    ):
+        jti = uuid4().hex
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+        async def scenario():
+            listener = asyncio.create_task(RevocationService.run_listener())
+            await asyncio.sleep(0.5)
+            # Another instance revokes the token, only the notification
+            # reaches this process
+            connection = engine.raw_connection()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "INSERT INTO revoked_tokens (jti, user_id, expires_at) "
+                        "VALUES (%s, %s, %s)",
+                        (jti, user_id, expires_at),
+                    )
+                    cursor.execute(
+                        "SELECT pg_notify(%s, %s)",
+                        (revocation_service.CHANNEL, "malformed"),
+                    )
+                    cursor.execute(
+                        "SELECT pg_notify(%s, %s)",
+                        (
+                            revocation_service.CHANNEL,
+                            f"{jti} {int(expires_at.timestamp())}",
+                        ),
+                    )
+                connection.commit()
+                for _ in range(50):
+                    if jti in revocations:
+                        break
+                    await asyncio.sleep(0.05)
+            finally:
+                listener.cancel()
+                with connection.cursor() as cursor:
+                    cursor.execute("DELETE FROM revoked_tokens WHERE jti = %s", (jti,))
+                connection.commit()
+                connection.close()
+
+        asyncio.run(scenario())
+
+        assert jti in revocations
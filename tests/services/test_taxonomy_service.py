@@ -0,0 +1,123 @@
+import json
+
+import pytest
+from pytest_mock import MockFixture
+
+from app.database.seed import Seed
+from app.services.taxonomy_service import (
+    TaxonomyService,
+    encode,
+    etag_matches,
+    make_etag,
+)
+
+CATEGORY_ROWS = [(1, "Sports", "cat.1"), (6, "Travel", "cat.6")]
+TAG_ROWS = [
+    (6, 251, "Paris", 26, "subcat.6.1", "Destinations"),
+    (1, 10, "Football", 1, "subcat.1.1", "Team Sports"),
+    (6, 300, "Travel Blog", 30, "subcat.6.5", "Travel Photography"),
+]
+
+
+@pytest.fixture
+def db_session(mocker: MockFixture):
+    db_session = mocker.Mock()
+    db_session.execute.side_effect = lambda *_: mocker.Mock(
+        all=mocker.Mock(
+            return_value=CATEGORY_ROWS
+            if db_session.execute.call_count % 2
+            else TAG_ROWS
+        )
+    )
+    return db_session
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshot():
+    TaxonomyService.invalidate()
+    yield
+    TaxonomyService.invalidate()
+
+
+class TestEtag:
+
+    def test_make_etag_is_weak_and_stable(self):
+        etag = make_etag(encode({"b": 1, "a": [1, 2]}))
+
+        assert encode({"b": 1, "a": [1, 2]}) == b'{"a":[1,2],"b":1}'
+        assert etag == make_etag(encode({"a": [1, 2], "b": 1}))
+        assert etag.startswith('W/"') and etag.endswith('"')
+        assert etag != make_etag(encode({"a": [2, 1], "b": 1}))
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            (None, False),
+            ('"abc"', True),
+            ('W/"abc"', True),
+            ('"other", "abc"', True),
+            ("*", True),
+            ('"other"', False),
+        ],
+    )
+    def test_etag_matches(self, header, expected):
+        assert etag_matches(header, 'W/"abc"') is expected
+
+
+class TestTaxonomyService:
+
+    def test_build_groups_tags_by_category(self, db_session):
+        taxonomy = TaxonomyService.build(db_session, 0)
+
+        assert [category["id"] for category in taxonomy.categories.data] == [1, 6]
+        assert set(taxonomy.tags) == {1, 6}
+        assert set(taxonomy.tags[6].data) == {"Destinations", "Travel Photography"}
+        assert taxonomy.tags[1].etag != taxonomy.tags[6].etag
+        assert json.loads(taxonomy.tags[6].body) == taxonomy.tags[6].data
+        assert json.loads(taxonomy.categories.body) == list(taxonomy.categories.data)
+        with pytest.raises(TypeError):
+            taxonomy.tags[2] = None
+
+    def test_snapshot_served_from_memory(self, db_session):
+        first = TaxonomyService.get(db_session)
+        second = TaxonomyService.get(db_session)
+
+        assert first is second
+        assert db_session.execute.call_count == 2
+
+    def test_invalidate_reloads(self, db_session):
+        first = TaxonomyService.get(db_session)
+        TaxonomyService.invalidate()
+        second = TaxonomyService.get(db_session)
+
+        assert second is not first
+        assert second.version == first.version + 1
+        assert second.categories.etag == first.categories.etag
+        assert db_session.execute.call_count == 4
+
+    def test_stale_load_not_kept(self, db_session, mocker: MockFixture):
+        build = TaxonomyService.build
+
+        def build_then_invalidate(db, version):
+            taxonomy = build(db, version)
+            TaxonomyService.invalidate()
+            return taxonomy
+
+        mocker.patch.object(TaxonomyService, "build", side_effect=build_then_invalidate)
+
+        TaxonomyService.load(db_session)
+
+        assert TaxonomyService._snapshot is None
+
+    @pytest.mark.parametrize("empty, invalidated", [(True, True), (False, False)])
+    def test_seed_invalidates(self, mocker: MockFixture, empty, invalidated):
+        db_session = mocker.Mock()
+        db_session.query().count.return_value = 0 if empty else 1000
+        for method in ("add_categories", "add_status_codes", "add_subcategories"):
+            mocker.patch.object(Seed, method)
+        mocker.patch.object(Seed, "add_tags")
+        mock_invalidate = mocker.patch.object(TaxonomyService, "invalidate")
+
+        Seed.seed_data(db_session)
+
+        assert mock_invalidate.called is invalidated
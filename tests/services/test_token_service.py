@@ -0,0 +1,210 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from fastapi import HTTPException
+from google.auth import crypt
+from google.auth import jwt as google_jwt
+from pytest_mock import MockFixture
+
+from app import oauth2
+from app.services import token_service
+from app.services.revocation_service import RevocationSet
+from app.services.token_service import (
+    FIREBASE_ISSUER,
+    FirebaseCerts,
+    TokenCache,
+    TokenService,
+)
+
+PROJECT_ID = "yoonic-test"
+
+
+@pytest.fixture
+def access_tokens(mocker: MockFixture):
+    cache = TokenCache(100)
+    mocker.patch.object(oauth2, "access_tokens", cache)
+    mocker.patch.object(oauth2, "revocations", RevocationSet())
+    return cache
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    pem_key = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    pem_cert = cert.public_bytes(serialization.Encoding.PEM).decode()
+    return crypt.RSASigner.from_string(pem_key, key_id="key-1"), pem_cert
+
+
+@pytest.fixture
+def firebase(mocker: MockFixture, signing_key):
+    _, pem_cert = signing_key
+    response = mocker.Mock(
+        status=200,
+        headers={"cache-control": "public, max-age=3600"},
+        data=json.dumps({"key-1": pem_cert}).encode(),
+    )
+    certs = FirebaseCerts()
+    certs._http = mocker.Mock(return_value=response)
+    mocker.patch.object(token_service, "firebase_certs", certs)
+    mocker.patch.object(token_service, "firebase_tokens", TokenCache(100))
+    mocker.patch(
+        "app.services.token_service.firebase_admin.get_app",
+        return_value=mocker.Mock(project_id=PROJECT_ID),
+    )
+    return certs
+
+
+def firebase_token(signing_key, **claims):
+    signer, _ = signing_key
+    now = int(time.time())
+    payload = {
+        "iss": FIREBASE_ISSUER + PROJECT_ID,
+        "aud": PROJECT_ID,
+        "sub": "firebase-uid",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    payload.update(claims)
+    return google_jwt.encode(signer, payload).decode()
+
+
+class TestTokenCache:
+
+    def test_key_is_token_hash(self):
+        cache = TokenCache(10)
+        cache.put("token", {"exp": time.time() + 60})
+
+        assert list(cache._claims) == [TokenCache.key("token")]
+        assert len(TokenCache.key("token")) == 32
+
+    def test_expires_with_token(self):
+        cache = TokenCache(10)
+        cache.put("expired", {"exp": time.time() - 1})
+        cache.put("valid", {"exp": time.time() + 60})
+
+        assert cache.get("expired") is None
+        assert cache.get("valid") is not None
+
+    def test_bounded_size(self):
+        cache = TokenCache(2)
+        for index in range(3):
+            cache.put(f"token-{index}", {"exp": time.time() + 60})
+
+        assert len(cache) == 2
+        assert cache.get("token-0") is None
+
+
+class TestAccessTokenCache:
+
+    def test_hit_skips_signature_check(self, mocker: MockFixture, access_tokens):
+        token = oauth2.create_access_token({"user_id": 1})
+        spy = mocker.spy(oauth2.jwt, "decode")
+
+        first = oauth2.decode_access_token_claims(token)
+        second = oauth2.decode_access_token_claims(token)
+
+        assert first is second
+        assert spy.call_count == 1
+        assert len(access_tokens) == 1
+
+    def test_hit_still_checks_revocation(self, access_tokens):
+        token = oauth2.create_access_token({"user_id": 1})
+        claims = oauth2.decode_access_token_claims(token)
+        oauth2.revocations.add(
+            claims["jti"], datetime.now(timezone.utc) + timedelta(minutes=5)
+        )
+
+        with pytest.raises(HTTPException) as exc:
+            oauth2.decode_access_token_claims(token)
+
+        assert exc.value.status_code == 401
+
+    def test_invalid_token_not_cached(self, access_tokens):
+        with pytest.raises(HTTPException):
+            oauth2.decode_access_token_claims("not-a-token")
+
+        assert len(access_tokens) == 0
+
+
+class TestFirebaseTokens:
+
+    def test_verify_and_cache(self, firebase, signing_key, mocker: MockFixture):
+        token = firebase_token(signing_key)
+        spy = mocker.spy(token_service.id_token, "verify_firebase_token")
+
+        first = TokenService.verify_firebase_token(token)
+        second = TokenService.verify_firebase_token(token)
+
+        assert first["uid"] == "firebase-uid"
+        assert first is second
+        assert spy.call_count == 1
+        firebase._http.assert_called_once()
+
+    def test_certs_served_from_memory(self, firebase, signing_key):
+        for index in range(3):
+            TokenService.verify_firebase_token(
+                firebase_token(signing_key, sub=f"user-{index}")
+            )
+
+        firebase._http.assert_called_once()
+        assert firebase.expires_at > time.time() + 3500
+
+    @pytest.mark.parametrize(
+        "claims",
+        [
+            {"iss": FIREBASE_ISSUER + "other-project"},
+            {"aud": "other-project"},
+            {"sub": ""},
+            {"exp": int(time.time()) - 600, "iat": int(time.time()) - 4200},
+        ],
+    )
+    def test_rejected(self, firebase, signing_key, claims):
+        token = firebase_token(signing_key, **claims)
+
+        with pytest.raises(ValueError):
+            TokenService.verify_firebase_token(token)
+        assert len(token_service.firebase_tokens) == 0
+
+    def test_dependency_unauthorized(self, firebase, mocker: MockFixture):
+        credentials = mocker.Mock(credentials="not-a-token")
+
+        with pytest.raises(HTTPException) as exc:
+            oauth2.get_firebase_user_from_token(credentials)
+
+        assert exc.value.status_code == 401
+
+    def test_certs_refresher_prefetches(self, firebase, mocker: MockFixture):
+        mock_sleep = mocker.patch(
+            "app.services.token_service.asyncio.sleep",
+            side_effect=asyncio.CancelledError,
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(TokenService.run_certs_refresher())
+
+        firebase._http.assert_called_once()
+        delay = mock_sleep.call_args.args[0]
+        assert 3200 < delay <= 3300
@@ -0,0 +1,162 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from pytest_mock import MockFixture
+
+from app.models import EventsHeaders, EventsLines, Rates
+from app.schemas import SourceTable
+from app.templates.template_service import TEMPLATES_DIR, EmailTemplates, HTMLTemplates
+
+
+class TestEmailTemplates:
+
+    @pytest.fixture
+    def environment(self, tmp_path, mocker: MockFixture):
+        (tmp_path / "greeting.html").write_text("<p>Hello {{ user_name }}</p>")
+        environment = Environment(
+            loader=FileSystemLoader(tmp_path), auto_reload=True, cache_size=-1
+        )
+        mocker.patch.object(EmailTemplates, "environment", environment)
+        mocker.patch.object(EmailTemplates, "TEMPLATES", ["greeting.html"])
+        return tmp_path
+
+    def test_load_compiles_every_template(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        EmailTemplates.load()
+
+        for name in EmailTemplates.TEMPLATES:
+            assert EmailTemplates.get(name) is EmailTemplates.get(name)
+            assert (TEMPLATES_DIR / name).is_file()
+
+    def test_render_from_cache(self, environment, mocker: MockFixture):
+        EmailTemplates.load()
+        mock_open = mocker.patch("builtins.open")
+
+        assert EmailTemplates.render("greeting.html", user_name="Ann") == (
+            "<p>Hello Ann</p>"
+        )
+        mock_open.assert_not_called()
+
+    def test_render_reloads_changes(self, environment):
+        EmailTemplates.load()
+        template = environment / "greeting.html"
+        template.write_text("<p>Hi {{ user_name }}</p>")
+        os.utime(template, (0, template.stat().st_mtime + 10))
+
+        assert EmailTemplates.render("greeting.html", user_name="Ann") == (
+            "<p>Hi Ann</p>"
+        )
+
+    def test_load_missing_template(self, environment, mocker: MockFixture):
+        mocker.patch.object(EmailTemplates, "TEMPLATES", ["missing.html"])
+
+        with pytest.raises(TemplateNotFound):
+            EmailTemplates.load()
+
+
+class TestHTMLTemplates:
+
+    @pytest.fixture
+    def changes(self):
+        return [
+            {
+                1: {
+                    SourceTable.HEADER.value: [
+                        {"field": "title", "old_value": "Old", "new_value": "Fest"}
+                    ],
+                    SourceTable.LINES.value: {
+                        line_id: {
+                            "fields": [
+                                {"field": "capacity", "old_value": 5, "new_value": 10}
+                            ],
+                            SourceTable.RATES.value: [
+                                {
+                                    "rate_id": line_id,
+                                    "field": "amount",
+                                    "old_value": 5,
+                                    "new_value": 0,
+                                }
+                            ],
+                        }
+                        for line_id in range(1, 301)
+                    },
+                }
+            }
+        ]
+
+    def test_generate_event_changes_html_prefetches(
+        self, changes, mocker: MockFixture
+    ):
+        start = datetime(2025, 1, 1, 10)
+        db_session = mocker.Mock()
+        db_session.scalars.side_effect = [
+            [EventsHeaders(id=1, title="Fest", address="Street 1")],
+            [
+                EventsLines(
+                    id=line_id,
+                    header_id=1,
+                    start=start + timedelta(days=line_id),
+                    end=start + timedelta(days=line_id, hours=2),
+                )
+                for line_id in range(1, 301)
+            ],
+            [Rates(id=rate_id, title="Adult") for rate_id in range(1, 301)],
+        ]
+
+        html = HTMLTemplates.generate_event_changes_html(db_session, changes, 7)
+        queries = [str(call.args[0]) for call in db_session.scalars.call_args_list]
+
+        assert db_session.scalars.call_count == 3
+        assert all(" IN (" in query for query in queries)
+        assert html.count("class='day-block'") == 300
+        assert html.count("'Adult' is now <strong>free!</strong>") == 300
+        assert "Title has changed to 'Fest'." in html
+        assert html.endswith("</body></html>")
+
+    def test_generate_event_changes_html_escapes_owner_values(
+        self, mocker: MockFixture
+    ):
+        payload = "<img src=x onerror=alert(1)>"
+        changes = [
+            {
+                1: {
+                    SourceTable.HEADER.value: [
+                        {"field": "address", "old_value": "Old", "new_value": payload}
+                    ],
+                    SourceTable.LINES.value: {
+                        1: {
+                            "fields": [],
+                            SourceTable.RATES.value: [
+                                {
+                                    "rate_id": 1,
+                                    "field": "currency",
+                                    "old_value": "EUR",
+                                    "new_value": payload,
+                                }
+                            ],
+                        }
+                    },
+                }
+            }
+        ]
+        db_session = mocker.Mock()
+        db_session.scalars.side_effect = [
+            [EventsHeaders(id=1, title=payload, address=payload)],
+            [
+                EventsLines(
+                    id=1,
+                    header_id=1,
+                    start=datetime(2025, 1, 1, 10),
+                    end=datetime(2025, 1, 1, 12),
+                )
+            ],
+            [Rates(id=1, title=payload, currency=payload)],
+        ]
+
+        html = HTMLTemplates.generate_event_changes_html(db_session, changes, 7)
+
+        assert "<img" not in html.lower()
+        assert html.count("&lt;img src=x onerror=alert(1)&gt;") == 4
+        assert html.count("&lt;IMG SRC=X ONERROR=ALERT(1)&gt;") == 1
@@ -1,13 +1,23 @@
 import pytest
 from pytest_mock import MockerFixture
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.schemas.schemas import InternalResponse, ResponseStatus
-from app.models import Users
+from app.models import EventsLines, EventsSeries, Users
 from app.utils.fetch_data_utils import (validate_email, 
                                   get_user_data, 
-                                  get_code_owner)
+                                  get_code_owner,
+                                  validate_code,
+                                  store_code,
+                                  build_tags,
+                                  build_series,
+                                  materialize_series,
+                                  insert_series_lines,
+                                  add_post,
+                                  bulk_insert_lines,
+                                  save_draft,
+                                  confirm_draft)
 
 
 class MockDatabaseSession:
@@ -31,8 +41,6 @@ class TestDataUtils:
             full_name="User Test",
             email="test@example.com",
             password="uf3su4db48348734t834nn58",
-            code=None,
-            code_expiration=None,
             is_validated=True,
             created_at="2024-12-17 18:39:47.98487+01",
         )
@@ -138,14 +146,14 @@ class TestDataUtils:
         mock_db_user: Users, 
         expected_output_success: InternalResponse
     ):
-        mock_db_session.query().filter().first.return_value = mock_db_user
+        mock_db_session.query().join().filter().first.return_value = mock_db_user
         mock_db_user.code = 123456
 
         expected_output_success.status = ResponseStatus.SUCCESS
         expected_output_success.origin = "get_code_owner"
         expected_output_success.message = mock_db_user
 
-        result = get_code_owner(mock_db_session, mock_db_user.code)
+        result = get_code_owner(mock_db_session, mock_db_user.code, mock_db_user.email)
         expected_output_success.timestamp = result.timestamp
 
         assert result == expected_output_success
@@ -153,14 +161,14 @@ class TestDataUtils:
     def test_get_code_owner_errors(
         self, mock_db_session, mock_db_user: Users, expected_output_success: InternalResponse
     ):
-        mock_db_session.query().filter().first.return_value = None
+        mock_db_session.query().join().filter().first.return_value = None
         mock_db_user.code = 123456
 
         expected_output_success.status = ResponseStatus.ERROR
         expected_output_success.origin = "get_code_owner"
         expected_output_success.message = "Not found"
 
-        result = get_code_owner(mock_db_session, mock_db_user.code)
+        result = get_code_owner(mock_db_session, mock_db_user.code, mock_db_user.email)
         expected_output_success.timestamp = result.timestamp
 
         assert result == expected_output_success
@@ -169,14 +177,389 @@ class TestDataUtils:
         self, mock_db_session, mock_db_user: Users, expected_output_success: InternalResponse
     ):
         message = "Mocked raised error"
-        mock_db_session.query().filter().first.side_effect = SQLAlchemyError(message)
+        mock_db_session.query().join().filter().first.side_effect = SQLAlchemyError(message)
         mock_db_user.code = 123456
 
         expected_output_success.status = ResponseStatus.ERROR
         expected_output_success.origin = "get_code_owner"
         expected_output_success.message = f"Database error raised: {message}"
         
-        result: InternalResponse = get_code_owner(mock_db_session, mock_db_user.code)
+        result: InternalResponse = get_code_owner(mock_db_session, mock_db_user.code, mock_db_user.email)
         expected_output_success.timestamp = result.timestamp
         
-        assert result == expected_output_success
\ No newline at end of file
+        assert result == expected_output_success
+
+    @pytest.mark.parametrize("minutes, status", [
+        (10, ResponseStatus.SUCCESS),
+        (-10, ResponseStatus.ERROR),
+    ])
+    def test_validate_code(
+        self, mock_db_session, mock_db_user: Users, minutes, status
+    ):
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+        mock_db_session.execute().first.return_value = (mock_db_user, expires_at)
+
+        result = validate_code(mock_db_session, 123456, mock_db_user.email)
+
+        assert result.status == status
+        if status == ResponseStatus.SUCCESS:
+            assert result.message == mock_db_user
+        else:
+            assert result.origin == "is_date_expired"
+
+    def test_validate_code_not_found(self, mock_db_session, mock_db_user: Users):
+        mock_db_session.execute().first.return_value = None
+
+        result = validate_code(mock_db_session, 123456, mock_db_user.email)
+
+        assert result.status == ResponseStatus.ERROR
+        assert result.message == "Code not found"
+
+    def test_store_code_replaces_previous(self, mock_db_session, mock_db_user: Users):
+        result = store_code(mock_db_session, mock_db_user.email, "012345")
+        upsert_sql = str(mock_db_session.execute.call_args.args[0])
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert "ON CONFLICT (email) DO UPDATE" in upsert_sql
+        mock_db_session.commit.assert_called_once()
+
+    def test_store_code_error(self, mock_db_session, mock_db_user: Users):
+        mock_db_session.execute.side_effect = SQLAlchemyError("Mocked raised error")
+
+        result = store_code(mock_db_session, mock_db_user.email, "012345")
+
+        assert result.status == ResponseStatus.ERROR
+        mock_db_session.rollback.assert_called_once()
+
+    def test_build_tags(self):
+        tags = [
+            (251, "Paris", 26, "subcat.6.1", "Destinations"),
+            (300, "Travel Blog", 30, "subcat.6.5", "Travel Photography"),
+            (252, "Tokyo", 26, "subcat.6.1", "Destinations"),
+        ]
+
+        result = build_tags(tags)
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == {
+            "Destinations": [
+                {
+                    "subcategory_code": "subcat.6.1",
+                    "tags": [{"id": 251, "name": "Paris"}, {"id": 252, "name": "Tokyo"}],
+                }
+            ],
+            "Travel Photography": [
+                {
+                    "subcategory_code": "subcat.6.5",
+                    "tags": [{"id": 300, "name": "Travel Blog"}],
+                }
+            ],
+        }
+
+class TestSeriesUtils:
+    @pytest.fixture
+    def packed_lines(self):
+        start = datetime(2025, 1, 6, 18, 0)
+        rates = [{"title": "General", "amount": 10.0, "currency": "EUR"}]
+        weekly = [
+            {
+                "start": (start + timedelta(weeks=week)).isoformat() + "Z",
+                "end": (start + timedelta(weeks=week, hours=2)).isoformat() + "Z",
+                "isPublic": True,
+                "capacity": 20,
+                "rates": rates,
+            }
+            for week in range(52)
+        ]
+        irregular = [dict(item) for item in weekly[:3]]
+        irregular[2]["capacity"] = 5
+        return {0: weekly, 1: irregular, 2: weekly[0]}
+
+    def test_build_series(self, packed_lines):
+        result = build_series(1, packed_lines)
+        series, remaining = result.message
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert len(series) == 1
+        assert series[0].rrule == "RRULE:FREQ=WEEKLY;COUNT=52"
+        assert series[0].dtstart == datetime(2025, 1, 6, 18, 0)
+        assert series[0].dtend == datetime(2025, 1, 6, 20, 0)
+        assert series[0].rates == packed_lines[0][0]["rates"]
+        assert remaining == {1: packed_lines[1], 2: packed_lines[2]}
+
+    def test_build_series_errors(self):
+        result = build_series(1, [])
+
+        assert result.status == ResponseStatus.ERROR
+        assert result.message == "Expected dict for lines"
+
+    @pytest.mark.parametrize(
+        "field, value",
+        [
+            ("isPublic", None),
+            ("rates", None),
+            ("start", None),
+            ("start", "not a date"),
+            ("rates", [{"title": "General"}]),
+        ],
+    )
+    def test_build_series_invalid_lines(self, packed_lines, field, value):
+        line = dict(packed_lines[0][1])
+        if value is None:
+            del line[field]
+        else:
+            line[field] = value
+        packed_lines[0][1] = line
+
+        result = build_series(1, packed_lines)
+
+        assert result.status == ResponseStatus.ERROR
+        assert result.message == "Invalid line structure"
+
+    def test_add_post_single_transaction(self, packed_lines, mocker: MockerFixture):
+        mock_db_session = mocker.Mock()
+        mocker.patch(
+            "app.utils.fetch_data_utils.approve_header_status",
+            return_value=mocker.Mock(status=ResponseStatus.SUCCESS),
+        )
+        mock_db_session.scalars.return_value.all.side_effect = [
+            list(range(100, 130)), [10, 11, 12, 13]]
+
+        result = add_post(mock_db_session, 1, 1, packed_lines)
+
+        assert result.status == ResponseStatus.SUCCESS
+        mock_db_session.flush.assert_called_once()
+        mock_db_session.commit.assert_called_once()
+
+    def test_add_post_rolls_back(self, packed_lines, mocker: MockerFixture):
+        mock_db_session = mocker.Mock()
+        mocker.patch(
+            "app.utils.fetch_data_utils.approve_header_status",
+            return_value=mocker.Mock(status=ResponseStatus.SUCCESS),
+        )
+        mock_db_session.scalars.side_effect = [
+            mocker.Mock(all=mocker.Mock(return_value=list(range(100, 130)))),
+            SQLAlchemyError("Insert failed"),
+        ]
+
+        result = add_post(mock_db_session, 1, 1, packed_lines)
+
+        assert result.status == ResponseStatus.ERROR
+        mock_db_session.commit.assert_not_called()
+        mock_db_session.rollback.assert_called_once()
+
+    def test_add_post_invalid_lines_writes_nothing(
+        self, packed_lines, mocker: MockerFixture
+    ):
+        mock_db_session = mocker.Mock()
+        del packed_lines[2]["capacity"]
+
+        result = add_post(mock_db_session, 1, 1, packed_lines)
+
+        assert result.message == "Invalid line structure"
+        mock_db_session.query.assert_not_called()
+        mock_db_session.commit.assert_not_called()
+
+    def test_materialize_series(self):
+        series = EventsSeries(
+            id=3,
+            header_id=1,
+            rrule="RRULE:FREQ=WEEKLY;COUNT=52",
+            dtstart=datetime(2025, 1, 6, 18, 0),
+            dtend=datetime(2025, 1, 6, 20, 0),
+            exdates=[],
+            capacity=20,
+            isPublic=True,
+            rates=[],
+        )
+
+        first = materialize_series(series, datetime(2025, 1, 20, 18, 0))
+        second = materialize_series(series, datetime(2025, 2, 3, 18, 0))
+
+        assert [line.start.day for line in first] == [6, 13, 20]
+        assert [line.start.day for line in second] == [27, 3]
+        assert all(line.series_id == 3 for line in first + second)
+        assert second[-1].end == datetime(2025, 2, 3, 20, 0)
+        assert series.materialized_until == datetime(2025, 2, 3, 18, 0)
+
+    def test_materialize_series_keeps_first_occurrence(self):
+        series = EventsSeries(
+            id=3,
+            header_id=1,
+            rrule="RRULE:FREQ=DAILY;COUNT=5",
+            dtstart=datetime(2030, 1, 1, 9, 0),
+            dtend=datetime(2030, 1, 1, 10, 0),
+            exdates=[],
+        )
+
+        lines = materialize_series(series, datetime(2025, 1, 1))
+
+        assert [line.start for line in lines] == [datetime(2030, 1, 1, 9, 0)]
+
+    def test_insert_series_lines_with_rates(self, mocker: MockerFixture):
+        mock_db_session = mocker.Mock()
+        mock_db_session.scalars.return_value.all.return_value = [10, 11, 12]
+        series = EventsSeries(
+            id=3,
+            header_id=1,
+            rrule="RRULE:FREQ=WEEKLY;COUNT=52",
+            dtstart=datetime(2025, 1, 6, 18, 0),
+            dtend=datetime(2025, 1, 6, 20, 0),
+            exdates=[],
+            capacity=20,
+            isPublic=True,
+            rates=[
+                {"title": "General", "amount": 10.0, "currency": "EUR"},
+                {"title": "VIP", "amount": 30.0, "currency": "EUR"},
+            ],
+        )
+
+        result = insert_series_lines(
+            mock_db_session, [series], datetime(2025, 1, 20, 18, 0), commit=False
+        )
+        line_rows = mock_db_session.scalars.call_args.args[1]
+        rate_rows = mock_db_session.execute.call_args.args[1]
+
+        assert result.message == [10, 11, 12]
+        assert [row["series_id"] for row in line_rows] == [3, 3, 3]
+        assert [(row["line_id"], row["title"]) for row in rate_rows] == [
+            (10, "General"), (10, "VIP"),
+            (11, "General"), (11, "VIP"),
+            (12, "General"), (12, "VIP"),
+        ]
+        mock_db_session.commit.assert_not_called()
+
+
+class TestDraftUtils:
+    @pytest.fixture
+    def mock_db_session(self, mocker: MockerFixture):
+        return MockDatabaseSession(mocker).session
+
+    @pytest.fixture
+    def draft_lines(self):
+        rates = [{"title": "General", "amount": 10.0, "currency": "EUR"}]
+        return [
+            {
+                "group": group,
+                "start": datetime(2025, 1, day, 18, 0),
+                "end": datetime(2025, 1, day, 20, 0),
+                "isPublic": True,
+                "capacity": 20,
+                "rates": rates,
+            }
+            for group, day in [(0, 6), (0, 8), (1, 7)]
+        ]
+
+    def test_save_draft(self, mock_db_session, draft_lines):
+        mock_db_session.scalar.side_effect = [1, None, 7]
+
+        result = save_draft(mock_db_session, 1, 1, draft_lines)
+        upsert_sql = str(mock_db_session.scalar.call_args_list[2].args[0])
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == 7
+        assert "ON CONFLICT ON CONSTRAINT uq_events_drafts_header_hash" in upsert_sql
+        mock_db_session.commit.assert_called_once()
+
+    def test_save_draft_same_content_same_hash(self, mock_db_session, draft_lines):
+        mock_db_session.scalar.side_effect = [1, None, 7, 1, None, 7]
+
+        save_draft(mock_db_session, 1, 1, draft_lines)
+        save_draft(mock_db_session, 1, 1, [dict(line) for line in draft_lines])
+        hashes = [
+            call.args[0].compile().params["content_hash"]
+            for call in mock_db_session.scalar.call_args_list[2::3]
+        ]
+
+        assert hashes[0] == hashes[1]
+
+    def test_save_draft_existing_not_written(self, mock_db_session, draft_lines):
+        mock_db_session.scalar.side_effect = [1, 7]
+
+        result = save_draft(mock_db_session, 1, 1, draft_lines)
+
+        assert result.message == 7
+        mock_db_session.execute.assert_not_called()
+        mock_db_session.commit.assert_not_called()
+
+    def test_save_draft_header_not_found(self, mock_db_session, draft_lines):
+        mock_db_session.scalar.return_value = None
+
+        result = save_draft(mock_db_session, 1, 1, draft_lines)
+
+        assert result.status == ResponseStatus.ERROR
+        assert result.message == "Header not found"
+        mock_db_session.commit.assert_not_called()
+
+    def test_confirm_draft(self, mock_db_session, draft_lines, mocker: MockerFixture):
+        mock_db_session.scalar.return_value = draft_lines
+        mock_add_post = mocker.patch(
+            "app.utils.fetch_data_utils.add_post",
+            return_value=mocker.Mock(status=ResponseStatus.SUCCESS),
+        )
+
+        result = confirm_draft(mock_db_session, 1, 3, 7)
+        claim_sql = str(mock_db_session.scalar.call_args.args[0])
+        _, _, header_id, lines = mock_add_post.call_args.args
+
+        assert result.status == ResponseStatus.SUCCESS
+        assert claim_sql.startswith("DELETE FROM events_drafts")
+        assert "RETURNING events_drafts.lines" in claim_sql
+        assert "events_drafts.header_id" in claim_sql
+        assert header_id == 3
+        assert [len(value) for value in lines.values()] == [2, 1]
+        assert "group" not in lines[0][0]
+        mock_db_session.rollback.assert_not_called()
+
+    def test_confirm_draft_expired(self, mock_db_session):
+        mock_db_session.scalar.return_value = None
+
+        result = confirm_draft(mock_db_session, 1, 3, 7)
+
+        assert result.status == ResponseStatus.ERROR
+        assert result.message == "Draft not found or expired"
+
+    def test_confirm_draft_post_failed(
+        self, mock_db_session, draft_lines, mocker: MockerFixture
+    ):
+        mock_db_session.scalar.return_value = draft_lines
+        mocker.patch(
+            "app.utils.fetch_data_utils.add_post",
+            return_value=mocker.Mock(status=ResponseStatus.ERROR),
+        )
+
+        result = confirm_draft(mock_db_session, 1, 3, 7)
+
+        assert result.status == ResponseStatus.ERROR
+        mock_db_session.rollback.assert_called_once()
+
+    def test_bulk_insert_lines(self, mock_db_session, draft_lines):
+        lines = [
+            EventsLines(
+                header_id=3,
+                start=line["start"],
+                end=line["end"],
+                capacity=20,
+                isPublic=True,
+            )
+            for line in draft_lines
+        ]
+        rates = [line["rates"] for line in draft_lines]
+        mock_db_session.scalars.return_value.all.return_value = [10, 11, 12]
+
+        result = bulk_insert_lines(mock_db_session, (lines, rates))
+        rate_rows = mock_db_session.execute.call_args.args[1]
+
+        assert result.message == [10, 11, 12]
+        assert mock_db_session.scalars.call_count == 1
+        assert [row["line_id"] for row in rate_rows] == [10, 11, 12]
+        mock_db_session.commit.assert_called_once()
+
+    def test_bulk_insert_lines_error(self, mock_db_session, draft_lines):
+        line = EventsLines(header_id=3, start=datetime(2025, 1, 6), end=datetime(2025, 1, 6))
+        mock_db_session.scalars.side_effect = SQLAlchemyError("Insert failed")
+
+        result = bulk_insert_lines(mock_db_session, ([line], [[]]))
+
+        assert result.status == ResponseStatus.ERROR
+        mock_db_session.rollback.assert_called_once()
@@ -2,12 +2,12 @@ import smtplib
 
 import pytest
 from pytest_mock import MockerFixture
+from sqlalchemy.exc import OperationalError
 
 import copy
 
 from app.schemas.schemas import InternalResponse, ResponseStatus
 from datetime import datetime
-from app.services.retrieve_service import RetrieveService
 
 from app.models import Users
 
@@ -15,6 +15,8 @@ import app.models as models
 from app.utils import email_utils
 from app.services.auth_service import AuthService
 from app.utils.fetch_data_utils import validate_email
+from app.templates.template_service import EmailTemplates
+from jinja2 import TemplateNotFound
 
 class MockEmailService:
     
@@ -60,8 +62,6 @@ class TestEmailUtils:
             full_name="User Test",
             email="test@example.com",
             password="uf3su4db48348734t834nn58",
-            code=None,
-            code_expiration=None,
             is_validated=True,
             created_at="2024-12-17 18:39:47.98487+01",
         )
@@ -143,13 +143,13 @@ class TestEmailUtils:
         expected_code_output.origin = "generate_code"
         
         expected_send_email_output.status = ResponseStatus.SUCCESS
-        expected_send_email_output.message = "Email sent"
-        expected_send_email_output.origin = "send_email"
+        expected_send_email_output.message = 1
+        expected_send_email_output.origin = "enqueue_email"
         
         mocker.patch.object(AuthService, 
                             expected_code_output.origin, 
                             return_value = expected_code_output)
-        mocker.patch("app.utils.email_utils.send_email", 
+        mocker.patch("app.utils.email_utils.enqueue_email", 
                      return_value = expected_send_email_output)
         
         result: InternalResponse = email_utils.send_auth_code(mock_db_session, mock_db_user.email)
@@ -186,18 +186,15 @@ class TestEmailUtils:
         expected_code_output.message = code
         expected_code_output.origin = "generate_code"
         
-        mock_template_content = "email_verification_code.html"
-        mocker.patch(
-            "builtins.open", mocker.mock_open(read_data=mock_template_content)
-        )
         mocker.patch.object(AuthService, "generate_code", return_value=expected_code_output)
         if templateError:
             template = 5
         if openFileError:
-            mocker.patch("builtins.open", side_effect=FileNotFoundError)
+            mocker.patch.object(EmailTemplates, "render", 
+                                side_effect=TemplateNotFound("email_recovery.html"))
         if sendEmailError:
-            expected_output.origin = "send_email"
-            mocker.patch("app.utils.email_utils.send_email", return_value=expected_output)
+            expected_output.origin = "enqueue_email"
+            mocker.patch("app.utils.email_utils.enqueue_email", return_value=expected_output)
         mocker.patch("app.utils.email_utils.create_email_code_token", 
                      return_value={"email": mock_db_user.email, "code": code})
     
@@ -210,129 +207,6 @@ class TestEmailUtils:
         
         assert result == expected_output
         
-    def test_send_updated_events_succeed(
-        self, 
-        mocker: MockerFixture, 
-        mock_db_session,
-        expected_output: InternalResponse,
-        mock_db_user: Users
-        ):
-
-        expected_send_email_output = copy.deepcopy(expected_output)
-        expected_get_user_data_output = copy.deepcopy(expected_output)
-        
-        mock_email_body = "<p> Test </p>"
-        mock_changes = {"key": "Change"}
-        
-        expected_output.status = ResponseStatus.SUCCESS
-        expected_output.message = "Changes sent via email"
-        expected_output.origin = "send_updated_events"
-        
-        expected_send_email_output.status = ResponseStatus.SUCCESS
-        expected_send_email_output.message = "Email sent"
-        expected_send_email_output.origin = "send_email"
-        
-        expected_get_user_data_output.status = ResponseStatus.SUCCESS
-        expected_get_user_data_output.message = mock_db_user
-        expected_get_user_data_output.origin = "get_user_data"
-        
-        mocker.patch("app.utils.email_utils.get_user_data", 
-                     return_value=expected_get_user_data_output)
-        mock_template_content = "event_changed.html"
-        mocker.patch(
-            "builtins.open", 
-            mocker.mock_open(read_data=mock_template_content)
-        )
-        mocker.patch.object(RetrieveService, "generate_event_changes_html", 
-                     return_value = mock_email_body)
-        mocker.patch("app.utils.email_utils.send_email", 
-                     return_value = expected_send_email_output)
-        
-        result: InternalResponse = email_utils.send_updated_events(mock_db_session, 
-                                                                   mock_db_user.id,
-                                                                   mock_changes)
-        expected_output.timestamp = result.timestamp
-        
-        assert result == expected_output
-        
-    @pytest.mark.parametrize(
-        "getUserDataError, openFileError, sendEmailError, message",
-        [
-            (True, False, False, "Not found"),
-            (False, True, False, "Updated Event template not found"),
-            (False, False, True, "Failed to connect to the SMTP server"),
-        ],
-    )
-    def test_send_updated_events_errors(
-        self,
-        mocker: MockerFixture,
-        mock_db_session,
-        expected_output: InternalResponse,
-        mock_db_user: Users,
-        getUserDataError,
-        openFileError,
-        sendEmailError,
-        message,
-    ):
-        mock_email_body = "<p> Test </p>"
-        mock_changes = {"key": "Change"}
-        mock_template_content = "event_changed.html"
-
-        expected_output.status = ResponseStatus.ERROR
-        expected_output.message = message
-        expected_output.origin = "send_updated_events"
-
-        expected_send_email_output = copy.deepcopy(expected_output)
-        expected_send_email_output.message = "Email sent"
-        expected_send_email_output.origin = "send_email"
-
-        expected_get_user_data_output = copy.deepcopy(expected_output)
-        expected_get_user_data_output.message = mock_db_user
-        expected_get_user_data_output.origin = "get_user_data"
-
-        if getUserDataError:
-            expected_get_user_data_output.status = ResponseStatus.ERROR
-            expected_get_user_data_output.message = message
-            expected_output.origin = expected_get_user_data_output.origin
-        elif openFileError:
-            expected_get_user_data_output.status = ResponseStatus.SUCCESS
-            mocker.patch("builtins.open", side_effect=FileNotFoundError)
-        else:
-            mocker.patch(
-                "builtins.open",
-                mocker.mock_open(read_data=mock_template_content),
-            )
-
-        if sendEmailError:
-            expected_send_email_output.status = ResponseStatus.ERROR
-            expected_send_email_output.message = message
-            expected_get_user_data_output.status = ResponseStatus.SUCCESS
-            expected_get_user_data_output.message = mock_db_user
-            expected_output.origin = expected_send_email_output.origin
-
-        mocker.patch(
-            "app.utils.email_utils.get_user_data",
-            return_value=expected_get_user_data_output,
-        )
-        mocker.patch.object(
-            RetrieveService,
-            "generate_event_changes_html",
-            return_value=mock_email_body,
-        )
-        mocker.patch(
-            "app.utils.email_utils.send_email",
-            return_value=expected_send_email_output,
-        )
-
-        result: InternalResponse = email_utils.send_updated_events(
-            mock_db_session, mock_db_user.id, mock_changes
-        )
-
-        expected_output.timestamp = result.timestamp
-
-        assert result == expected_output
-
-        
     def test_send_email_succeed(
         self, 
         mocker: MockerFixture, 
@@ -405,6 +279,77 @@ class TestEmailUtils:
         
         assert result == expected_output
         
+    def test_enqueue_email_succeed(
+        self, 
+        mock_db_session,
+        mock_db_user: Users):
+        
+        def assign_id():
+            mock_db_session.add.call_args.args[0].id = 7
+        mock_db_session.commit.side_effect = assign_id
+        
+        result = email_utils.enqueue_email(mock_db_session, mock_db_user.email, "Test", "<p> Test </p>")
+        outbox = mock_db_session.add.call_args.args[0]
+        
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == 7
+        assert isinstance(outbox, models.EmailOutbox)
+        assert outbox.recipient == mock_db_user.email
+    
+    def test_enqueue_email_without_commit(
+        self, 
+        mock_db_session,
+        mock_db_user: Users):
+        
+        result = email_utils.enqueue_email(
+            mock_db_session, mock_db_user.email, "Test", "<p> Test </p>", commit=False)
+        
+        assert result.status == ResponseStatus.SUCCESS
+        mock_db_session.flush.assert_called_once()
+        mock_db_session.commit.assert_not_called()
+    
+    def test_enqueue_email_error(
+        self, 
+        mock_db_session,
+        mock_db_user: Users):
+        
+        mock_db_session.commit.side_effect = OperationalError("INSERT", {}, Exception())
+        
+        result = email_utils.enqueue_email(mock_db_session, mock_db_user.email, "Test", "<p> Test </p>")
+        
+        assert result.status == ResponseStatus.ERROR
+        assert result.origin == "enqueue_email"
+        mock_db_session.rollback.assert_called_once()
+    
+    def test_enqueue_emails(self, mock_db_session):
+        messages = [
+            ("a@example.com", "Test", "<p> A </p>"),
+            ("b@example.com", "Test", "<p> B </p>"),
+        ]
+        
+        result = email_utils.enqueue_emails(mock_db_session, messages)
+        rows = mock_db_session.execute.call_args.args[1]
+        
+        assert result.status == ResponseStatus.SUCCESS
+        assert result.message == 2
+        assert [row["recipient"] for row in rows] == ["a@example.com", "b@example.com"]
+        mock_db_session.execute.assert_called_once()
+        mock_db_session.commit.assert_called_once()
+    
+    def test_smtp_session_reconnects(self, mocker: MockerFixture):
+        mock_smtp = mocker.patch("smtplib.SMTP")
+        first, second = mocker.Mock(), mocker.Mock()
+        first.sendmail.side_effect = [None, smtplib.SMTPServerDisconnected()]
+        mock_smtp.side_effect = [first, second]
+        
+        with email_utils.SMTPSession() as server:
+            server.send("a@example.com", "Test", "<p> Test </p>")
+            server.send("b@example.com", "Test", "<p> Test </p>")
+        
+        assert mock_smtp.call_count == 2
+        second.sendmail.assert_called_once()
+        second.quit.assert_called_once()
+        
     def test_resend_auth_code_succeed(
         self, 
         mocker: MockerFixture,
@@ -431,7 +376,8 @@ class TestEmailUtils:
         mocker.patch("app.utils.email_utils.send_auth_code", 
                      return_value=expected_send_email_output)
         
-        result: InternalResponse = email_utils.resend_auth_code(mock_db_session, mock_db_user.code)
+        result: InternalResponse = email_utils.resend_auth_code(
+            mock_db_session, mock_db_user.code, mock_db_user.email)
         expected_output.timestamp = result.timestamp
         
         assert result == expected_output
@@ -481,7 +427,8 @@ class TestEmailUtils:
         mocker.patch("app.utils.email_utils.send_auth_code", 
                      return_value=expected_send_email_output)
         
-        result: InternalResponse = email_utils.resend_auth_code(mock_db_session, mock_db_user.code)
+        result: InternalResponse = email_utils.resend_auth_code(
+            mock_db_session, mock_db_user.code, mock_db_user.email)
         expected_output.timestamp = result.timestamp
         
         assert result == expected_output
@@ -224,4 +224,49 @@ class TestMapsUtils:
         result = maps.get_bounding_area(input, radius, units)
         expected_output.timestamp = result.timestamp
         
-        assert result == expected_output
\ No newline at end of file
+        assert result == expected_output
+
+class TestSeriesOccurrences:
+
+    @pytest.fixture
+    def mock_db_session(self, mocker: MockerFixture):
+        from app.models import EventsHeaders, EventsSeries
+
+        start = datetime(2030, 1, 1, 18, 0)
+        series = EventsSeries(
+            id=3,
+            header_id=1,
+            rrule="RRULE:FREQ=DAILY",
+            dtstart=start,
+            dtend=start.replace(hour=20),
+            exdates=[],
+            capacity=20,
+            isPublic=True,
+            materialized_until=start,
+        )
+        mock_db_session = mocker.Mock()
+        mock_db_session.query().join().filter().all.return_value = [
+            (EventsHeaders(id=1), series)
+        ]
+        return mock_db_session
+
+    @pytest.mark.parametrize(
+        "until, expected",
+        [
+            (datetime(2030, 1, 4, 18, 0), 3),
+            (datetime.fromisoformat("2030-01-04T20:00:00+02:00"), 3),
+            (datetime(2040, 1, 1), 6),
+        ],
+    )
+    def test_expands_requested_window(
+        self, mocker: MockerFixture, mock_db_session, until, expected
+    ):
+        mock_now = mocker.patch("app.utils.maps_utils.datetime")
+        mock_now.now.return_value = datetime(2029, 12, 29, 12, 0)
+        mock_now.min = datetime.min
+        mocker.patch("app.utils.maps_utils.settings.series_window_max_days", 10)
+
+        occurrences = maps.get_series_occurrences(mock_db_session, None, until)
+
+        assert len(occurrences) == expected
+        assert all(line.id is None for _, line in occurrences)
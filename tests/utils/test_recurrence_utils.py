@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.utils import recurrence_utils, time_utils
+
+
+@pytest.fixture
+def anchor():
+    start = datetime(2024, 1, 31, 15, 30)
+    return start, start + timedelta(hours=2)
+
+
+class TestRecurrenceUtils:
+
+    def test_repeat_days_shape(self, anchor):
+        start, end = anchor
+        schedule = recurrence_utils.repeat_days(
+            [start, start + timedelta(days=1)], [end, end + timedelta(days=1)], 4, 7
+        )
+
+        assert schedule.starts.shape == (2, 4)
+        assert schedule.starts.dtype == np.dtype("M8[us]")
+        assert schedule.to_pairs(1)[-1] == (
+            start + timedelta(days=22),
+            end + timedelta(days=22),
+        )
+
+    def test_repeat_months_clips_to_month_end(self, anchor):
+        start, end = anchor
+        schedule = recurrence_utils.repeat_months(start, end, 4)
+
+        assert [pair[0].day for pair in schedule.to_pairs()] == [31, 29, 31, 30]
+
+    def test_repeat_yearly_from_leap_day(self):
+        start = datetime(2024, 2, 29, 10)
+        schedule = recurrence_utils.repeat_months(
+            start, start + timedelta(hours=1), 5, 12
+        )
+
+        assert [pair[0].date().isoformat() for pair in schedule.to_pairs()] == [
+            "2024-02-29",
+            "2025-02-28",
+            "2026-02-28",
+            "2027-02-28",
+            "2028-02-29",
+        ]
+
+    def test_repeat_busdays_rolls_forward(self):
+        saturday = datetime(2024, 12, 21, 9, 0)
+        schedule = recurrence_utils.repeat_busdays(
+            saturday,
+            saturday + timedelta(hours=1),
+            3,
+            recurrence_utils.WEEKDAYS_MASK,
+        )
+
+        assert [pair[0] for pair in schedule.to_pairs()] == [
+            datetime(2024, 12, 23, 9, 0),
+            datetime(2024, 12, 24, 9, 0),
+            datetime(2024, 12, 25, 9, 0),
+        ]
+
+    def test_to_pairs_keeps_timezone(self, anchor):
+        start, end = (date.replace(tzinfo=timezone.utc) for date in anchor)
+        result = time_utils.repeat_daily(start, end, 2)
+
+        assert result.message[0] == [
+            (start, end),
+            (start + timedelta(days=1), end + timedelta(days=1)),
+        ]
+        assert result.message[0][1][0].tzinfo is timezone.utc
+
+    @pytest.mark.parametrize(
+        "weekmask, valid_days",
+        [
+            (recurrence_utils.WEEKDAYS_MASK, {0, 1, 2, 3, 4}),
+            (recurrence_utils.WEEKEND_MASK, {5, 6}),
+        ],
+    )
+    def test_repeat_busdays_large_schedule(self, anchor, weekmask, valid_days):
+        start, end = anchor
+        occurrences = 20_000
+
+        schedule = recurrence_utils.repeat_busdays(start, end, occurrences, weekmask)
+
+        weekdays = (schedule.starts[0].astype("M8[D]").view("int64") - 4) % 7
+        assert schedule.starts.shape == (1, occurrences)
+        assert set(np.unique(weekdays)) == valid_days
+        assert np.all(np.diff(schedule.starts[0]) > np.timedelta64(0))
+        assert np.all(schedule.ends - schedule.starts == np.timedelta64(2, "h"))
+
+
+class TestRRuleStorage:
+
+    @pytest.mark.parametrize(
+        "build, expected",
+        [
+            (
+                lambda start: recurrence_utils.repeat_days(start, start, 10, 7),
+                "RRULE:FREQ=WEEKLY;COUNT=10",
+            ),
+            (
+                lambda start: recurrence_utils.repeat_busdays(
+                    start, start, 10, recurrence_utils.WEEKEND_MASK
+                ),
+                "RRULE:FREQ=WEEKLY;BYDAY=SA,SU;COUNT=10",
+            ),
+            (
+                lambda start: recurrence_utils.repeat_months(start, start, 10, 12),
+                "RRULE:FREQ=YEARLY;COUNT=10",
+            ),
+        ],
+    )
+    def test_infer_rrule(self, anchor, build, expected):
+        starts = build(anchor[0].replace(day=22)).to_pairs()
+
+        assert recurrence_utils.infer_rrule([start for start, _ in starts]) == expected
+
+    def test_infer_rrule_irregular(self, anchor):
+        start = anchor[0]
+        starts = [start, start + timedelta(days=1), start + timedelta(days=3)]
+
+        assert recurrence_utils.infer_rrule(starts) is None
+        assert recurrence_utils.infer_rrule([start]) is None
+
+    def test_expand_rrule_window(self):
+        dtstart = datetime(2025, 1, 6, 18, 0)
+        rule = "RRULE:FREQ=WEEKLY;COUNT=52"
+
+        result = recurrence_utils.expand_rrule(
+            rule,
+            dtstart,
+            after=datetime(2025, 1, 13, 18, 0),
+            before=datetime(2025, 2, 3, 18, 0),
+            exdates=[datetime(2025, 1, 27, 18, 0)],
+        )
+
+        assert result == [datetime(2025, 1, 20, 18, 0), datetime(2025, 2, 3, 18, 0)]
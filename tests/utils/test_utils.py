@@ -0,0 +1,107 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.exception_handlers import hashing_saturated_handler
+from app.schemas.schemas import ResponseStatus
+from app.utils import utils
+from app.utils.utils import HashingPool, HashingPoolSaturated
+from passlib.context import CryptContext
+
+
+class TestHashingPool:
+
+    def test_password_round_trip(self, mocker: MockerFixture):
+        pool = HashingPool(1, 0)
+        mocker.patch("app.utils.utils.hashing_pool", pool)
+        mocker.patch.object(utils.pwd_context, "hash", return_value="hashed")
+        mocker.patch.object(utils.pwd_context, "verify", return_value=True)
+
+        assert utils.hash_password("Secret123!").message == "hashed"
+        assert utils.is_password_valid("Secret123!", "hashed").status == (
+            ResponseStatus.SUCCESS
+        )
+        assert pool.stats()["completed"] == 2
+
+    def test_rejects_when_saturated(self):
+        pool = HashingPool(1, 1)
+        release = threading.Event()
+        requests = ThreadPoolExecutor(max_workers=2)
+        running = [requests.submit(pool.run, release.wait) for _ in range(2)]
+        while pool.stats()["queued"] < 1:
+            time.sleep(0.01)
+
+        with pytest.raises(HashingPoolSaturated) as exc:
+            pool.run(release.wait)
+        release.set()
+
+        assert exc.value.stats == {
+            "workers": 1,
+            "running": 1,
+            "queued": 1,
+            "completed": 0,
+            "rejected": 1,
+        }
+        assert [future.result() for future in running] == [True, True]
+        assert pool.stats()["completed"] == 2
+
+    def test_saturated_handler(self, mocker: MockerFixture):
+        request = mocker.Mock(headers={})
+        stats = {"running": 4, "queued": 16}
+
+        response = hashing_saturated_handler(request, HashingPoolSaturated(stats))
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert b"16 queued, 4 running" in response.body
+
+
+class TestPasswordContext:
+
+    @pytest.fixture
+    def fast_argon2(self, mocker: MockerFixture):
+        mocker.patch("app.utils.utils.settings.password_scheme", "argon2")
+        mocker.patch("app.utils.utils.settings.argon2_memory_cost", 1024)
+        mocker.patch("app.utils.utils.settings.argon2_time_cost", 2)
+        mocker.patch("app.utils.utils.settings.argon2_parallelism", 1)
+        mocker.patch("app.utils.utils.pwd_context", utils.build_pwd_context(2))
+
+    def test_legacy_bcrypt_needs_update(self, fast_argon2):
+        legacy = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("Secret123!")
+
+        assert utils.is_password_valid("Secret123!", legacy).status == (
+            ResponseStatus.SUCCESS
+        )
+        assert utils.password_needs_update(legacy) is True
+        assert utils.hash_password("Secret123!").message.startswith("$argon2id$")
+
+    def test_cost_changes_need_update(self, fast_argon2, mocker: MockerFixture):
+        current = utils.hash_password("Secret123!").message
+        assert utils.password_needs_update(current) is False
+
+        mocker.patch("app.utils.utils.settings.argon2_memory_cost", 2048)
+        mocker.patch("app.utils.utils.pwd_context", utils.build_pwd_context(2))
+        assert utils.password_needs_update(current) is True
+
+    @pytest.mark.parametrize(
+        "scheme, per_hash, target_ms, expected",
+        [
+            ("argon2", 0.05, 250, "t=5"),
+            ("argon2", 0.5, 250, "t=2"),
+            ("bcrypt", 0.001, 256, "$12$"),
+        ],
+    )
+    def test_calibrate(
+        self, fast_argon2, mocker: MockerFixture, scheme, per_hash, target_ms, expected
+    ):
+        mocker.patch("app.utils.utils.settings.password_scheme", scheme)
+        mocker.patch("app.utils.utils.settings.bcrypt_rounds", 4)
+        mocker.patch("app.utils.utils._measure_hash", return_value=per_hash)
+
+        context = utils.calibrate_pwd_context(target_ms)
+
+        assert utils.pwd_context is context
+        assert expected in context.hash("Secret123!")